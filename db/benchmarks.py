@@ -0,0 +1,378 @@
+"""
+Benchmarks for the FastF1 ingestion pipeline.
+
+Run from the repository root:
+
+    python -m db.benchmarks laps
+    python -m db.benchmarks ingest --drivers 20 --laps 57 --sessions Q R
+    python -m db.benchmarks ingest --source replay --replay-dir captures --events Bahrain
+    python -m db.benchmarks backends --db db/F1_2023.db
+
+The ingest benchmark runs FastF1ToSQL against offline session sources, so it
+needs no network access. The backends benchmark runs the tools/sql queries
+against an ingestion database and its DuckDB copy (see db.duckdb_backend).
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from db.duckdb_backend import build_duckdb, duckdb, duckdb_parameters
+from db.formula1_databases import FastF1ToSQL
+from db.query_plans import SQL_DIR
+from db.reporting import MB, peak_rss_bytes
+from db.session_sources import SessionSource, get_source
+
+console = Console(style="chartreuse1 on grey7")
+
+
+def synthetic_laps(drivers: int = 20, laps: int = 70, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a laps frame shaped like ``fastf1.core.Session.laps``.
+
+    Args:
+        drivers (int): Number of drivers in the session.
+        laps (int): Number of laps per driver.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        pd.DataFrame: One row per driver and lap.
+    """
+    rng = np.random.default_rng(seed)
+    rows = drivers * laps
+    driver_names = np.repeat([f"D{i:02d}" for i in range(drivers)], laps)
+    lap_numbers = np.tile(np.arange(1, laps + 1, dtype=float), drivers)
+    lap_times = pd.to_timedelta(
+        rng.normal(92.0, 0.5, rows), unit='s').round('ms')
+    lap_start_times = pd.to_timedelta(
+        np.tile(np.arange(laps) * 92.0, drivers), unit='s')
+    pit_in = np.where(lap_numbers == laps // 2, lap_start_times + lap_times,
+                      pd.NaT)
+    pit_out = np.where(lap_numbers == laps // 2 + 1, lap_start_times, pd.NaT)
+
+    return pd.DataFrame({
+        'Driver': driver_names,
+        'LapNumber': lap_numbers,
+        'Sector1Time': (lap_times * 0.3).round('ms'),
+        'Sector2Time': (lap_times * 0.4).round('ms'),
+        'Sector3Time': (lap_times * 0.3).round('ms'),
+        'LapTime': lap_times.where(lap_numbers > 1),
+        'SpeedFL': rng.integers(270, 290, rows).astype(float),
+        'SpeedST': np.where(rng.random(rows) < 0.1, np.nan,
+                            rng.integers(300, 330, rows)),
+        'IsPersonalBest': rng.random(rows) < 0.1,
+        'Compound': np.where(lap_numbers <= laps // 2, 'SOFT', 'HARD'),
+        'TyreLife': np.where(lap_numbers <= laps // 2, lap_numbers,
+                             lap_numbers - laps // 2),
+        'FreshTyre': lap_numbers > laps // 2,
+        'Position': np.repeat(np.arange(1, drivers + 1, dtype=float), laps),
+        'LapStartDate': pd.Timestamp('2023-03-05 15:00:00') + lap_start_times,
+        'PitInTime': pd.to_timedelta(pit_in),
+        'PitOutTime': pd.to_timedelta(pit_out),
+    })
+
+
+def _epoch_ms_or_none(timestamp: pd.Timestamp) -> int | None:
+    """Convert a timestamp to epoch milliseconds, None for NaT."""
+    return timestamp.value // 1_000_000 if pd.notnull(timestamp) else None
+
+
+def insert_laps_row_by_row(converter: FastF1ToSQL, session: Any) -> None:
+    """
+    Reference implementation of the original per-row ``insert_laps`` loop,
+    storing timestamps as epoch milliseconds like the current schema.
+
+    Args:
+        converter (FastF1ToSQL): Converter holding the open connection.
+        session (Any): Object exposing a FastF1-like ``laps`` frame.
+    """
+    laps_df = session.laps.copy()
+    laps_df['session_id'] = converter._session_id
+    laps_df['lap_start_time_in_datetime'] = pd.to_datetime(
+        laps_df['LapStartDate'])
+    laps_df['pin_in_time_in_datetime'] = converter._session_start_date + \
+        laps_df['PitInTime']
+    laps_df['pin_out_time_in_datetime'] = converter._session_start_date + \
+        laps_df['PitOutTime']
+    driver_ids = converter.get_or_create_drivers(laps_df['Driver'])
+
+    for _, lap in laps_df.iterrows():
+        lap_data: dict[str, Any] = {
+            'session_id': lap['session_id'],
+            'driver_id': driver_ids[lap['Driver']],
+            'lap_number': lap['LapNumber'],
+            'sector_1_time_in_seconds': lap['Sector1Time'].total_seconds() if pd.notnull(lap['Sector1Time']) else None,
+            'sector_2_time_in_seconds': lap['Sector2Time'].total_seconds() if pd.notnull(lap['Sector2Time']) else None,
+            'sector_3_time_in_seconds': lap['Sector3Time'].total_seconds() if pd.notnull(lap['Sector3Time']) else None,
+            'lap_time_in_seconds': lap['LapTime'].total_seconds() if pd.notnull(lap['LapTime']) else None,
+            'finish_line_speed_trap_in_km': lap['SpeedFL'],
+            'longest_strait_speed_trap_in_km': lap['SpeedST'],
+            'is_personal_best': lap['IsPersonalBest'],
+            'tyre_compound': lap['Compound'],
+            'tyre_life_in_laps': lap['TyreLife'],
+            'is_fresh_tyre': lap['FreshTyre'],
+            'position': lap['Position'],
+            'lap_start_time_in_datetime': _epoch_ms_or_none(lap['lap_start_time_in_datetime']),
+            'pin_in_time_in_datetime': _epoch_ms_or_none(lap['pin_in_time_in_datetime']),
+            'pin_out_time_in_datetime': _epoch_ms_or_none(lap['pin_out_time_in_datetime']),
+        }
+        columns = ', '.join(lap_data.keys())
+        placeholders = ':' + ', :'.join(lap_data.keys())
+        query = f"INSERT INTO Laps ({columns}) VALUES ({placeholders})"
+        converter.cursor.execute(query, lap_data)
+    converter.conn.commit()
+
+
+def _time_laps_insert(insert: Callable[[FastF1ToSQL, Any], None],
+                      session: Any, repeat: int) -> tuple[float, list[tuple]]:
+    """
+    Time a laps insert function against a fresh in-memory database.
+
+    Args:
+        insert (Callable): Function taking a converter and a session.
+        session (Any): Object exposing a FastF1-like ``laps`` frame.
+        repeat (int): Number of runs; the fastest one is reported.
+
+    Returns:
+        tuple[float, list[tuple]]: Best wall-clock time in seconds and the
+        rows stored by the last run.
+    """
+    best = float('inf')
+    rows: list[tuple] = []
+    for _ in range(repeat):
+        converter = FastF1ToSQL(':memory:')
+        converter._session_id = 1
+        converter._session_start_date = pd.Timestamp('2023-03-05 14:00:00')
+        converter._season = 2023
+        start = time.perf_counter()
+        insert(converter, session)
+        best = min(best, time.perf_counter() - start)
+        rows = converter.cursor.execute(
+            "SELECT * FROM Laps ORDER BY lap_id").fetchall()
+        converter.conn.close()
+    return best, rows
+
+
+def benchmark_insert_laps(drivers: int = 20, laps: int = 70, repeat: int = 5) -> None:
+    """
+    Compare the row-by-row and the vectorized laps ingestion.
+
+    Args:
+        drivers (int): Number of drivers in the synthetic session.
+        laps (int): Number of laps per driver.
+        repeat (int): Number of runs per implementation.
+    """
+    session = SimpleNamespace(laps=synthetic_laps(drivers, laps))
+    row_by_row, expected = _time_laps_insert(
+        insert_laps_row_by_row, session, repeat)
+    vectorized, actual = _time_laps_insert(
+        lambda converter, s: converter.insert_laps(s), session, repeat)
+
+    matches = len(expected) == len(actual) and all(
+        all(a == b or (isinstance(a, float) and np.isclose(a, b))
+            for a, b in zip(old, new))
+        for old, new in zip(expected, actual))
+
+    console.print(f"> insert_laps: {drivers} drivers x {laps} laps "
+                  f"({len(actual)} rows)")
+    console.print(f"> row by row: {row_by_row * 1000:.1f} ms")
+    console.print(f"> vectorized: {vectorized * 1000:.1f} ms "
+                  f"({row_by_row / vectorized:.1f}x faster)")
+    console.print(f"> stored values match: {matches}")
+
+
+def benchmark_ingest(source: SessionSource, year: int, events: list[str],
+                     sessions: list[str], bulk: bool = False,
+                     **converter_options: Any) -> None:
+    """
+    Ingest sessions into a fresh database and report where the time goes.
+
+    Prints rows per second for each table, the time spent per stage over all
+    sessions and the peak memory of the process.
+
+    Args:
+        source (SessionSource): Where the sessions come from.
+        year (int): Championship year of the sessions.
+        events (list[str]): Event names.
+        sessions (list[str]): Session identifiers.
+        bulk (bool): Ingest inside ``FastF1ToSQL.bulk_load``.
+        **converter_options: Keyword arguments of FastF1ToSQL.
+    """
+    rows: Counter = Counter()
+    stage_seconds: Counter = Counter()
+    with tempfile.TemporaryDirectory() as directory:
+        converter = FastF1ToSQL(os.path.join(directory, 'benchmark.db'),
+                                **converter_options)
+        start = time.perf_counter()
+
+        def run() -> None:
+            for event_name in events:
+                for session_name in sessions:
+                    load_start = time.perf_counter()
+                    session = source.load(year, event_name, session_name)
+                    stage_seconds['load'] += time.perf_counter() - load_start
+                    report = converter.process_session(session, load=False)
+                    rows.update(report.rows_written)
+                    stage_seconds.update(report.stage_seconds)
+
+        if bulk:
+            bulk_start = time.perf_counter()
+            with converter.bulk_load():
+                run()
+            # Index builds and ANALYZE at the end of the bulk load
+            stage_seconds['bulk load'] = time.perf_counter() - bulk_start - \
+                sum(stage_seconds.values())
+        else:
+            run()
+        total = time.perf_counter() - start
+        converter.close()
+
+    console.print(f"> Ingested {len(events) * len(sessions)} sessions "
+                  f"in {total:.2f}s{' (bulk load)' if bulk else ''}")
+    for table, count in rows.items():
+        seconds = stage_seconds.get(table)
+        rate = f"{count / seconds:,.0f} rows/s" if seconds else "n/a"
+        console.print(f"> {table}: {count:,} rows, {rate}")
+    for stage, seconds in stage_seconds.items():
+        console.print(f"> stage {stage}: {seconds:.2f}s "
+                      f"({seconds / total * 100:.0f}%)")
+    console.print(f"> peak RSS: {peak_rss_bytes() / MB:.0f} MB")
+
+
+def _best_time(run: Callable[[], list], repeat: int) -> tuple[float, list]:
+    """Run a query ``repeat`` times, returning the fastest time and the rows."""
+    best = float('inf')
+    rows: list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def benchmark_backends(sqlite_path: str, duckdb_path: str | None = None,
+                       parquet_dir: str | None = None, repeat: int = 3) -> None:
+    """
+    Time the tools/sql queries on SQLite and on DuckDB.
+
+    Args:
+        sqlite_path (str): Ingestion database, ideally a whole season.
+        duckdb_path (str | None): DuckDB copy of it; built in a temporary
+            directory when None.
+        parquet_dir (str | None): Parquet export to build the DuckDB copy
+            from, see db.duckdb_backend.build_duckdb.
+        repeat (int): Runs per query and backend; the fastest one is reported.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if duckdb_path is None:
+            duckdb_path = os.path.join(directory, 'benchmark.duckdb')
+            start = time.perf_counter()
+            build_duckdb(duckdb_path, sqlite_path, parquet_dir)
+            console.print(
+                f"> Built the DuckDB database in {time.perf_counter() - start:.2f}s")
+
+        sqlite_conn = sqlite3.connect(sqlite_path)
+        duckdb_conn = duckdb.connect(duckdb_path, read_only=True)
+        # The lap with the most telemetry, so telemetry_analysis has work to do
+        driver_name, lap_number, session_id = sqlite_conn.execute('''
+            SELECT d.abbreviation, l.lap_number, l.session_id
+            FROM Laps l
+            JOIN Drivers d ON l.driver_id = d.driver_id
+            LEFT JOIN Telemetry t ON l.lap_id = t.lap_id
+            GROUP BY l.lap_id
+            ORDER BY COUNT(t.lap_id) DESC
+            LIMIT 1
+        ''').fetchone()
+        parameters = {'driver_name': driver_name, 'lap_number': lap_number,
+                      'session_id': session_id}
+        console.print(f"> Parameters: {parameters}")
+
+        for path in sorted(glob.glob(os.path.join(SQL_DIR, '*.query.sql'))):
+            name = os.path.basename(path).removesuffix('.query.sql')
+            with open(path, "r") as sql_file:
+                sql_query = sql_file.read()
+            used = {key: value for key, value in parameters.items()
+                    if f":{key}" in sql_query}
+            sqlite_seconds, sqlite_rows = _best_time(
+                lambda: sqlite_conn.execute(sql_query, used).fetchall(), repeat)
+            duckdb_seconds, duckdb_rows = _best_time(
+                lambda: duckdb_conn.execute(
+                    duckdb_parameters(sql_query), used).fetchall(), repeat)
+            console.print(
+                f"> {name}: sqlite {sqlite_seconds * 1000:.1f} ms, "
+                f"duckdb {duckdb_seconds * 1000:.1f} ms "
+                f"(speedup {sqlite_seconds / duckdb_seconds:.1f}x), "
+                f"{len(sqlite_rows)} / {len(duckdb_rows)} rows")
+
+        sqlite_conn.close()
+        duckdb_conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the FastF1 ingestion pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    laps = commands.add_parser(
+        'laps', help="Compare the row-by-row and vectorized laps insert")
+    laps.add_argument('--drivers', type=int, default=20)
+    laps.add_argument('--laps', type=int, default=70)
+    laps.add_argument('--repeat', type=int, default=5)
+
+    ingest = commands.add_parser(
+        'ingest', help="Ingest offline sessions and report throughput")
+    ingest.add_argument('--source', default='synthetic',
+                        choices=('synthetic', 'replay'))
+    ingest.add_argument('--replay-dir',
+                        help="Directory of captured sessions for --source replay")
+    ingest.add_argument('--year', type=int, default=2023)
+    ingest.add_argument('--events', nargs='+', default=['Bahrain'])
+    ingest.add_argument('--sessions', nargs='+', default=['R'])
+    ingest.add_argument('--drivers', type=int, default=20,
+                        help="Drivers per synthetic session (default: 20)")
+    ingest.add_argument('--laps', type=int, default=57,
+                        help="Laps per synthetic driver (default: 57)")
+    ingest.add_argument('--resample-interval', default='100ms',
+                        help="Telemetry resample interval, 'none' to keep every sample")
+    ingest.add_argument('--telemetry-workers', type=int, default=1)
+    ingest.add_argument('--bulk', action='store_true',
+                        help="Ingest in bulk-load mode")
+    backends = commands.add_parser(
+        'backends', help="Compare the tools/sql queries on SQLite and DuckDB")
+    backends.add_argument('--db', required=True,
+                          help="Path to the SQLite database file")
+    backends.add_argument('--duckdb',
+                          help="Existing DuckDB copy (default: build one)")
+    backends.add_argument('--parquet-dir',
+                          help="Build the DuckDB copy from this Parquet export")
+    backends.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == 'backends':
+        benchmark_backends(args.db, args.duckdb, args.parquet_dir, args.repeat)
+        return
+    if args.command == 'laps':
+        benchmark_insert_laps(args.drivers, args.laps, args.repeat)
+        return
+
+    if args.source == 'replay' and not args.replay_dir:
+        parser.error("--source replay requires --replay-dir")
+    options = {'drivers': args.drivers, 'laps': args.laps} \
+        if args.source == 'synthetic' else {}
+    benchmark_ingest(
+        get_source(args.source, args.replay_dir, **options),
+        args.year, args.events, args.sessions, bulk=args.bulk,
+        resample_interval=None if args.resample_interval.lower() == 'none' else args.resample_interval,
+        telemetry_workers=args.telemetry_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
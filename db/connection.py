@@ -1,3 +1,72 @@
+"""
+Database the tools and the agent's toolkit query.
+
+The backend is chosen per deployment with environment variables (or a .env
+file):
+
+    F1_DB_BACKEND    'sqlite' (default) or 'duckdb'
+    F1_SQLITE_PATH   SQLite ingestion database (default: db/Bahrain_2023_Q.db)
+    F1_DUCKDB_PATH   DuckDB database built from it with python -m db.duckdb_backend
+                     (default: the SQLite path with a .duckdb extension)
+
+SQLite is served from a pool of read-only connections, see db.pool for its
+settings and pool_stats(db._engine) for its counters. A SQLite database
+written by an older version is first upgraded in place, see migrate_sqlite.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from dotenv import load_dotenv
 from langchain_community.utilities import SQLDatabase
 
-db = SQLDatabase.from_uri("sqlite:///db/Bahrain_2023_Q.db")
+load_dotenv()
+
+DB_BACKENDS: tuple[str, ...] = ('sqlite', 'duckdb')
+DB_BACKEND = os.getenv('F1_DB_BACKEND', 'sqlite')
+SQLITE_PATH = os.getenv('F1_SQLITE_PATH', 'db/Bahrain_2023_Q.db')
+DUCKDB_PATH = os.getenv('F1_DUCKDB_PATH',
+                        os.path.splitext(SQLITE_PATH)[0] + '.duckdb')
+
+
+def migrate_sqlite(path: str) -> None:
+    """
+    Upgrade a SQLite database written by an older version to the current
+    schema, which the tools query.
+
+    The pool only opens read-only connections, so FastF1ToSQL runs the
+    migrations on a writable one first. A current database is only read.
+
+    Args:
+        path (str): Path of the SQLite database.
+    """
+    from db.formula1_databases import SCHEMA_VERSION, FastF1ToSQL
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        FastF1ToSQL(path).close()
+
+
+def connect(backend: str = DB_BACKEND) -> SQLDatabase:
+    """
+    Open the database of a backend.
+
+    Args:
+        backend (str): 'sqlite' or 'duckdb'.
+
+    Returns:
+        SQLDatabase: The database.
+    """
+    if backend == 'sqlite':
+        from db.pool import create_read_only_engine, probing
+        migrate_sqlite(SQLITE_PATH)
+        # SQLDatabase reflects the schema
+        with probing():
+            return SQLDatabase(create_read_only_engine(SQLITE_PATH))
+    if backend == 'duckdb':
+        from db.duckdb_backend import create_duckdb_engine
+        return SQLDatabase(create_duckdb_engine(DUCKDB_PATH))
+    raise ValueError(
+        f"Unknown database backend '{backend}', expected one of {DB_BACKENDS}")
+
+
+db = connect()
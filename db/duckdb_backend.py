@@ -0,0 +1,160 @@
+"""
+Embedded DuckDB copy of the ingestion database for analytical queries.
+
+The tools/sql queries scan, join and aggregate whole tables, which DuckDB
+runs vectorized and in parallel. The DuckDB database is built from the SQLite
+one, either by copying every table or, for Laps, Weather and Telemetry, as
+views over the Parquet export (see db.export):
+
+    python -m db.duckdb_backend --sqlite db/F1_2023.db --out db/F1_2023.duckdb
+    python -m db.duckdb_backend --sqlite db/F1_2023.db --out db/F1_2023.duckdb --parquet-dir exports
+
+Set F1_DB_BACKEND=duckdb to serve the tools and the agent's toolkit from it,
+see db.connection.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import pandas as pd
+from rich.console import Console
+from sqlalchemy import Engine, create_engine
+from db.export import EXPORT_TABLES, to_arrow
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None  # type: ignore[assignment]
+
+console = Console(style="chartreuse1 on grey7")
+
+# Partition columns added by the export, not part of the SQLite tables
+_EXPORT_ONLY_COLUMNS: dict[str, tuple[str, ...]] = {
+    'Laps': ('season', 'event', 'session', 'driver'),
+    'Weather': ('season', 'event', 'session'),
+    'Telemetry': ('season', 'event', 'session', 'driver', 'lap_number'),
+}
+
+
+def _require_duckdb() -> None:
+    if duckdb is None:
+        raise ImportError("The DuckDB backend requires duckdb, install it first")
+
+
+def duckdb_parameters(sql: str) -> str:
+    """
+    Rewrite SQLite-style ``:name`` parameters to DuckDB's ``$name``.
+
+    Only needed with the duckdb module directly; SQLAlchemy connections
+    (duckdb_engine) translate ``:name`` parameters themselves.
+
+    Args:
+        sql (str): Query with ``:name`` parameters.
+
+    Returns:
+        str: The query with ``$name`` parameters.
+    """
+    return re.sub(r"(?<![:\w]):(\w+)", r"$\1", sql)
+
+
+def build_duckdb(target: str, sqlite_path: str, parquet_dir: str | None = None,
+                 chunk_rows: int = 500_000) -> dict[str, int]:
+    """
+    Build (or rebuild) a DuckDB database from an ingestion database.
+
+    Args:
+        target (str): Path of the DuckDB database file.
+        sqlite_path (str): Path of the SQLite ingestion database.
+        parquet_dir (str | None): Parquet export of the SQLite database. When
+            given, Laps, Weather and Telemetry are views over it instead of
+            copies, which saves the copy but scans the export's files on
+            every query.
+        chunk_rows (int): Rows read from SQLite at a time while copying.
+
+    Returns:
+        dict[str, int]: Rows per table.
+    """
+    _require_duckdb()
+    source = sqlite3.connect(sqlite_path)
+    target_conn = duckdb.connect(target)
+    try:
+        tables = [name for (name,) in source.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            target_conn.execute(f'DROP VIEW IF EXISTS "{table}"')
+            target_conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            if parquet_dir is not None and table in EXPORT_TABLES:
+                files = os.path.join(parquet_dir, table, '**', '*.parquet').replace("'", "''")
+                target_conn.execute(f'''
+                    CREATE VIEW "{table}" AS
+                    SELECT * EXCLUDE ({', '.join(_EXPORT_ONLY_COLUMNS[table])})
+                    FROM read_parquet('{files}', hive_partitioning = true)
+                ''')
+                continue
+
+            chunks = pd.read_sql_query(f'SELECT * FROM "{table}"', source,
+                                       chunksize=chunk_rows)
+            for index, chunk in enumerate(chunks):
+                # DuckDB reads the local Arrow table by its variable name
+                arrow_chunk = to_arrow(source, table, chunk)  # noqa: F841
+                if index == 0:
+                    target_conn.execute(f'CREATE TABLE "{table}" AS SELECT * FROM arrow_chunk')
+                else:
+                    target_conn.execute(f'INSERT INTO "{table}" SELECT * FROM arrow_chunk')
+
+        # Views were written for SQLite; the ones DuckDB can't bind are skipped
+        for name, sql in source.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall():
+            try:
+                target_conn.execute(f'DROP VIEW IF EXISTS "{name}"')
+                target_conn.execute(sql)
+            except duckdb.Error as error:
+                console.print(f"> Skipped view {name}: {error}")
+
+        return {table: target_conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                for table in tables}
+    finally:
+        target_conn.close()
+        source.close()
+
+
+def create_duckdb_engine(path: str) -> Engine:
+    """
+    Create a read-only SQLAlchemy engine on a DuckDB database.
+
+    Args:
+        path (str): Path of a DuckDB database built with :func:`build_duckdb`.
+
+    Returns:
+        Engine: The engine.
+    """
+    _require_duckdb()
+    try:
+        import duckdb_engine  # noqa: F401, registers the duckdb dialect
+    except ImportError:
+        raise ImportError(
+            "The DuckDB backend requires duckdb-engine, install it first") from None
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"DuckDB database '{path}' does not exist, build it with python -m db.duckdb_backend")
+    return create_engine(f"duckdb:///{path}", connect_args={'read_only': True})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build a DuckDB database from an ingestion database")
+    parser.add_argument('--sqlite', required=True,
+                        help="Path to the SQLite database file")
+    parser.add_argument('--out', required=True,
+                        help="Path of the DuckDB database file")
+    parser.add_argument('--parquet-dir',
+                        help="Read Laps, Weather and Telemetry from this Parquet export instead of copying them")
+    args = parser.parse_args()
+
+    rows = build_duckdb(args.out, args.sqlite, args.parquet_dir)
+    console.print(f"> Built {args.out}: {rows}")
+
+
+if __name__ == "__main__":
+    main()
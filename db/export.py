@@ -0,0 +1,343 @@
+"""
+Export ingested sessions to partitioned Parquet or Arrow IPC datasets.
+
+Laps, Weather and Telemetry of a session are written under
+``<export_dir>/<Table>/season=<year>/event=<event name>/session=<session>/``,
+with an extra ``driver=<abbreviation>`` level for Laps and Telemetry. Columns
+keep their SQLite types, so lap, telemetry and weather times are epoch
+milliseconds. Bulk analytics can then read them with Arrow instead of going
+through SQLite:
+
+    python -m db.export --db db/Bahrain_2023_Q.db --out exports --format arrow
+
+    from db.export import read_table
+    telemetry = read_table('exports', 'Telemetry', format='arrow',
+                           columns=['datetime', 'speed_in_km'],
+                           drivers=['VER'], laps=[10, 11])
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+from urllib.parse import unquote
+from typing import Any, Literal
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from db.telemetry_codec import decode_lap_telemetry, lap_channels
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:
+    pa = None  # type: ignore[assignment]
+
+console = Console(style="chartreuse1 on grey7")
+
+ExportFormat = Literal['parquet', 'arrow']
+EXPORT_FORMATS: tuple[str, ...] = ('parquet', 'arrow')
+
+# Table -> partition levels below the session
+EXPORT_TABLES: dict[str, tuple[str, ...]] = {
+    'Laps': ('driver',),
+    'Weather': (),
+    'Telemetry': ('driver',),
+}
+
+# Declared SQLite column type -> Arrow type, so every partition of a table
+# gets the same schema even when a session has a column that is all NULL
+_ARROW_TYPES: dict[str, str] = {
+    'INTEGER': 'int64', 'REAL': 'float64', 'TEXT': 'string',
+    'BOOLEAN': 'bool', 'DATETIME': 'timestamp[ns]',
+    'DATE': 'timestamp[ns]', 'BLOB': 'binary',
+}
+# Columns whose stored values don't match their declared type: RPM is
+# declared INTEGER but averaged by the 'mean' resample strategy, and
+# is_DRS_open holds FastF1's DRS status codes rather than a flag
+_COLUMN_TYPES: dict[str, str] = {
+    'RPM': 'float64', 'is_DRS_open': 'int64', 'lap_number': 'int64'}
+
+# LapTelemetry channel -> Telemetry column
+_LAP_CHANNEL_COLUMNS: dict[str, str] = {
+    'speed': 'speed_in_km', 'rpm': 'RPM', 'gear': 'gear_number',
+    'throttle': 'throttle_input', 'brake': 'is_brake_pressed',
+    'drs': 'is_DRS_open', 'x': 'x_position', 'y': 'y_position',
+    'z': 'z_position', 'off_track': 'is_off_track',
+}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Exporting and reading datasets requires pyarrow, install it first")
+
+
+def _file_format(format: ExportFormat) -> str:
+    """Map an export format to the pyarrow.dataset format name."""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format '{format}', expected one of {EXPORT_FORMATS}")
+    return 'ipc' if format == 'arrow' else 'parquet'
+
+
+def to_arrow(conn: sqlite3.Connection, table: str, frame: pd.DataFrame) -> "pa.Table":
+    """
+    Convert rows read from an ingestion table to an Arrow table.
+
+    Column types come from the table's declared SQLite types rather than
+    from the values, so every chunk or partition of a table gets the same
+    schema even when a column is all NULL. DATETIME text becomes Arrow
+    timestamps. Columns the table doesn't declare keep their pandas type.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the ingestion database.
+        table (str): Table the rows were read from.
+        frame (pd.DataFrame): The rows.
+
+    Returns:
+        pa.Table: The rows with the table's Arrow schema.
+    """
+    _require_pyarrow()
+    declared = {name: column_type.upper() for _, name, column_type, *_ in
+                conn.execute(f"PRAGMA table_info({table})")}
+    fields = []
+    for column in frame.columns:
+        if column in _COLUMN_TYPES:
+            arrow_type = pa.type_for_alias(_COLUMN_TYPES[column])
+        elif column in declared:
+            arrow_type = pa.type_for_alias(_ARROW_TYPES.get(declared[column], 'string'))
+        else:
+            arrow_type = pa.Schema.from_pandas(frame[[column]], preserve_index=False).field(column).type
+        if pa.types.is_timestamp(arrow_type) and not pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame = frame.assign(**{column: pd.to_datetime(
+                frame[column].replace('NaT', None), format='mixed')})
+        fields.append(pa.field(column, arrow_type))
+    return pa.Table.from_pandas(frame, schema=pa.schema(fields), preserve_index=False)
+
+
+def _session_partition(conn: sqlite3.Connection, session_id: int) -> dict[str, Any]:
+    """Get the season, event and session partition values of a session."""
+    row = conn.execute('''
+        SELECT CAST(strftime('%Y', e.event_date) AS INTEGER), e.event_name, s.session_type
+        FROM Sessions s
+        JOIN Event e ON s.event_id = e.event_id
+        WHERE s.session_id = ?
+    ''', (session_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"Session {session_id} does not exist")
+    return {'season': row[0], 'event': row[1], 'session': row[2]}
+
+
+def session_telemetry(conn: sqlite3.Connection, session_id: int) -> pd.DataFrame:
+    """
+    Read the telemetry of a session, from Telemetry rows or, when the
+    session only has packed laps, from LapTelemetry.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the ingestion database.
+        session_id (int): The session.
+
+    Returns:
+        pd.DataFrame: Samples with the Telemetry table's columns except
+        telemetry_id, plus lap_number.
+    """
+    rows = pd.read_sql_query('''
+        SELECT t.*, l.lap_number
+        FROM Telemetry t
+        LEFT JOIN Laps l ON t.lap_id = l.lap_id
+        WHERE t.session_id = ?
+    ''', conn, params=(session_id,))
+    if not rows.empty:
+        return rows.drop(columns=['telemetry_id'])
+
+    weather = conn.execute(
+        "SELECT datetime, weather_id FROM Weather WHERE session_id = ? AND datetime IS NOT NULL ORDER BY datetime",
+        (session_id,)).fetchall()
+    weather_ms = np.array([row[0] for row in weather], dtype='int64')
+    weather_ids = pd.Series([row[1] for row in weather], dtype='Int64')
+
+    laps = []
+    for lap_id, lap_number, driver_id, start_ms, quantized, compression, blob in conn.execute('''
+        SELECT lt.lap_id, l.lap_number, lt.driver_id, lt.start_epoch_ms,
+               lt.is_quantized, lt.compression, lt.samples
+        FROM LapTelemetry lt
+        JOIN Laps l ON lt.lap_id = l.lap_id
+        WHERE lt.session_id = ?
+    ''', (session_id,)):
+        channels = lap_channels(decode_lap_telemetry(
+            blob, bool(quantized), compression), bool(quantized))
+        lap = pd.DataFrame({column: channels[channel]
+                            for channel, column in _LAP_CHANNEL_COLUMNS.items()})
+        lap.insert(0, 'session_id', session_id)
+        lap.insert(1, 'lap_id', lap_id)
+        lap.insert(2, 'driver_id', driver_id)
+        lap['datetime'] = start_ms + channels['time_ms'].astype('int64')
+        # The latest weather sample at or before each sample, like the
+        # weather_id of Telemetry rows; -1 (none) reindexes to missing
+        positions = np.searchsorted(weather_ms, lap['datetime'].to_numpy(), side='right') - 1
+        lap['weather_id'] = weather_ids.reindex(positions).to_numpy()
+        lap['lap_number'] = lap_number
+        laps.append(lap)
+    return pd.concat(laps, ignore_index=True) if laps else rows.drop(columns=['telemetry_id'])
+
+
+def export_session(conn: sqlite3.Connection, session_id: int, export_dir: str,
+                   format: ExportFormat = 'parquet') -> dict[str, int]:
+    """
+    Export the Laps, Weather and Telemetry of a session.
+
+    Re-exporting a session replaces its partitions.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the ingestion database.
+        session_id (int): The session to export.
+        export_dir (str): Root directory of the datasets.
+        format (ExportFormat): 'parquet' or 'arrow' (Arrow IPC files, which
+            :func:`read_table` memory-maps).
+
+    Returns:
+        dict[str, int]: Rows exported per table.
+    """
+    _require_pyarrow()
+    file_format = _file_format(format)
+    partition = _session_partition(conn, session_id)
+
+    frames = {
+        'Laps': pd.read_sql_query(
+            "SELECT * FROM Laps WHERE session_id = ?", conn, params=(session_id,)),
+        'Weather': pd.read_sql_query(
+            "SELECT * FROM Weather WHERE session_id = ?", conn, params=(session_id,)),
+        'Telemetry': session_telemetry(conn, session_id),
+    }
+
+    abbreviations = dict(conn.execute("SELECT driver_id, abbreviation FROM Drivers").fetchall())
+    exported = {}
+    for table, frame in frames.items():
+        frame = frame.assign(**partition)
+        partition_columns = ['season', 'event', 'session']
+        if 'driver' in EXPORT_TABLES[table]:
+            frame['driver'] = frame['driver_id'].map(abbreviations)
+            partition_columns.append('driver')
+
+        arrow_table = to_arrow(conn, table, frame)
+        ds.write_dataset(
+            arrow_table, os.path.join(export_dir, table), format=file_format,
+            partitioning=ds.partitioning(
+                arrow_table.select(partition_columns).schema, flavor='hive'),
+            existing_data_behavior='delete_matching',
+            basename_template=f"part-{{i}}.{'arrow' if format == 'arrow' else 'parquet'}",
+        )
+        exported[table] = len(frame)
+    return exported
+
+
+def remove_event(export_dir: str, season: int, event_name: str) -> None:
+    """
+    Remove the partitions of an event from every exported table, e.g. after
+    the event was renamed.
+
+    Args:
+        export_dir (str): Root directory of the datasets.
+        season (int): Season of the event.
+        event_name (str): Name the event was exported under.
+    """
+    for table in EXPORT_TABLES:
+        season_dir = os.path.join(export_dir, table, f"season={season}")
+        if not os.path.isdir(season_dir):
+            continue
+        # Partition values are URL-encoded in the directory names
+        for name in os.listdir(season_dir):
+            if unquote(name) == f"event={event_name}":
+                shutil.rmtree(os.path.join(season_dir, name))
+
+
+def open_dataset(export_dir: str, table: str, format: ExportFormat = 'parquet') -> "ds.Dataset":
+    """
+    Open an exported table as a pyarrow dataset.
+
+    Arrow IPC files are memory-mapped, so scans read straight from the page
+    cache instead of copying the files into memory.
+
+    Args:
+        export_dir (str): Root directory of the datasets.
+        table (str): 'Laps', 'Weather' or 'Telemetry'.
+        format (ExportFormat): Format the table was exported in.
+
+    Returns:
+        ds.Dataset: The dataset, with the partition columns as fields.
+    """
+    _require_pyarrow()
+    if table not in EXPORT_TABLES:
+        raise ValueError(
+            f"Unknown table '{table}', expected one of {tuple(EXPORT_TABLES)}")
+    return ds.dataset(
+        os.path.join(export_dir, table), format=_file_format(format),
+        partitioning='hive', filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+
+def read_table(export_dir: str, table: str, format: ExportFormat = 'parquet',
+               columns: list[str] | None = None, season: int | None = None,
+               event: str | None = None, session: str | None = None,
+               drivers: list[str] | None = None,
+               laps: list[int] | None = None) -> "pa.Table":
+    """
+    Read an exported table, pushing projection and predicates into the scan.
+
+    Partition filters (season, event, session, drivers) skip whole
+    directories; the lap filter is evaluated while scanning the files.
+
+    Args:
+        export_dir (str): Root directory of the datasets.
+        table (str): 'Laps', 'Weather' or 'Telemetry'.
+        format (ExportFormat): Format the table was exported in.
+        columns (list[str] | None): Columns to read, all when None.
+        season (int | None): Only this season.
+        event (str | None): Only this event name.
+        session (str | None): Only this session type.
+        drivers (list[str] | None): Only these driver abbreviations.
+        laps (list[int] | None): Only these lap numbers.
+
+    Returns:
+        pa.Table: The matching rows.
+    """
+    dataset = open_dataset(export_dir, table, format)
+    conditions = []
+    if season is not None:
+        conditions.append(pc.field('season') == season)
+    if event is not None:
+        conditions.append(pc.field('event') == event)
+    if session is not None:
+        conditions.append(pc.field('session') == session)
+    if drivers is not None:
+        conditions.append(pc.field('driver').isin(drivers))
+    if laps is not None:
+        conditions.append(pc.field('lap_number').isin(np.asarray(laps, dtype='int64')))
+
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export ingested sessions to Parquet or Arrow datasets")
+    parser.add_argument('--db', required=True,
+                        help="Path to the SQLite database file")
+    parser.add_argument('--out', required=True,
+                        help="Root directory of the datasets")
+    parser.add_argument('--format', default='parquet', choices=EXPORT_FORMATS)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        for (session_id,) in conn.execute("SELECT session_id FROM Sessions").fetchall():
+            exported = export_session(conn, session_id, args.out, args.format)
+            console.print(f"> Exported session {session_id}: {exported}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
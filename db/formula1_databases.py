@@ -1,38 +1,499 @@
-from typing import Any, cast
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Literal, cast
+import hashlib
+import os
+import re
 import sqlite3
+import numpy as np
 import pandas as pd
-from datetime import datetime
 from fastf1.core import Session
-import fastf1
 from rich.console import Console
+from db.reporting import MB, IngestReport, current_rss_bytes
+from db.telemetry import (RESAMPLE_STRATEGIES, ResampleStrategy, TelemetryArrays,
+                          concat_telemetry, extract_session_telemetry, summarize_laps)
+from db.telemetry_codec import LapTelemetryCodec, encode_laps
+from db.export import (EXPORT_FORMATS, ExportFormat, export_session, remove_event,
+                       session_telemetry)
 
 console = Console(style="chartreuse1 on grey7")
 
+# Stored in PRAGMA user_version; bump it together with a new migration step in
+# FastF1ToSQL.__migrate_schema whenever the schema changes.
+SCHEMA_VERSION = 10
+
+# Timestamps stored as integer milliseconds since the Unix epoch, NULL when
+# missing, so range predicates on them can use indexes
+EPOCH_MS_COLUMNS: dict[str, tuple[str, ...]] = {
+    'Laps': ('lap_start_time_in_datetime', 'pin_in_time_in_datetime',
+             'pin_out_time_in_datetime'),
+    'Telemetry': ('datetime',),
+    'Weather': ('datetime',),
+}
+
+# Tables linked to the weather sample in effect at each row's time: table ->
+# (primary key, epoch ms column). The analysis queries equi-join on weather_id.
+WEATHER_LINKED_TABLES: dict[str, tuple[str, str]] = {
+    'Laps': ('lap_id', 'lap_start_time_in_datetime'),
+    'Telemetry': ('telemetry_id', 'datetime'),
+}
+
+# SessionFingerprints row recording what was last exported for a session, so
+# an export that failed after the session was committed is retried
+EXPORT_FINGERPRINT = 'export'
+
+# Tables upserted on every run, whose fingerprints only decide whether the
+# analysis tables, which copy their names, are refreshed
+METADATA_TABLES: tuple[str, ...] = ('Event', 'Sessions')
+
+# Tables whose rows belong to a driver, referenced by driver_id
+DRIVER_TABLES: tuple[str, ...] = ('Laps', 'Telemetry', 'LapTelemetry', 'LapTelemetrySummary')
+
+# Per-session summaries the agent's tools read instead of aggregating the raw
+# tables on every call, see FastF1ToSQL.__refresh_analysis_tables. Older
+# versions created them as views.
+ANALYSIS_TABLES: tuple[str, ...] = (
+    'DriverPerformanceSummaryWithWeather', 'TyrePerformanceAnalysisWithWeather',
+    'WeatherImpactAnalysis', 'EventPerformanceOverview',
+    'TelemetryAnalysisWithWeather',
+)
+
+# Where telemetry is written: one row per sample in Telemetry, one packed
+# record per lap in LapTelemetry (see db.telemetry_codec), or both.
+TelemetryStorage = Literal['rows', 'laps', 'both']
+TELEMETRY_STORAGES: tuple[str, ...] = ('rows', 'laps', 'both')
+
+# Indexes the ingestion itself relies on: natural keys for the upserts and
+# session_id lookups for partition rewrites. They always exist. Laps is looked
+# up by its UNIQUE (session_id, driver_id, lap_number) constraint.
+INGEST_INDEXES: dict[str, str] = {
+    'idx_drivers_natural_key': 'CREATE UNIQUE INDEX IF NOT EXISTS idx_drivers_natural_key ON Drivers(season, abbreviation)',
+    'idx_event_natural_key': 'CREATE UNIQUE INDEX IF NOT EXISTS idx_event_natural_key ON Event(event_name, event_date)',
+    'idx_sessions_natural_key': 'CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_natural_key ON Sessions(event_id, session_type)',
+    'idx_weather_natural_key': 'CREATE UNIQUE INDEX IF NOT EXISTS idx_weather_natural_key ON Weather(session_id, datetime)',
+    'idx_telemetry_session_id': 'CREATE INDEX IF NOT EXISTS idx_telemetry_session_id ON Telemetry(session_id)',
+    'idx_lap_telemetry_session_id': 'CREATE INDEX IF NOT EXISTS idx_lap_telemetry_session_id ON LapTelemetry(session_id)',
+    'idx_lap_telemetry_summary_session_id': 'CREATE INDEX IF NOT EXISTS idx_lap_telemetry_summary_session_id ON LapTelemetrySummary(session_id)',
+}
+
+# Indexes that only serve queries. Bulk loads drop them and build them again
+# once every row is written, see FastF1ToSQL.bulk_load. The plans of the
+# tools/sql queries and ANALYSIS_REFRESH_QUERIES rely on them, which
+# python -m db.query_plans checks.
+SECONDARY_INDEXES: dict[str, str] = {
+    # The tool queries resolve a driver's abbreviation to the ids of all
+    # their seasons
+    'idx_drivers_abbreviation': 'CREATE INDEX IF NOT EXISTS idx_drivers_abbreviation ON Drivers(abbreviation)',
+    # Covers tyre_performance, grouped in index order, and finds the laps of
+    # lap_telemetry_summary and telemetry_analysis
+    'idx_laps_tyre_performance': 'CREATE INDEX IF NOT EXISTS idx_laps_tyre_performance ON Laps(driver_id, lap_number, tyre_compound, tyre_life_in_laps, lap_time_in_seconds, longest_strait_speed_trap_in_km, is_fresh_tyre, weather_id)',
+    # Groups the driver and tyre analysis refreshes of a session
+    'idx_laps_session_tyre': 'CREATE INDEX IF NOT EXISTS idx_laps_session_tyre ON Laps(session_id, driver_id, tyre_compound)',
+    'idx_laps_weather_id': 'CREATE INDEX IF NOT EXISTS idx_laps_weather_id ON Laps(weather_id)',
+    'idx_telemetry_lap_id': 'CREATE INDEX IF NOT EXISTS idx_telemetry_lap_id ON Telemetry(lap_id)',
+    'idx_weather_datetime': 'CREATE INDEX IF NOT EXISTS idx_weather_datetime ON Weather(datetime)',
+    'idx_event_date': 'CREATE INDEX IF NOT EXISTS idx_event_date ON Event(event_date)',
+    'idx_telemetry_sample_slot': 'CREATE INDEX IF NOT EXISTS idx_telemetry_sample_slot ON Telemetry(lap_id, sample_slot) WHERE sample_slot IS NOT NULL',
+    # driver_performance reads the table in this order
+    'idx_driver_performance_driver': 'CREATE INDEX IF NOT EXISTS idx_driver_performance_driver ON DriverPerformanceSummaryWithWeather(driver_name, session_id)',
+}
+
+# Indexes of older versions that the ones above replace: Laps(driver_name),
+# Laps(driver_id, lap_number) and Laps(session_id) are prefixes of
+# idx_laps_tyre_performance and the Laps natural key, Weather(session_id) is one
+# of idx_weather_natural_key, and no query filters or sorts Telemetry by
+# datetime.
+RETIRED_INDEXES: tuple[str, ...] = (
+    'idx_laps_driver_name', 'idx_weather_session_id', 'idx_laps_driver_lap',
+    'idx_laps_session_id', 'idx_telemetry_datetime',
+)
+
+# The per-session rows of each ANALYSIS_TABLES table, selected for the
+# :session_id being written, see FastF1ToSQL.__refresh_analysis_tables.
+ANALYSIS_REFRESH_QUERIES: dict[str, str] = {
+    # 1. Driver Performance Summary with Weather
+    'DriverPerformanceSummaryWithWeather': '''
+    SELECT 
+        s.session_id,
+        d.abbreviation AS driver_name,
+        e.event_name,
+        s.session_type,
+        t.track_name,
+        COUNT(l.lap_id) AS total_laps,
+        AVG(l.lap_time_in_seconds) AS avg_lap_time,
+        MIN(l.lap_time_in_seconds) AS best_lap_time,
+        AVG(l.sector_1_time_in_seconds) AS avg_sector1_time,
+        AVG(l.sector_2_time_in_seconds) AS avg_sector2_time,
+        AVG(l.sector_3_time_in_seconds) AS avg_sector3_time,
+        AVG(l.finish_line_speed_trap_in_km) AS avg_finish_line_speed,
+        COUNT(CASE WHEN l.is_personal_best THEN 1 END) AS personal_best_laps,
+        AVG(w.air_temperature_in_celsius) AS avg_air_temp,
+        AVG(w.track_temperature_in_celsius) AS avg_track_temp,
+        SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage
+    FROM Laps l
+    JOIN Sessions s ON l.session_id = s.session_id
+    JOIN Tracks t ON s.track_id = t.track_id
+    JOIN Event e ON s.event_id = e.event_id
+    JOIN Drivers d ON l.driver_id = d.driver_id
+    LEFT JOIN Weather w ON w.weather_id = l.weather_id
+    WHERE l.session_id = :session_id
+    GROUP BY l.driver_id
+    ''',
+    # 2. Tyre Performance Analysis with Weather
+    'TyrePerformanceAnalysisWithWeather': '''
+    SELECT 
+        s.session_id,
+        d.abbreviation AS driver_name,
+        e.event_name,
+        s.session_type,
+        t.track_name,
+        l.tyre_compound,
+        AVG(l.tyre_life_in_laps) AS avg_tyre_life,
+        AVG(l.lap_time_in_seconds) AS avg_lap_time,
+        AVG(l.longest_strait_speed_trap_in_km) AS avg_top_speed,
+        COUNT(CASE WHEN l.is_fresh_tyre THEN 1 END) AS fresh_tyre_laps,
+        COUNT(CASE WHEN NOT l.is_fresh_tyre THEN 1 END) AS used_tyre_laps,
+        AVG(w.track_temperature_in_celsius) AS avg_track_temp,
+        AVG(w.air_temperature_in_celsius) AS avg_air_temp
+    FROM Laps l
+    JOIN Sessions s ON l.session_id = s.session_id
+    JOIN Tracks t ON s.track_id = t.track_id
+    JOIN Event e ON s.event_id = e.event_id
+    JOIN Drivers d ON l.driver_id = d.driver_id
+    LEFT JOIN Weather w ON w.weather_id = l.weather_id
+    WHERE l.session_id = :session_id
+    GROUP BY l.driver_id, l.tyre_compound
+    ''',
+    # 3. Weather Impact Analysis
+    'WeatherImpactAnalysis': '''
+    SELECT 
+        s.session_id,
+        e.event_name,
+        s.session_type,
+        t.track_name,
+        AVG(w.air_temperature_in_celsius) AS avg_air_temp,
+        AVG(w.track_temperature_in_celsius) AS avg_track_temp,
+        AVG(w.relative_air_humidity_in_percentage) AS avg_humidity,
+        AVG(w.wind_speed_in_meters_per_seconds) AS avg_wind_speed,
+        SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage,
+        AVG(l.lap_time_in_seconds) AS avg_lap_time,
+        MIN(l.lap_time_in_seconds) AS best_lap_time
+    FROM Weather w
+    JOIN Sessions s ON w.session_id = s.session_id
+    JOIN Tracks t ON s.track_id = t.track_id
+    JOIN Event e ON s.event_id = e.event_id
+    -- Laps link to weather of their own session; the session bound lets the
+    -- planner search the Laps natural key rather than scan small tables
+    JOIN Laps l ON l.weather_id = w.weather_id AND l.session_id = w.session_id
+    WHERE w.session_id = :session_id
+    GROUP BY s.session_id
+    ''',
+    # 4. Event Performance Overview; drivers are counted in the order of the
+    # Laps natural key rather than sorted for a COUNT(DISTINCT)
+    'EventPerformanceOverview': '''
+    SELECT 
+        s.session_id,
+        e.event_name,
+        e.country,
+        e.location,
+        s.session_type,
+        (SELECT COUNT(*) FROM (
+            SELECT DISTINCT driver_id FROM Laps WHERE session_id = :session_id
+        )) AS driver_count,
+        AVG(l.lap_time_in_seconds) AS avg_lap_time,
+        MIN(l.lap_time_in_seconds) AS best_lap_time,
+        MAX(l.finish_line_speed_trap_in_km) AS max_finish_line_speed,
+        AVG(w.air_temperature_in_celsius) AS avg_air_temp,
+        AVG(w.track_temperature_in_celsius) AS avg_track_temp,
+        SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage
+    FROM Event e
+    JOIN Sessions s ON e.event_id = s.event_id
+    JOIN Laps l ON s.session_id = l.session_id
+    LEFT JOIN Weather w ON w.weather_id = l.weather_id
+    WHERE l.session_id = :session_id
+    GROUP BY s.session_id
+    ''',
+    # 5. Telemetry Analysis with Weather, over the sampled rows of each
+    # lap (telemetry_samples_per_lap)
+    'TelemetryAnalysisWithWeather': '''
+    SELECT 
+        s.session_id,
+        l.lap_id,
+        d.abbreviation AS driver_name,
+        e.event_name,
+        s.session_type,
+        t.track_name,
+        l.lap_number,
+        l.lap_time_in_seconds,
+        AVG(tel.speed_in_km) AS avg_speed,
+        MAX(tel.speed_in_km) AS max_speed,
+        AVG(tel.RPM) AS avg_RPM,
+        MAX(tel.RPM) AS max_RPM,
+        AVG(tel.throttle_input) AS avg_throttle,
+        SUM(CASE WHEN tel.is_brake_pressed THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS brake_percentage,
+        SUM(CASE WHEN tel.is_DRS_open THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS drs_usage_percentage,
+        SUM(CASE WHEN tel.is_off_track THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS off_track_percentage,
+        AVG(w.air_temperature_in_celsius) AS avg_air_temp,
+        AVG(w.track_temperature_in_celsius) AS avg_track_temp,
+        AVG(w.wind_speed_in_meters_per_seconds) AS avg_wind_speed
+    FROM Laps l
+    JOIN Sessions s ON l.session_id = s.session_id
+    JOIN Tracks t ON s.track_id = t.track_id
+    JOIN Event e ON s.event_id = e.event_id
+    JOIN Drivers d ON l.driver_id = d.driver_id
+    JOIN Telemetry tel ON l.lap_id = tel.lap_id AND tel.sample_slot IS NOT NULL
+    LEFT JOIN Weather w ON w.weather_id = tel.weather_id
+    WHERE l.session_id = :session_id
+    -- The order of the Laps natural key, which finds the session's laps
+    GROUP BY l.driver_id, l.lap_number, l.lap_id
+    ''',
+}
+
+
+def _epoch_ms(timestamps: pd.Series) -> pd.Series:
+    """
+    Convert a datetime column to milliseconds since the Unix epoch.
+
+    Args:
+        timestamps (pd.Series): Timezone-naive datetime64 column.
+
+    Returns:
+        pd.Series: Nullable integer milliseconds, missing for NaT.
+    """
+    milliseconds = timestamps.to_numpy(dtype='datetime64[ms]').astype('int64')
+    return pd.Series(milliseconds, index=timestamps.index,
+                     dtype='Int64').mask(timestamps.isna())
+
+
+def _assign_lap_ids(sample_times: pd.Series, lap_starts: np.ndarray,
+                    lap_ends: np.ndarray, lap_ids: np.ndarray) -> np.ndarray:
+    """
+    Find the lap each telemetry sample belongs to with a sorted as-of join.
+
+    Args:
+        sample_times (pd.Series): Datetime of each telemetry sample.
+        lap_starts (np.ndarray): Sorted start datetime of each lap.
+        lap_ends (np.ndarray): End datetime of each lap.
+        lap_ids (np.ndarray): lap_id of each lap.
+
+    Returns:
+        np.ndarray: The lap_id of each sample, or None when the sample does
+        not fall inside any lap.
+    """
+    times = sample_times.to_numpy(dtype='datetime64[ns]')
+    if not len(lap_starts):
+        return np.full(len(times), None, dtype=object)
+
+    positions = np.searchsorted(lap_starts, times, side='right') - 1
+    clipped = positions.clip(min=0)
+    matched = (positions >= 0) & (times < lap_ends[clipped])
+    return np.where(matched, lap_ids[clipped], None)
+
+
+def _assign_weather_ids(times_ms: pd.Series, weather_ms: np.ndarray,
+                        weather_ids: np.ndarray) -> np.ndarray:
+    """
+    Find the weather sample in effect at each time with a sorted as-of join.
+
+    Args:
+        times_ms (pd.Series): Epoch milliseconds, missing values allowed.
+        weather_ms (np.ndarray): Sorted epoch milliseconds of the session's
+            weather samples.
+        weather_ids (np.ndarray): weather_id of each weather sample.
+
+    Returns:
+        np.ndarray: The weather_id of the latest sample at or before each
+        time, or None when the time is missing or precedes every sample.
+    """
+    times = times_ms.to_numpy(dtype='float64', na_value=np.nan)
+    if not len(weather_ms):
+        return np.full(len(times), None, dtype=object)
+
+    positions = np.searchsorted(weather_ms, times, side='right') - 1
+    matched = (positions >= 0) & ~np.isnan(times)
+    return np.where(matched, weather_ids[positions.clip(min=0)], None)
+
+
+def _assign_sample_slots(lap_ids: pd.Series, times_ms: pd.Series,
+                         per_lap: int) -> np.ndarray:
+    """
+    Pick up to ``per_lap`` samples of every lap, evenly spaced in time.
+
+    Each lap's time span is cut into ``per_lap`` equal strata and the sample
+    nearest to the middle of each stratum is picked, so the same samples are
+    picked on every run. Laps with fewer samples have all of them picked;
+    samples repeated at the same timestamp are picked at most once.
+
+    Args:
+        lap_ids (pd.Series): lap_id of each sample, missing outside laps.
+        times_ms (pd.Series): Epoch milliseconds of each sample.
+        per_lap (int): Number of samples to pick per lap.
+
+    Returns:
+        np.ndarray: The slot of every picked sample, numbered from 0 in time
+        order within its lap, and None for the other samples.
+    """
+    slots = np.full(len(lap_ids), None, dtype=object)
+    frame = pd.DataFrame({
+        'lap_id': lap_ids.to_numpy(dtype='float64', na_value=np.nan),
+        'time': times_ms.to_numpy(dtype='float64', na_value=np.nan),
+    }).dropna().sort_values(['lap_id', 'time'], kind='stable') \
+        .drop_duplicates(['lap_id', 'time'])
+    if frame.empty or per_lap <= 0:
+        return slots
+
+    lap_codes = pd.factorize(frame['lap_id'])[0]
+    times = frame['time'].to_numpy(dtype='int64')
+    starts = np.flatnonzero(np.r_[True, lap_codes[1:] != lap_codes[:-1]])
+    ends = np.r_[starts[1:], len(times)]
+    spans = times[ends - 1] - times[starts]
+
+    # Lay the laps end to end on one axis so every lap is searched at once
+    stride = spans.max() + 1
+    keys = lap_codes * stride + (times - times[starts][lap_codes])
+    target_laps = np.repeat(np.arange(len(starts)), per_lap)
+    strata = np.tile((np.arange(per_lap) + 0.5) / per_lap, len(starts))
+    targets = target_laps * stride + spans[target_laps] * strata
+
+    after = np.searchsorted(keys, targets)
+    lower = np.clip(after - 1, starts[target_laps], ends[target_laps] - 1)
+    upper = np.clip(after, starts[target_laps], ends[target_laps] - 1)
+    picks = np.unique(np.where(
+        np.abs(keys[upper] - targets) < np.abs(keys[lower] - targets), upper, lower))
+
+    pick_laps = lap_codes[picks]
+    pick_slots = np.arange(len(picks)) - np.searchsorted(pick_laps, pick_laps)
+    slots[frame.index[picks]] = pick_slots.tolist()
+    return slots
+
+
+def _fingerprint(*frames: pd.DataFrame | None, salt: str = '') -> str:
+    """
+    Hash the content of one or more frames.
+
+    Args:
+        *frames (pd.DataFrame | None): Frames to hash, in order. None stands
+            for missing data.
+        salt (str): Extra text mixed into the hash, e.g. settings that change
+            how the frames are written.
+
+    Returns:
+        str: Hex digest that changes whenever a value, a column or the salt
+        changes.
+    """
+    digest = hashlib.blake2b(salt.encode(), digest_size=16)
+    for frame in frames:
+        if frame is None:
+            digest.update(b'\0')
+            continue
+        digest.update(','.join(map(str, frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(
+            frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _frame_to_records(frame: pd.DataFrame) -> Iterator[tuple[Any, ...]]:
+    """
+    Convert a frame into DB-API parameter tuples.
+
+    Missing values become None and numpy scalars become Python scalars, so
+    the tuples can be passed straight to ``executemany``.
+
+    Args:
+        frame (pd.DataFrame): The frame to convert.
+
+    Returns:
+        Iterator[tuple[Any, ...]]: One tuple per row, in column order.
+    """
+    records = frame.astype(object).where(frame.notna(), None)
+    return records.itertuples(index=False, name=None)
+
 
 class FastF1ToSQL:
     """
     A class to convert FastF1 data into a SQLite database.
     """
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(self, db_path: str, resample_interval: str | None = '100ms',
+                 resample_strategy: ResampleStrategy = 'first',
+                 telemetry_workers: int = 1,
+                 telemetry_batch_size: int = 50_000,
+                 max_memory_mb: float | None = None,
+                 telemetry_storage: TelemetryStorage = 'rows',
+                 lap_codec: LapTelemetryCodec = LapTelemetryCodec(),
+                 export_dir: str | None = None,
+                 export_format: ExportFormat = 'parquet',
+                 telemetry_samples_per_lap: int = 100) -> None:
         """
         Initialize the FastF1ToSQL class.
 
         Args:
             db_path (str): Path to the SQLite database file.
+            resample_interval (str | None): Telemetry bucket width, for example
+                '100ms' or '1s'. None stores every telemetry sample.
+            resample_strategy (ResampleStrategy): How telemetry samples in the
+                same bucket are reduced ('first', 'mean' or 'minmax').
+            telemetry_workers (int): Number of processes used to extract
+                telemetry, one driver per task. 1 extracts in-process.
+            telemetry_batch_size (int): Number of telemetry rows buffered before
+                they are written to the database.
+            max_memory_mb (float | None): Resident memory above which buffered
+                telemetry is written immediately, regardless of the batch size.
+            telemetry_storage (TelemetryStorage): Write telemetry as 'rows'
+                (Telemetry table), as packed 'laps' (LapTelemetry table) or
+                'both'. TelemetryAnalysisWithWeather reads the rows.
+            lap_codec (LapTelemetryCodec): Quantization and compression of
+                the LapTelemetry records.
+            export_dir (str | None): Also export every written session's Laps,
+                Weather and Telemetry to partitioned datasets under this
+                directory, see db.export.
+            export_format (ExportFormat): Format of the exported datasets,
+                'parquet' or 'arrow'.
+            telemetry_samples_per_lap (int): Telemetry rows per lap, evenly
+                spaced in time, that get a sample_slot.
+                TelemetryAnalysisWithWeather only reads those.
         """
+        if resample_strategy not in RESAMPLE_STRATEGIES:
+            raise ValueError(
+                f"Unknown resample strategy '{resample_strategy}', expected one of {RESAMPLE_STRATEGIES}")
+        if telemetry_storage not in TELEMETRY_STORAGES:
+            raise ValueError(
+                f"Unknown telemetry storage '{telemetry_storage}', expected one of {TELEMETRY_STORAGES}")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}")
         self.db_path = db_path
+        self.resample_interval = resample_interval
+        self.resample_strategy = resample_strategy
+        self.telemetry_workers = telemetry_workers
+        self.telemetry_batch_size = telemetry_batch_size
+        self.max_memory_mb = max_memory_mb
+        self.telemetry_storage = telemetry_storage
+        self.lap_codec = lap_codec
+        self.export_dir = export_dir
+        self.export_format = export_format
+        self.telemetry_samples_per_lap = telemetry_samples_per_lap
+        self._report = IngestReport(db_path)
+        self._bulk_loading = False
+        # Name the event of the session being processed had before
+        # insert_event corrected it
+        self._renamed_event: str | None = None
         self.conn = sqlite3.connect(db_path, timeout=20)
         self.cursor = self.conn.cursor()
         self.__create_tables()
+        self.__migrate_schema()
+        self.__create_indexes()
 
     def __create_tables(self) -> None:
-        """Create all necessary tables and indexes if they don't exist."""
+        """Create all necessary tables if they don't exist."""
         self.cursor.executescript('''
+            -- One row per driver and season, so a driver changing teams
+            -- between seasons keeps both
             CREATE TABLE IF NOT EXISTS Drivers (
                 driver_id INTEGER PRIMARY KEY,
-                driver_name TEXT NOT NULL,
-                team TEXT NOT NULL
+                abbreviation TEXT NOT NULL,
+                full_name TEXT,
+                team TEXT,
+                season INTEGER
             );
 
             CREATE TABLE IF NOT EXISTS Tracks (
@@ -73,7 +534,7 @@ class FastF1ToSQL:
             CREATE TABLE IF NOT EXISTS Weather (
                 weather_id INTEGER PRIMARY KEY,
                 session_id INTEGER,
-                datetime DATETIME,
+                datetime INTEGER,
                 air_temperature_in_celsius REAL,
                 relative_air_humidity_in_percentage REAL,
                 air_pressure_in_mbar REAL,
@@ -87,7 +548,7 @@ class FastF1ToSQL:
             CREATE TABLE IF NOT EXISTS Laps (
                 lap_id INTEGER PRIMARY KEY,
                 session_id INTEGER,
-                driver_name TEXT NOT NULL,
+                driver_id INTEGER NOT NULL,
                 lap_number INTEGER NOT NULL,
                 stint INTEGER,
                 sector_1_speed_trap_in_km REAL,
@@ -103,17 +564,21 @@ class FastF1ToSQL:
                 sector_1_time_in_seconds REAL,
                 sector_2_time_in_seconds REAL,
                 sector_3_time_in_seconds REAL,
-                lap_start_time_in_datetime DATETIME,
-                pin_in_time_in_datetime DATETIME,
-                pin_out_time_in_datetime DATETIME,
+                lap_start_time_in_datetime INTEGER,
+                pin_in_time_in_datetime INTEGER,
+                pin_out_time_in_datetime INTEGER,
+                weather_id INTEGER,
                 FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
-                UNIQUE (session_id, driver_name, lap_number)
+                FOREIGN KEY (driver_id) REFERENCES Drivers(driver_id),
+                FOREIGN KEY (weather_id) REFERENCES Weather(weather_id),
+                UNIQUE (session_id, driver_id, lap_number)
             );
 
             CREATE TABLE IF NOT EXISTS Telemetry (
                 telemetry_id INTEGER PRIMARY KEY,
+                session_id INTEGER,
                 lap_id INTEGER,
-                driver_name TEXT NOT NULL,
+                driver_id INTEGER NOT NULL,
                 speed_in_km REAL,
                 RPM INTEGER,
                 gear_number INTEGER,
@@ -124,49 +589,725 @@ class FastF1ToSQL:
                 y_position REAL,
                 z_position REAL,
                 is_off_track BOOLEAN,
-                datetime DATETIME,
+                datetime INTEGER,
+                weather_id INTEGER,
+                sample_slot INTEGER,
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
+                FOREIGN KEY (lap_id) REFERENCES Laps(lap_id),
+                FOREIGN KEY (driver_id) REFERENCES Drivers(driver_id),
+                FOREIGN KEY (weather_id) REFERENCES Weather(weather_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS LapTelemetry (
+                lap_id INTEGER PRIMARY KEY,
+                session_id INTEGER NOT NULL,
+                driver_id INTEGER NOT NULL,
+                start_epoch_ms INTEGER NOT NULL,
+                sample_count INTEGER NOT NULL,
+                is_quantized BOOLEAN NOT NULL,
+                compression TEXT,
+                samples BLOB NOT NULL,
                 FOREIGN KEY (lap_id) REFERENCES Laps(lap_id),
-                FOREIGN KEY (driver_name) REFERENCES Drivers(driver_name)
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
+                FOREIGN KEY (driver_id) REFERENCES Drivers(driver_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS LapTelemetrySummary (
+                lap_id INTEGER PRIMARY KEY,
+                session_id INTEGER NOT NULL,
+                driver_id INTEGER NOT NULL,
+                sample_count INTEGER NOT NULL,
+                avg_speed REAL,
+                max_speed REAL,
+                avg_RPM REAL,
+                max_RPM REAL,
+                avg_throttle REAL,
+                brake_percentage REAL,
+                drs_usage_percentage REAL,
+                off_track_percentage REAL,
+                throttle_on_distance_in_meters REAL,
+                avg_air_temp REAL,
+                avg_track_temp REAL,
+                avg_wind_speed REAL,
+                gear_histogram TEXT,
+                FOREIGN KEY (lap_id) REFERENCES Laps(lap_id),
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
+                FOREIGN KEY (driver_id) REFERENCES Drivers(driver_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS SessionFingerprints (
+                session_id INTEGER NOT NULL,
+                table_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (session_id, table_name),
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+            );
+
+            -- Bumped by every write that changes the data, so readers can
+            -- tell whether their cached results are still current
+            CREATE TABLE IF NOT EXISTS IngestGeneration (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL
             );
 
-            CREATE INDEX IF NOT EXISTS idx_laps_driver_name ON Laps(driver_name);
-            CREATE INDEX IF NOT EXISTS idx_laps_session_id ON Laps(session_id);
-            CREATE INDEX IF NOT EXISTS idx_telemetry_lap_id ON Telemetry(lap_id);
-            CREATE INDEX IF NOT EXISTS idx_telemetry_datetime ON Telemetry(datetime);
-            CREATE INDEX IF NOT EXISTS idx_weather_session_id ON Weather(session_id);
-            CREATE INDEX IF NOT EXISTS idx_weather_datetime ON Weather(datetime);
-            CREATE INDEX IF NOT EXISTS idx_event_date ON Event(event_date);
+            -- Analysis tables, refreshed per session by __refresh_analysis_tables
+            CREATE TABLE IF NOT EXISTS DriverPerformanceSummaryWithWeather (
+                session_id INTEGER NOT NULL,
+                driver_name TEXT NOT NULL,
+                event_name TEXT,
+                session_type TEXT,
+                track_name TEXT,
+                total_laps INTEGER,
+                avg_lap_time REAL,
+                best_lap_time REAL,
+                avg_sector1_time REAL,
+                avg_sector2_time REAL,
+                avg_sector3_time REAL,
+                avg_finish_line_speed REAL,
+                personal_best_laps INTEGER,
+                avg_air_temp REAL,
+                avg_track_temp REAL,
+                rain_percentage REAL,
+                PRIMARY KEY (session_id, driver_name),
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS TyrePerformanceAnalysisWithWeather (
+                session_id INTEGER NOT NULL,
+                driver_name TEXT NOT NULL,
+                event_name TEXT,
+                session_type TEXT,
+                track_name TEXT,
+                tyre_compound TEXT,
+                avg_tyre_life REAL,
+                avg_lap_time REAL,
+                avg_top_speed REAL,
+                fresh_tyre_laps INTEGER,
+                used_tyre_laps INTEGER,
+                avg_track_temp REAL,
+                avg_air_temp REAL,
+                PRIMARY KEY (session_id, driver_name, tyre_compound),
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS WeatherImpactAnalysis (
+                session_id INTEGER PRIMARY KEY,
+                event_name TEXT,
+                session_type TEXT,
+                track_name TEXT,
+                avg_air_temp REAL,
+                avg_track_temp REAL,
+                avg_humidity REAL,
+                avg_wind_speed REAL,
+                rain_percentage REAL,
+                avg_lap_time REAL,
+                best_lap_time REAL,
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS EventPerformanceOverview (
+                session_id INTEGER PRIMARY KEY,
+                event_name TEXT,
+                country TEXT,
+                location TEXT,
+                session_type TEXT,
+                driver_count INTEGER,
+                avg_lap_time REAL,
+                best_lap_time REAL,
+                max_finish_line_speed REAL,
+                avg_air_temp REAL,
+                avg_track_temp REAL,
+                rain_percentage REAL,
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS TelemetryAnalysisWithWeather (
+                session_id INTEGER NOT NULL,
+                lap_id INTEGER NOT NULL,
+                driver_name TEXT,
+                event_name TEXT,
+                session_type TEXT,
+                track_name TEXT,
+                lap_number INTEGER,
+                lap_time_in_seconds REAL,
+                avg_speed REAL,
+                max_speed REAL,
+                avg_RPM REAL,
+                max_RPM REAL,
+                avg_throttle REAL,
+                brake_percentage REAL,
+                drs_usage_percentage REAL,
+                off_track_percentage REAL,
+                avg_air_temp REAL,
+                avg_track_temp REAL,
+                avg_wind_speed REAL,
+                PRIMARY KEY (session_id, lap_id),
+                FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
+                FOREIGN KEY (lap_id) REFERENCES Laps(lap_id)
+            );
         ''')
         self.conn.commit()
 
-    def process_session(self, session: Session) -> None:
+    def __migrate_schema(self) -> None:
+        """Upgrade databases written by older versions to SCHEMA_VERSION."""
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            # Before version 4 the analysis tables were views, reading the
+            # tables being migrated
+            views = [name for (name,) in self.cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'view'").fetchall()]
+            for view in views:
+                self.cursor.execute(f"DROP VIEW {view}")
+            if version < 1:
+                self.__migrate_to_natural_keys()
+            if version < 2:
+                self.__migrate_to_epoch_timestamps()
+            if version < 3:
+                self.__migrate_to_weather_links()
+            if version < 4:
+                # __create_tables skipped the tables while the views had
+                # their names
+                self.__create_tables()
+            if version < 6:
+                self.__migrate_to_sample_slots()
+            # Versions 7 and 9 retired indexes
+            if version < 9:
+                for index in RETIRED_INDEXES:
+                    self.cursor.execute(f"DROP INDEX IF EXISTS {index}")
+            if version < 8:
+                self.__migrate_to_driver_ids()
+            if version < 10:
+                # LapTelemetry stored the start of each lap as text as well
+                # as in start_epoch_ms
+                columns = [row[1] for row in self.cursor.execute(
+                    "PRAGMA table_info(LapTelemetry)")]
+                if 'start_datetime' in columns:
+                    self.cursor.execute("ALTER TABLE LapTelemetry DROP COLUMN start_datetime")
+            # Derived rows are computed last, from the tables in their
+            # current shape: LapTelemetrySummary since version 5, and the
+            # analysis tables since version 4, read the sampled rows since
+            # version 6
+            for (session_id,) in self.cursor.execute(
+                    "SELECT session_id FROM Sessions").fetchall():
+                if version < 5:
+                    self.__summarize_stored_laps(session_id)
+                if version < 6:
+                    self.__refresh_analysis_tables(session_id)
+            self.__bump_generation()
+        self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def __migrate_to_natural_keys(self) -> None:
+        """
+        Schema version 1: partition Telemetry by session and drop the
+        duplicates that re-ingesting a session used to create, so the natural
+        key indexes can be built. The most recent copy of a row is kept.
+
+        Older versions stored the samples they found no lap for with the
+        placeholder lap_id 999: those samples get the driver's lap they fall
+        in, with lap windows drawn like __lap_boundaries does, and are
+        deleted when they fall in none.
+        """
+        columns = [row[1] for row in self.cursor.execute(
+            "PRAGMA table_info(Telemetry)")]
+        if 'session_id' not in columns:
+            self.cursor.execute(
+                "ALTER TABLE Telemetry ADD COLUMN session_id INTEGER REFERENCES Sessions(session_id)")
+        lap_columns = [row[1] for row in self.cursor.execute(
+            "PRAGMA table_info(Laps)")]
+        # Tables created with driver_id never held the placeholder
+        if 'driver_name' in lap_columns:
+            self.cursor.executescript('''
+                CREATE TEMP TABLE LapWindows AS
+                SELECT l.lap_id, l.driver_name,
+                       julianday(l.lap_start_time_in_datetime) AS lap_start,
+                       COALESCE(
+                           LEAD(julianday(l.lap_start_time_in_datetime)) OVER (
+                               PARTITION BY l.session_id, l.driver_name
+                               ORDER BY julianday(l.lap_start_time_in_datetime)),
+                           julianday(l.lap_start_time_in_datetime) + l.lap_time_in_seconds / 86400.0
+                       ) AS lap_end,
+                       COALESCE(ingest.first_telemetry_id, 0) AS first_telemetry_id
+                FROM Laps l
+                LEFT JOIN (
+                    SELECT laps.session_id, MIN(telemetry.telemetry_id) AS first_telemetry_id
+                    FROM Telemetry telemetry
+                    JOIN Laps laps ON telemetry.lap_id = laps.lap_id
+                    GROUP BY laps.session_id
+                ) ingest ON l.session_id = ingest.session_id
+                WHERE julianday(l.lap_start_time_in_datetime) IS NOT NULL;
+                CREATE INDEX temp.idx_lap_windows ON LapWindows(driver_name, lap_start);
+
+                -- Once a database has 999 laps the placeholder is also a real
+                -- lap_id, so every sample stored with it is assigned again.
+                -- Copies of a re-ingested session share their lap windows; a
+                -- sample goes to the copy its ingest wrote, the latest one whose
+                -- telemetry starts before it
+                UPDATE Telemetry
+                SET lap_id = (
+                    SELECT w.lap_id FROM LapWindows w
+                    WHERE w.driver_name = Telemetry.driver_name
+                        AND w.lap_start <= julianday(Telemetry.datetime)
+                        AND w.lap_end > julianday(Telemetry.datetime)
+                        AND w.first_telemetry_id <= Telemetry.telemetry_id
+                    ORDER BY w.lap_start DESC, w.first_telemetry_id DESC
+                    LIMIT 1
+                )
+                WHERE lap_id IS NULL OR lap_id = 999 OR lap_id NOT IN (SELECT lap_id FROM Laps);
+
+                DELETE FROM Telemetry WHERE lap_id IS NULL;
+                DROP TABLE LapWindows;
+            ''')
+        self.cursor.executescript('''
+            UPDATE Telemetry
+            SET session_id = (SELECT session_id FROM Laps WHERE Laps.lap_id = Telemetry.lap_id)
+            WHERE session_id IS NULL;
+
+            UPDATE Sessions
+            SET event_id = (
+                SELECT MAX(duplicate.event_id)
+                FROM Event original
+                JOIN Event duplicate ON duplicate.event_name IS original.event_name
+                    AND duplicate.event_date IS original.event_date
+                WHERE original.event_id = Sessions.event_id
+            )
+            WHERE event_id IN (SELECT event_id FROM Event);
+
+            DELETE FROM Event WHERE event_id NOT IN (
+                SELECT MAX(event_id) FROM Event GROUP BY event_name, event_date);
+
+            CREATE TEMP TABLE StaleSessions AS
+            SELECT session_id FROM Sessions WHERE session_id NOT IN (
+                SELECT MAX(session_id) FROM Sessions GROUP BY event_id, session_type);
+
+            DELETE FROM Telemetry WHERE session_id IN (SELECT session_id FROM StaleSessions);
+            DELETE FROM Laps WHERE session_id IN (SELECT session_id FROM StaleSessions);
+            DELETE FROM Weather WHERE session_id IN (SELECT session_id FROM StaleSessions);
+            DELETE FROM Sessions WHERE session_id IN (SELECT session_id FROM StaleSessions);
+            DROP TABLE StaleSessions;
+
+            DELETE FROM Weather WHERE weather_id NOT IN (
+                SELECT MAX(weather_id) FROM Weather GROUP BY session_id, datetime);
+        ''')
+
+    def __migrate_to_epoch_timestamps(self) -> None:
+        """
+        Schema version 2: store the EPOCH_MS_COLUMNS as integer epoch
+        milliseconds instead of ``str(pd.Timestamp)`` text, with NULL instead
+        of 'NaT'. SQLite can't change a column's type in place, so each table
+        is rebuilt from its current definition.
+        """
+        for table, columns in EPOCH_MS_COLUMNS.items():
+            declared = {name: column_type for _, name, column_type, *_ in
+                        self.cursor.execute(f"PRAGMA table_info({table})")}
+            if all(declared[column] == 'INTEGER' for column in columns):
+                continue
+            definition = self.cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,)).fetchone()[0]
+            definition = re.sub(rf"^CREATE TABLE \"?{table}\"?",
+                                f"CREATE TABLE {table}_migrating", definition)
+            for column in columns:
+                definition = re.sub(rf"\b{column}\s+DATETIME\b",
+                                    f"{column} INTEGER", definition)
+            # julianday() parses the text, including fractional seconds
+            values = [f'''
+                CASE WHEN {name} IS NULL OR {name} = 'NaT' THEN NULL
+                ELSE CAST(ROUND((julianday({name}) - 2440587.5) * 86400000) AS INTEGER) END
+            ''' if name in columns else name for name in declared]
+            self.cursor.execute(definition)
+            self.cursor.execute(f'''
+                INSERT INTO {table}_migrating ({', '.join(declared)})
+                SELECT {', '.join(values)} FROM {table}
+            ''')
+            # The table's indexes go with it; __create_indexes rebuilds them
+            self.cursor.execute(f"DROP TABLE {table}")
+            self.cursor.execute(
+                f"ALTER TABLE {table}_migrating RENAME TO {table}")
+
+    def __migrate_to_weather_links(self) -> None:
+        """
+        Schema version 3: add the weather_id of the weather sample in effect
+        to Laps and Telemetry and fill it in for every stored session.
+        """
+        for table in WEATHER_LINKED_TABLES:
+            columns = [row[1] for row in self.cursor.execute(
+                f"PRAGMA table_info({table})")]
+            if 'weather_id' not in columns:
+                self.cursor.execute(
+                    f"ALTER TABLE {table} ADD COLUMN weather_id INTEGER REFERENCES Weather(weather_id)")
+        for (session_id,) in self.cursor.execute(
+                "SELECT session_id FROM Sessions").fetchall():
+            for table in WEATHER_LINKED_TABLES:
+                self.__link_weather(table, session_id)
+
+    def __migrate_to_sample_slots(self) -> None:
+        """
+        Schema version 6: pick the sampled Telemetry rows of every stored
+        session.
+        """
+        columns = [row[1] for row in self.cursor.execute(
+            "PRAGMA table_info(Telemetry)")]
+        if 'sample_slot' not in columns:
+            self.cursor.execute("ALTER TABLE Telemetry ADD COLUMN sample_slot INTEGER")
+        for (session_id,) in self.cursor.execute(
+                "SELECT session_id FROM Sessions").fetchall():
+            self.__assign_sample_slots(session_id)
+
+    def __migrate_to_driver_ids(self) -> None:
+        """
+        Schema version 8: reference drivers by the integer driver_id of a
+        Drivers row per season instead of repeating the abbreviation in
+        DRIVER_TABLES. The old Drivers rows held full names that never matched
+        those abbreviations, so Drivers is rebuilt from the abbreviations;
+        names and teams are filled in when a session is ingested again. Like
+        in version 2, each table is rebuilt from its current definition.
+        """
+        # Tables added after version 4 may have been created with driver_id
+        tables = [table for table in DRIVER_TABLES if 'driver_name' in [
+            row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")]]
+        if not tables:
+            return
+
+        self.cursor.execute("DROP TABLE IF EXISTS Drivers_migrating")
+        self.cursor.execute('''
+            CREATE TABLE Drivers_migrating (
+                driver_id INTEGER PRIMARY KEY,
+                abbreviation TEXT NOT NULL,
+                full_name TEXT,
+                team TEXT,
+                season INTEGER
+            )
+        ''')
+        self.cursor.execute(f'''
+            INSERT INTO Drivers_migrating (abbreviation, season)
+            SELECT DISTINCT rows.driver_name, CAST(strftime('%Y', e.event_date) AS INTEGER)
+            FROM ({' UNION '.join(f"SELECT session_id, driver_name FROM {table}"
+                                  for table in tables)}) rows
+            JOIN Sessions s ON rows.session_id = s.session_id
+            JOIN Event e ON s.event_id = e.event_id
+        ''')
+        # The driver_id of every session's abbreviations. Version 1 gave
+        # every row a session, so every row finds its driver
+        self.cursor.execute("DROP TABLE IF EXISTS temp.SessionDrivers")
+        self.cursor.execute('''
+            CREATE TEMP TABLE SessionDrivers (
+                session_id INTEGER,
+                driver_name TEXT,
+                driver_id INTEGER,
+                PRIMARY KEY (session_id, driver_name)
+            )
+        ''')
+        self.cursor.execute('''
+            INSERT INTO SessionDrivers
+            SELECT s.session_id, d.abbreviation, d.driver_id
+            FROM Sessions s
+            JOIN Event e ON s.event_id = e.event_id
+            JOIN Drivers_migrating d ON d.season = CAST(strftime('%Y', e.event_date) AS INTEGER)
+        ''')
+
+        for table in tables:
+            definition = self.cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,)).fetchone()[0]
+            definition = re.sub(rf"^CREATE TABLE \"?{table}\"?",
+                                f"CREATE TABLE {table}_migrating", definition)
+            definition = re.sub(r",\s*FOREIGN KEY \(driver_name\) REFERENCES Drivers\(driver_name\)",
+                                "", definition)
+            definition = re.sub(r"\bdriver_name TEXT NOT NULL",
+                                "driver_id INTEGER NOT NULL REFERENCES Drivers(driver_id)", definition)
+            definition = definition.replace(
+                "UNIQUE (session_id, driver_name, lap_number)",
+                "UNIQUE (session_id, driver_id, lap_number)")
+            self.cursor.execute(f"DROP TABLE IF EXISTS {table}_migrating")
+            self.cursor.execute(definition)
+            columns = [row[1] for row in self.cursor.execute(
+                f"PRAGMA table_info({table}_migrating)")]
+            values = [f'legacy.{column}' for column in columns]
+            values[columns.index('driver_id')] = 'driver.driver_id'
+            self.cursor.execute(f'''
+                INSERT INTO {table}_migrating ({', '.join(columns)})
+                SELECT {', '.join(values)}
+                FROM {table} legacy
+                JOIN SessionDrivers driver ON legacy.session_id = driver.session_id
+                    AND legacy.driver_name = driver.driver_name
+            ''')
+        self.cursor.execute("DROP TABLE SessionDrivers")
+
+        # The tables' indexes go with them; __create_indexes rebuilds them
+        for table in ('Drivers', *tables):
+            self.cursor.execute(f"DROP TABLE {table}")
+            self.cursor.execute(f"ALTER TABLE {table}_migrating RENAME TO {table}")
+
+    def __bump_generation(self) -> None:
+        """Record in IngestGeneration that the data changed."""
+        self.cursor.execute('''
+            INSERT INTO IngestGeneration (id, generation) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE SET generation = generation + 1
+        ''')
+
+    def __create_indexes(self) -> None:
+        """Create the ingestion and secondary indexes if they don't exist."""
+        for statement in {**INGEST_INDEXES, **SECONDARY_INDEXES}.values():
+            self.cursor.execute(statement)
+        self.conn.commit()
+
+    @contextmanager
+    def bulk_load(self, cache_size_mb: int = 512) -> Iterator["FastF1ToSQL"]:
+        """
+        Tune the database for loading many sessions in one go.
+
+        For the duration of the block, secondary indexes are dropped, the
+        database runs in WAL mode without syncing and with a large page cache,
+        and the sessions share a single transaction; each session is still
+        kept or rolled back as a whole through a savepoint. Committing the
+        connection inside the block just starts a new transaction, so
+        db.ingest leaves its checkpoints to the commit at the end of the
+        block, see bulk_loading. Afterwards the indexes are built again,
+        ANALYZE refreshes the planner statistics and the previous pragmas are
+        restored.
+
+        Args:
+            cache_size_mb (int): Page cache size while loading.
+
+        Yields:
+            FastF1ToSQL: The converter itself.
+        """
+        pragmas = {pragma: self.cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                   for pragma in ('journal_mode', 'synchronous', 'cache_size', 'temp_store')}
+        console.print("> Bulk load: dropping secondary indexes...")
+        for name in SECONDARY_INDEXES:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        self.conn.commit()
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        self.cursor.execute("PRAGMA synchronous = OFF")
+        self.cursor.execute(f"PRAGMA cache_size = {-cache_size_mb * 1024}")
+        self.cursor.execute("PRAGMA temp_store = MEMORY")
+
+        self._bulk_loading = True
+        try:
+            self.cursor.execute("BEGIN")
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._bulk_loading = False
+            self.conn.commit()
+            console.print("> Bulk load: rebuilding indexes...")
+            self.__create_indexes()
+            self.cursor.execute("ANALYZE")
+            for pragma, value in pragmas.items():
+                self.cursor.execute(f"PRAGMA {pragma} = {value}")
+
+    @property
+    def bulk_loading(self) -> bool:
+        """Whether a bulk_load block is running, which commits once at its end."""
+        return self._bulk_loading
+
+    def process_session(self, session: Session, load: bool = True) -> IngestReport:
         """
         Process a session and insert the data into the database.
 
+        The session is written in a single transaction: if any step fails,
+        nothing of the session is kept. Processing a session again is
+        idempotent: rows are upserted on their natural keys, and tables whose
+        source data has not changed since the last run are not written at all.
+        With an export_dir, the session is exported after the commit unless
+        the same data was already exported there, so a failed export is
+        retried by the next run.
+
         Args:
             session (Session): The session to process.
+            load (bool): Call ``session.load()`` first. Pass False when the
+                session has already been loaded.
+
+        Returns:
+            IngestReport: Rows written per table and peak memory usage.
         """
         console.print(
             f"> Processing session: {session.event.EventName} - {session.name}. This may take a while...")
+        self._report = IngestReport(
+            f"{session.event.EventName} - {session.name}")
         # Load session data
-        session.load()
+        if load:
+            with self._report.stage('load'):
+                session.load()
 
         # Save session start date
         self._session_start_date = session.t0_date
+        # Drivers are stored per season
+        self._season = int(session.event.year)
+
+        # Drivers and weather go first: laps and telemetry samples reference them
+        writers = {
+            'Drivers': self.insert_drivers,
+            'Weather': self.insert_weather,
+            'Laps': self.insert_laps,
+            'Telemetry': self.insert_telemetry,
+        }
+        if self._bulk_loading:
+            self.cursor.execute("SAVEPOINT process_session")
+        try:
+            # Insert data into tables
+            with self._report.stage('Event'):
+                self.insert_event(session)
+            with self._report.stage('Sessions'):
+                self.insert_session(session)
 
-        # Insert data into tables
-        self.insert_event(session)
-        self.insert_session(session)
-        self.insert_drivers(session)
-        self.insert_laps(session)
-        self.insert_telemetry(session)
-        self.insert_weather(session)
+            # Only rewrite the tables whose source data changed since the
+            # session was last written
+            with self._report.stage('fingerprints'):
+                fingerprints = self.session_fingerprints(session)
+            stored = dict(self.cursor.execute(
+                "SELECT table_name, fingerprint FROM SessionFingerprints WHERE session_id = ?",
+                (self._session_id,)).fetchall())
+            for table, insert in writers.items():
+                if stored.get(table) == fingerprints[table]:
+                    self._report.unchanged_tables.append(table)
+                else:
+                    with self._report.stage(table):
+                        insert(session)
+            changed = len(self._report.unchanged_tables) < len(writers) or any(
+                stored.get(table) != fingerprints[table] for table in METADATA_TABLES)
+            # The other sessions of a renamed event copy its old name too
+            refreshed = [self._session_id]
+            if self._renamed_event is not None:
+                refreshed = [session_id for (session_id,) in self.cursor.execute(
+                    "SELECT session_id FROM Sessions WHERE event_id = ?",
+                    (self._event_id,)).fetchall()]
 
-        # Create data analysis views
-        self.__create_data_analysis_views()
+            # Tables that were not rewritten still point at the previous
+            # weather samples, link them to the new ones
+            stale_links = [table for table in WEATHER_LINKED_TABLES
+                           if table in self._report.unchanged_tables]
+            if 'Weather' not in self._report.unchanged_tables and stale_links:
+                with self._report.stage('weather links'):
+                    for table in stale_links:
+                        self.__link_weather(table, self._session_id)
+                    if 'Telemetry' in stale_links:
+                        self.__summarize_stored_laps(self._session_id)
 
-        # Commit changes and close connection
-        self.conn.commit()
+            self.cursor.executemany('''
+                INSERT INTO SessionFingerprints (session_id, table_name, fingerprint)
+                VALUES (?, ?, ?)
+                ON CONFLICT (session_id, table_name) DO UPDATE SET fingerprint = excluded.fingerprint
+            ''', [(self._session_id, table, fingerprint)
+                  for table, fingerprint in fingerprints.items()])
+
+            # The analysis tables also copy the event, session and track
+            # names, which change without any of the writers' data changing
+            if changed:
+                with self._report.stage('analysis tables'):
+                    for session_id in refreshed:
+                        self.__refresh_analysis_tables(session_id)
+                self.__bump_generation()
+        except BaseException:
+            if self._bulk_loading:
+                self.cursor.execute("ROLLBACK TO process_session")
+                self.cursor.execute("RELEASE process_session")
+            else:
+                self.conn.rollback()
+            raise
+
+        if not changed:
+            console.print(
+                "> Session unchanged since the last run, nothing to write")
+
+        if self._bulk_loading:
+            # bulk_load commits once at the end
+            self.cursor.execute("RELEASE process_session")
+        else:
+            with self._report.stage('commit'):
+                self.conn.commit()
+
+        if self.export_dir is not None:
+            self.__export(fingerprints, stored.get(EXPORT_FINGERPRINT))
+
+        self._report.finish(with_workers=self.telemetry_workers > 1)
+        console.print(f"> Ingest report: {self._report.summary()}")
+        return self._report
+
+    def __export(self, fingerprints: dict[str, str], exported: str | None) -> None:
+        """
+        Export the session to export_dir unless the same data was already
+        exported there, along with the other sessions of its event that
+        have not been exported since the event was renamed.
+
+        Args:
+            fingerprints (dict[str, str]): The session's fingerprints, see
+                session_fingerprints.
+            exported (str | None): Export fingerprint stored for the session.
+        """
+        pending = {}
+        export_fingerprint = self.__export_fingerprint(fingerprints)
+        if exported != export_fingerprint:
+            pending[self._session_id] = export_fingerprint
+        for (session_id,) in self.cursor.execute('''
+            SELECT session_id FROM Sessions
+            WHERE event_id = ? AND session_id != ? AND session_id NOT IN (
+                SELECT session_id FROM SessionFingerprints WHERE table_name = ?)
+        ''', (self._event_id, self._session_id, EXPORT_FINGERPRINT)).fetchall():
+            stored = dict(self.cursor.execute(
+                "SELECT table_name, fingerprint FROM SessionFingerprints WHERE session_id = ?",
+                (session_id,)).fetchall())
+            pending[session_id] = self.__export_fingerprint(stored)
+        if not pending:
+            return
+
+        with self._report.stage('export'):
+            if self._renamed_event is not None:
+                remove_event(self.export_dir, self._season, self._renamed_event)
+            for session_id, export_fingerprint in pending.items():
+                export_session(self.conn, session_id, self.export_dir, self.export_format)
+                self.cursor.execute('''
+                    INSERT INTO SessionFingerprints (session_id, table_name, fingerprint)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (session_id, table_name) DO UPDATE SET fingerprint = excluded.fingerprint
+                ''', (session_id, EXPORT_FINGERPRINT, export_fingerprint))
+        if not self._bulk_loading:
+            self.conn.commit()
+
+    def __export_fingerprint(self, fingerprints: dict[str, str]) -> str:
+        """Fingerprint the data a session is exported from and where it goes."""
+        return _fingerprint(salt='|'.join([
+            *(fingerprints[table] for table in sorted(fingerprints)
+              if table != EXPORT_FINGERPRINT),
+            os.path.abspath(self.export_dir), self.export_format]))
+
+    def session_fingerprints(self, session: Session) -> dict[str, str]:
+        """
+        Fingerprint the source data of every session-scoped table and of the
+        session's Event and Sessions rows.
+
+        Args:
+            session (Session): The loaded FastF1 session.
+
+        Returns:
+            dict[str, str]: Table name to the fingerprint of the data it is
+            written from.
+        """
+        results = cast(pd.DataFrame, session.results)
+        drivers = list(session.drivers)
+        return {
+            'Event': _fingerprint(pd.DataFrame([session.event])),
+            'Sessions': _fingerprint(salt=f"{session.name}|{session.date}"),
+            'Drivers': _fingerprint(results[['Abbreviation', 'FullName', 'TeamName']]),
+            'Laps': _fingerprint(session.laps),
+            # Telemetry is split into laps by the lap timing, and its rows
+            # depend on the resample settings
+            'Telemetry': _fingerprint(
+                session.laps,
+                *(session.car_data.get(driver) for driver in drivers),
+                *(session.pos_data.get(driver) for driver in drivers),
+                salt=f"{self.resample_interval}|{self.resample_strategy}|"
+                     f"{self.telemetry_storage}|{self.lap_codec}|"
+                     f"{self.telemetry_samples_per_lap}"),
+            'Weather': _fingerprint(cast(pd.DataFrame, session.weather_data)),
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
         self.conn.close()
 
     def insert_event(self, session: Session) -> None:
@@ -194,11 +1335,35 @@ class FastF1ToSQL:
             'session_5_name': session.event.Session5.lower(),
         }
 
-        columns = ', '.join(event_data.keys())
-        placeholders = ', '.join(['?' for _ in event_data])
-        query = f"INSERT OR REPLACE INTO Event ({columns}) VALUES ({placeholders})"
-        self.cursor.execute(query, list(event_data.values()))
-        self._event_id = self.cursor.lastrowid
+        # An event keeps its season and round while its name and date, the
+        # natural key, can be corrected: a correction is written to the
+        # stored event, so its sessions keep their rows. Testing events all
+        # have round 0 and are only matched on the natural key
+        self._renamed_event = None
+        if event_data['round_number'] > 0:
+            stored = self.cursor.execute('''
+                SELECT event_id, event_name, event_date FROM Event
+                WHERE round_number = ? AND strftime('%Y', event_date) = ?
+                ORDER BY event_id DESC
+                LIMIT 1
+            ''', (event_data['round_number'], str(session.event.year))).fetchone()
+            taken = self.cursor.execute(
+                "SELECT 1 FROM Event WHERE event_name = ? AND event_date = ?",
+                (event_data['event_name'], event_data['event_date'])).fetchone()
+            if stored is not None and taken is None:
+                event_id, self._renamed_event, _ = stored
+                self.cursor.execute(
+                    "UPDATE Event SET event_name = ?, event_date = ? WHERE event_id = ?",
+                    (event_data['event_name'], event_data['event_date'], event_id))
+                # The event's other sessions are exported again under the
+                # new name, see __export
+                self.cursor.execute('''
+                    DELETE FROM SessionFingerprints
+                    WHERE table_name = ? AND session_id IN (
+                        SELECT session_id FROM Sessions WHERE event_id = ?)
+                ''', (EXPORT_FINGERPRINT, event_id))
+        self._event_id = self.__upsert_row(
+            'Event', 'event_id', event_data, ('event_name', 'event_date'))
 
     def insert_session(self, session: Session) -> None:
         """
@@ -214,11 +1379,8 @@ class FastF1ToSQL:
             'session_type': session.name,
             'date': str(session.date),
         }
-        columns = ', '.join(session_data.keys())
-        placeholders = ':' + ', :'.join(session_data.keys())
-        query = f"INSERT INTO Sessions ({columns}) VALUES ({placeholders})"
-        self.cursor.execute(query, session_data)
-        self._session_id = self.cursor.lastrowid
+        self._session_id = self.__upsert_row(
+            'Sessions', 'session_id', session_data, ('event_id', 'session_type'))
 
     def insert_drivers(self, session: Session) -> None:
         """
@@ -227,16 +1389,35 @@ class FastF1ToSQL:
         Args:
             session (Session): The FastF1 session object.
         """
-        for driver in session.drivers:
-            driver_info = session.get_driver(driver)
-            driver_data = {
-                'driver_name': driver_info['FullName'],
-                'team': driver_info['TeamName']
-            }
-            columns = ', '.join(driver_data.keys())
-            placeholders = ':' + ', :'.join(driver_data.keys())
-            query = f"INSERT OR IGNORE INTO Drivers ({columns}) VALUES ({placeholders})"
-            self.cursor.execute(query, driver_data)
+        results = cast(pd.DataFrame, session.results)
+        driver_rows = pd.DataFrame({
+            'abbreviation': results['Abbreviation'],
+            'full_name': results['FullName'],
+            'team': results['TeamName'],
+            'season': self._season,
+        })
+        self.__insert_rows('Drivers', driver_rows,
+                           conflict_key=('season', 'abbreviation'))
+
+    def get_or_create_drivers(self, abbreviations: Iterable[str]) -> dict[str, int]:
+        """
+        Get the driver_id of drivers in the current season, creating the
+        drivers that are not in the session results.
+
+        Args:
+            abbreviations (Iterable[str]): The drivers' abbreviations.
+
+        Returns:
+            dict[str, int]: Abbreviation to driver_id, for every driver of the
+            season.
+        """
+        self.cursor.executemany('''
+            INSERT INTO Drivers (abbreviation, season) VALUES (?, ?)
+            ON CONFLICT (season, abbreviation) DO NOTHING
+        ''', [(abbreviation, self._season) for abbreviation in set(abbreviations)])
+        return dict(self.cursor.execute(
+            "SELECT abbreviation, driver_id FROM Drivers WHERE season = ?",
+            (self._season,)).fetchall())
 
     def insert_laps(self, session: Session) -> None:
         """
@@ -246,40 +1427,37 @@ class FastF1ToSQL:
             session (Session): The FastF1 session object.
         """
         console.print("> Inserting laps data...")
-        laps_df = session.laps.copy()
-        laps_df['session_id'] = self._session_id
-        laps_df['lap_start_time_in_datetime'] = pd.to_datetime(
-            laps_df['LapStartDate'])
-        laps_df['pin_in_time_in_datetime'] = self._session_start_date + \
-            laps_df['PitInTime']
-        laps_df['pin_out_time_in_datetime'] = self._session_start_date + \
-            laps_df['PitOutTime']
-
-        for _, lap in laps_df.iterrows():
-            lap_data: dict[str, Any] = {
-                'session_id': lap['session_id'],
-                'driver_name': lap['Driver'],
-                'lap_number': lap['LapNumber'],
-                'sector_1_time_in_seconds': lap['Sector1Time'].total_seconds() if pd.notnull(lap['Sector1Time']) else None,
-                'sector_2_time_in_seconds': lap['Sector2Time'].total_seconds() if pd.notnull(lap['Sector2Time']) else None,
-                'sector_3_time_in_seconds': lap['Sector3Time'].total_seconds() if pd.notnull(lap['Sector3Time']) else None,
-                'lap_time_in_seconds': lap['LapTime'].total_seconds() if pd.notnull(lap['LapTime']) else None,
-                'finish_line_speed_trap_in_km': lap['SpeedFL'],
-                'longest_strait_speed_trap_in_km': lap['SpeedST'],
-                'is_personal_best': lap['IsPersonalBest'],
-                'tyre_compound': lap['Compound'],
-                'tyre_life_in_laps': lap['TyreLife'],
-                'is_fresh_tyre': lap['FreshTyre'],
-                'position': lap['Position'],
-                'lap_start_time_in_datetime': str(lap['lap_start_time_in_datetime']),
-                'pin_in_time_in_datetime': str(lap['pin_in_time_in_datetime']),
-                'pin_out_time_in_datetime': str(lap['pin_out_time_in_datetime']),
-            }
-            columns = ', '.join(lap_data.keys())
-            placeholders = ':' + ', :'.join(lap_data.keys())
-            query = f"INSERT INTO Laps ({columns}) VALUES ({placeholders})"
-            self.cursor.execute(query, lap_data)
-        self.conn.commit()
+        laps_df = session.laps
+        driver_ids = self.get_or_create_drivers(laps_df['Driver'])
+        lap_rows = pd.DataFrame({
+            'session_id': self._session_id,
+            'driver_id': laps_df['Driver'].map(driver_ids),
+            'lap_number': laps_df['LapNumber'],
+            'sector_1_time_in_seconds': laps_df['Sector1Time'].dt.total_seconds(),
+            'sector_2_time_in_seconds': laps_df['Sector2Time'].dt.total_seconds(),
+            'sector_3_time_in_seconds': laps_df['Sector3Time'].dt.total_seconds(),
+            'lap_time_in_seconds': laps_df['LapTime'].dt.total_seconds(),
+            'finish_line_speed_trap_in_km': laps_df['SpeedFL'],
+            'longest_strait_speed_trap_in_km': laps_df['SpeedST'],
+            'is_personal_best': laps_df['IsPersonalBest'],
+            'tyre_compound': laps_df['Compound'],
+            'tyre_life_in_laps': laps_df['TyreLife'],
+            'is_fresh_tyre': laps_df['FreshTyre'],
+            'position': laps_df['Position'],
+            'lap_start_time_in_datetime': _epoch_ms(
+                pd.to_datetime(laps_df['LapStartDate'])),
+            'pin_in_time_in_datetime': _epoch_ms(
+                self._session_start_date + laps_df['PitInTime']),
+            'pin_out_time_in_datetime': _epoch_ms(
+                self._session_start_date + laps_df['PitOutTime']),
+        })
+        lap_rows['weather_id'] = _assign_weather_ids(
+            lap_rows['lap_start_time_in_datetime'],
+            *self.__session_weather(self._session_id))
+        # Upserting keeps the lap_id of laps that were stored before
+        lap_key = ('session_id', 'driver_id', 'lap_number')
+        self.__insert_rows('Laps', lap_rows, conflict_key=lap_key)
+        self.__delete_stale_rows('Laps', 'lap_id', lap_key, lap_rows)
 
     def insert_telemetry(self, session: Session) -> None:
         """
@@ -289,55 +1467,220 @@ class FastF1ToSQL:
             session (Session): The FastF1 session object.
         """
         console.print('> Inserting telemetry data...')
-        telemetry_data_list = []
-
-        for driver in session.drivers:
-            laps_per_driver = session.laps.pick_driver(driver)
-            driver_name = session.get_driver(driver)['Abbreviation']
-            console.print(f"> Processing telemetry for driver: {driver_name}")
-
-            for _, lap in laps_per_driver.iterrows():
-                lap_number = lap['LapNumber']
-                console.print(f"> Processing telemetry for lap: {lap_number}")
-                telemetry = lap.get_telemetry()
-                telemetry['datetime'] = self._session_start_date + \
-                    telemetry['SessionTime']
-
-                # Sort telemetry data by datetime
-                telemetry_sorted = telemetry.sort_values('datetime')
-
-                # Floor the 'datetime' to the specified decimal of a second
-                telemetry_sorted['floored_datetime'] = telemetry_sorted['datetime'].apply(
-                    lambda x: x.floor(f'{0.1}s')
-                )
+        # Telemetry has no natural key, so the session's partition is
+        # rewritten as a whole
+        self.cursor.execute(
+            "DELETE FROM Telemetry WHERE session_id = ?", (self._session_id,))
+        self.cursor.execute(
+            "DELETE FROM LapTelemetry WHERE session_id = ?", (self._session_id,))
+        self.cursor.execute(
+            "DELETE FROM LapTelemetrySummary WHERE session_id = ?", (self._session_id,))
+        self.cursor.execute(
+            "SELECT driver_id, lap_number, lap_id FROM Laps WHERE session_id = ?",
+            (self._session_id,))
+        self._lap_ids = {(driver_id, lap_number): lap_id
+                         for driver_id, lap_number, lap_id in self.cursor.fetchall()}
+        driver_ids = self.get_or_create_drivers(
+            session.get_driver(driver)['Abbreviation'] for driver in session.drivers)
+        weather_ms, weather_ids = self.__session_weather(self._session_id)
+        weather = self.__weather_values(self._session_id)
+        pending: list[pd.DataFrame] = []
+        pending_rows = 0
+        lap_boundaries = {}
+        # Samples of the current driver's laps that may still get samples,
+        # summarized and packed once they are complete
+        driver_rows: list[pd.DataFrame] = []
+        driver_samples: list[tuple[np.ndarray, TelemetryArrays]] = []
+        current_driver_id = None
+
+        for driver, samples in extract_session_telemetry(
+                session, session.drivers, self.resample_interval,
+                self.resample_strategy, self.telemetry_workers):
+            if driver not in lap_boundaries:
+                driver_name = session.get_driver(driver)['Abbreviation']
+                console.print(f"> Processing telemetry for driver: {driver_name}")
+                driver_id = driver_ids[driver_name]
+                lap_boundaries[driver] = (driver_id, *self.__lap_boundaries(
+                    session.laps.pick_drivers(driver), driver_id))
+            driver_id, lap_starts, lap_ends, lap_ids = lap_boundaries[driver]
+
+            sample_times = pd.Series(samples['datetime'])
+            sample_lap_ids = _assign_lap_ids(
+                sample_times, lap_starts, lap_ends, lap_ids)
+
+            if driver_id != current_driver_id:
+                self.__insert_lap_summaries(driver_rows, weather)
+                self.__insert_lap_telemetry(driver_samples, current_driver_id)
+                driver_rows, driver_samples = [], []
+                current_driver_id = driver_id
 
-                # Keep only the first occurrence for each floored_datetime
-                telemetry_unique = telemetry_sorted.groupby(
-                    'floored_datetime', as_index=False).first()
-
-                for _, sample in telemetry_unique.iterrows():
-                    telemetry_data: dict[str, Any] = {
-                        'lap_id': self.__get_lap_id(session, driver_name, sample['datetime']),
-                        'driver_name': driver_name,
-                        'speed_in_km': sample['Speed'],
-                        'RPM': sample['RPM'],
-                        'gear_number': sample['nGear'],
-                        'throttle_input': sample['Throttle'],
-                        'is_brake_pressed': sample['Brake'],
-                        'is_DRS_open': sample['DRS'],
-                        'x_position': round(sample['X'], 2),
-                        'y_position': round(sample['Y'], 2),
-                        'z_position': round(sample['Z'], 2),
-                        'is_off_track': sample['Status'] == 'OffTrack',
-                        'datetime': str(sample['datetime']),
-                    }
-                    telemetry_data_list.append(telemetry_data)
-
-        if telemetry_data_list:
-            columns = ', '.join(telemetry_data_list[0].keys())
-            placeholders = ':' + ', :'.join(telemetry_data_list[0].keys())
-            query = f"INSERT INTO Telemetry ({columns}) VALUES ({placeholders})"
-            self.cursor.executemany(query, telemetry_data_list)
+            sample_ms = _epoch_ms(sample_times)
+            telemetry_rows = pd.DataFrame({
+                'session_id': self._session_id,
+                'lap_id': sample_lap_ids,
+                'driver_id': driver_id,
+                'speed_in_km': samples['Speed'],
+                'RPM': samples['RPM'],
+                'gear_number': samples['nGear'],
+                'throttle_input': samples['Throttle'],
+                'is_brake_pressed': samples['Brake'],
+                'is_DRS_open': samples['DRS'],
+                'x_position': samples['X'].round(2),
+                'y_position': samples['Y'].round(2),
+                'z_position': samples['Z'].round(2),
+                'is_off_track': samples['is_off_track'],
+                'datetime': sample_ms,
+                'weather_id': _assign_weather_ids(sample_ms, weather_ms, weather_ids),
+            })
+            driver_rows.append(telemetry_rows)
+            if self.telemetry_storage != 'rows':
+                driver_samples.append((sample_lap_ids, samples))
+            # A driver's blocks arrive in time order, so laps that end before
+            # this block's first sample are complete. From a process pool
+            # every block holds a whole driver, which completes at the end
+            if len(samples['datetime']):
+                completed = lap_ids[(lap_ends <= samples['datetime'].min()) & pd.notna(lap_ids)]
+            else:
+                completed = lap_ids[:0]
+            if len(completed):
+                driver_rows, driver_samples = self.__flush_completed_laps(
+                    driver_rows, driver_samples, completed, weather, driver_id)
+            if self.telemetry_storage == 'laps':
+                continue
+
+            # Flush in fixed-size batches so memory stays bounded no matter
+            # how many laps or drivers the session has
+            for start in range(0, len(telemetry_rows), self.telemetry_batch_size):
+                batch = telemetry_rows.iloc[start:start + self.telemetry_batch_size]
+                pending.append(batch)
+                pending_rows += len(batch)
+                if pending_rows >= self.telemetry_batch_size or self.__over_memory_cap():
+                    self.__insert_rows('Telemetry', pd.concat(pending))
+                    pending, pending_rows = [], 0
+
+        if pending:
+            self.__insert_rows('Telemetry', pd.concat(pending))
+        self.__insert_lap_summaries(driver_rows, weather)
+        self.__insert_lap_telemetry(driver_samples, current_driver_id)
+        self.__assign_sample_slots(self._session_id)
+
+    def __flush_completed_laps(self, driver_rows: list[pd.DataFrame],
+                               driver_samples: list[tuple[np.ndarray, TelemetryArrays]],
+                               completed: np.ndarray, weather: pd.DataFrame,
+                               driver_id: int) -> tuple[list[pd.DataFrame],
+                                                        list[tuple[np.ndarray, TelemetryArrays]]]:
+        """
+        Summarize and pack the completed laps of the current driver.
+
+        Args:
+            driver_rows (list[pd.DataFrame]): Buffered Telemetry rows.
+            driver_samples (list[tuple[np.ndarray, TelemetryArrays]]):
+                Buffered samples with the lap_id of each sample.
+            completed (np.ndarray): lap_ids that get no more samples.
+            weather (pd.DataFrame): The session's weather, see
+                __weather_values.
+            driver_id (int): The driver.
+
+        Returns:
+            tuple[list[pd.DataFrame], list[tuple[np.ndarray, TelemetryArrays]]]:
+            The buffered rows and samples of the laps still open. Samples
+            outside every lap are dropped.
+        """
+        completed_rows, open_rows = [], []
+        for rows in driver_rows:
+            done = rows['lap_id'].isin(completed)
+            completed_rows.append(rows[done])
+            open_rows.append(rows[~done & rows['lap_id'].notna()])
+        completed_samples, open_samples = [], []
+        for block_lap_ids, block in driver_samples:
+            done = pd.Series(block_lap_ids).isin(completed).to_numpy()
+            still_open = ~done & pd.notna(block_lap_ids)
+            completed_samples.append((block_lap_ids[done],
+                                      {name: values[done] for name, values in block.items()}))
+            open_samples.append((block_lap_ids[still_open],
+                                 {name: values[still_open] for name, values in block.items()}))
+
+        self.__insert_lap_summaries(
+            [rows for rows in completed_rows if len(rows)], weather)
+        self.__insert_lap_telemetry(
+            [sample for sample in completed_samples if len(sample[0])], driver_id)
+        return ([rows for rows in open_rows if len(rows)],
+                [sample for sample in open_samples if len(sample[0])])
+
+    def __insert_lap_summaries(self, driver_rows: list[pd.DataFrame],
+                               weather: pd.DataFrame) -> None:
+        """
+        Summarize the telemetry of a driver per lap into LapTelemetrySummary.
+
+        Args:
+            driver_rows (list[pd.DataFrame]): Blocks of Telemetry rows of a
+                single driver.
+            weather (pd.DataFrame): The session's weather, see
+                __weather_values.
+        """
+        if not driver_rows:
+            return
+        self.__insert_rows('LapTelemetrySummary',
+                           summarize_laps(pd.concat(driver_rows), weather))
+
+    def __assign_sample_slots(self, session_id: int) -> None:
+        """
+        Give the sampled Telemetry rows of a session their sample_slot, see
+        _assign_sample_slots.
+
+        Args:
+            session_id (int): The session.
+        """
+        rows = pd.read_sql_query(
+            "SELECT telemetry_id, lap_id, datetime FROM Telemetry WHERE session_id = ?",
+            self.conn, params=(session_id,), dtype={'lap_id': 'Int64', 'datetime': 'Int64'})
+        slots = _assign_sample_slots(
+            rows['lap_id'], rows['datetime'], self.telemetry_samples_per_lap)
+        picked = pd.notna(slots)
+        self.cursor.execute(
+            "UPDATE Telemetry SET sample_slot = NULL WHERE session_id = ? AND sample_slot IS NOT NULL",
+            (session_id,))
+        self.cursor.executemany(
+            "UPDATE Telemetry SET sample_slot = ? WHERE telemetry_id = ?",
+            zip(slots[picked], rows['telemetry_id'][picked].tolist()))
+
+    def __summarize_stored_laps(self, session_id: int) -> None:
+        """
+        Rebuild the LapTelemetrySummary rows of a session from its stored
+        Telemetry rows or LapTelemetry records.
+
+        Args:
+            session_id (int): The session.
+        """
+        self.cursor.execute(
+            "DELETE FROM LapTelemetrySummary WHERE session_id = ?", (session_id,))
+        rows = session_telemetry(self.conn, session_id)
+        if not rows.empty:
+            self.__insert_rows('LapTelemetrySummary', summarize_laps(
+                rows, self.__weather_values(session_id)))
+
+    def __insert_lap_telemetry(self, driver_samples: list[tuple[np.ndarray, TelemetryArrays]],
+                               driver_id: int | None) -> None:
+        """
+        Pack the telemetry of a driver per lap and insert it into LapTelemetry.
+
+        Args:
+            driver_samples (list[tuple[np.ndarray, TelemetryArrays]]): Blocks
+                of samples of a single driver with the lap_id of each sample.
+            driver_id (int | None): The driver.
+        """
+        if not driver_samples:
+            return
+        lap_ids = np.concatenate([block_lap_ids for block_lap_ids, _ in driver_samples])
+        samples = concat_telemetry([block for _, block in driver_samples])
+        records = pd.DataFrame(
+            encode_laps(lap_ids, samples, self.lap_codec),
+            columns=['lap_id', 'start_epoch_ms', 'sample_count', 'samples'])
+        records.insert(1, 'session_id', self._session_id)
+        records.insert(2, 'driver_id', driver_id)
+        records['is_quantized'] = self.lap_codec.quantize
+        records['compression'] = self.lap_codec.compression
+        self.__insert_rows('LapTelemetry', records)
 
     def insert_weather(self, session: Session) -> None:
         """
@@ -346,28 +1689,149 @@ class FastF1ToSQL:
         Args:
             session (Session): The FastF1 session containing weather data.
         """
+        # Build the rows from the shared FastF1 frame without modifying it
         weather_data = cast(pd.DataFrame, session.weather_data)
-        weather_data['session_id'] = self._session_id
-
-        weather_data['datetime'] = self._session_start_date + \
-            weather_data['Time']
-
-        for _, sample in weather_data.iterrows():
-            weather_sample: dict[str, Any] = {
-                'session_id': sample['session_id'],
-                'air_temperature_in_celsius': sample['AirTemp'],
-                'track_temperature_in_celsius': sample['TrackTemp'],
-                'wind_speed_in_meters_per_seconds': sample['WindSpeed'],
-                'wind_direction_in_grads': sample['WindDirection'],
-                'relative_air_humidity_in_percentage': sample['Humidity'],
-                'air_pressure_in_mbar': sample['Pressure'],
-                'is_raining': sample['Rainfall'],
-                'datetime': str(sample['datetime']),
-            }
-            columns = ', '.join(weather_sample.keys())
-            placeholders = ':' + ', :'.join(weather_sample.keys())
-            query = f"INSERT INTO Weather ({columns}) VALUES ({placeholders})"
-            self.cursor.execute(query, weather_sample)
+        weather_rows = pd.DataFrame({
+            'session_id': self._session_id,
+            'air_temperature_in_celsius': weather_data['AirTemp'],
+            'track_temperature_in_celsius': weather_data['TrackTemp'],
+            'wind_speed_in_meters_per_seconds': weather_data['WindSpeed'],
+            'wind_direction_in_grads': weather_data['WindDirection'],
+            'relative_air_humidity_in_percentage': weather_data['Humidity'],
+            'air_pressure_in_mbar': weather_data['Pressure'],
+            'is_raining': weather_data['Rainfall'],
+            'datetime': _epoch_ms(
+                self._session_start_date + weather_data['Time']),
+        })
+        weather_key = ('session_id', 'datetime')
+        self.__insert_rows('Weather', weather_rows, conflict_key=weather_key)
+        self.__delete_stale_rows('Weather', 'weather_id', weather_key, weather_rows)
+
+    def __insert_rows(self, table: str, rows: pd.DataFrame,
+                      conflict_key: tuple[str, ...] = ()) -> None:
+        """
+        Insert every row of a frame into a table with a single executemany.
+
+        Args:
+            table (str): Name of the destination table.
+            rows (pd.DataFrame): Frame whose columns match the table columns.
+            conflict_key (tuple[str, ...]): Columns of a unique index. When
+                given, rows that already exist are updated in place instead.
+        """
+        columns = ', '.join(rows.columns)
+        placeholders = ', '.join(['?' for _ in rows.columns])
+        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        if conflict_key:
+            updates = ', '.join(f"{column} = excluded.{column}"
+                                for column in rows.columns if column not in conflict_key)
+            query += f" ON CONFLICT ({', '.join(conflict_key)}) DO UPDATE SET {updates}"
+        self.cursor.executemany(query, _frame_to_records(rows))
+        self._report.rows_written[table] += len(rows)
+
+    def __upsert_row(self, table: str, id_column: str, row: dict[str, Any],
+                     conflict_key: tuple[str, ...]) -> int:
+        """
+        Insert or update a single row on its natural key.
+
+        Args:
+            table (str): Name of the destination table.
+            id_column (str): The table's integer primary key.
+            row (dict[str, Any]): Column name to value.
+            conflict_key (tuple[str, ...]): Columns of the natural key index.
+
+        Returns:
+            int: The primary key of the row, unchanged when it already existed.
+        """
+        self.__insert_rows(table, pd.DataFrame([row]), conflict_key)
+        where = ' AND '.join(f"{column} = ?" for column in conflict_key)
+        self.cursor.execute(f"SELECT {id_column} FROM {table} WHERE {where}",
+                            [row[column] for column in conflict_key])
+        return self.cursor.fetchone()[0]
+
+    def __delete_stale_rows(self, table: str, id_column: str,
+                            key_columns: tuple[str, ...], rows: pd.DataFrame) -> None:
+        """
+        Delete the session's rows whose natural key is no longer in the source.
+
+        Args:
+            table (str): Name of the session-scoped table.
+            id_column (str): The table's integer primary key.
+            key_columns (tuple[str, ...]): Columns of the natural key.
+            rows (pd.DataFrame): The rows just written, holding the key columns.
+        """
+        current = set(_frame_to_records(rows[list(key_columns)]))
+        self.cursor.execute(
+            f"SELECT {id_column}, {', '.join(key_columns)} FROM {table} WHERE session_id = ?",
+            (self._session_id,))
+        stale = [(row_id,) for row_id, *key in self.cursor.fetchall()
+                 if tuple(key) not in current]
+        if stale:
+            self.cursor.executemany(
+                f"DELETE FROM {table} WHERE {id_column} = ?", stale)
+
+    def __session_weather(self, session_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the weather samples of a session, sorted by time.
+
+        Args:
+            session_id (int): The session.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Epoch milliseconds of every weather
+            sample and the matching weather_ids.
+        """
+        self.cursor.execute('''
+            SELECT datetime, weather_id FROM Weather
+            WHERE session_id = ? AND datetime IS NOT NULL
+            ORDER BY datetime
+        ''', (session_id,))
+        rows = self.cursor.fetchall()
+        return (np.array([row[0] for row in rows], dtype='int64'),
+                np.array([row[1] for row in rows], dtype=object))
+
+    def __weather_values(self, session_id: int) -> pd.DataFrame:
+        """
+        Get the weather of a session that lap summaries average.
+
+        Args:
+            session_id (int): The session.
+
+        Returns:
+            pd.DataFrame: Air temperature, track temperature and wind speed
+            indexed by weather_id.
+        """
+        return pd.read_sql_query('''
+            SELECT weather_id, air_temperature_in_celsius,
+                   track_temperature_in_celsius, wind_speed_in_meters_per_seconds
+            FROM Weather WHERE session_id = ?
+        ''', self.conn, params=(session_id,), index_col='weather_id')
+
+    def __link_weather(self, table: str, session_id: int) -> None:
+        """
+        Point the weather_id of a session's rows at the weather sample in
+        effect at their time.
+
+        Args:
+            table (str): One of WEATHER_LINKED_TABLES.
+            session_id (int): The session.
+        """
+        id_column, time_column = WEATHER_LINKED_TABLES[table]
+        rows = pd.read_sql_query(
+            f"SELECT {id_column}, {time_column} FROM {table} WHERE session_id = ?",
+            self.conn, params=(session_id,), dtype={time_column: 'Int64'})
+        if rows.empty:
+            return
+        weather_ids = _assign_weather_ids(
+            rows[time_column], *self.__session_weather(session_id))
+        self.cursor.executemany(
+            f"UPDATE {table} SET weather_id = ? WHERE {id_column} = ?",
+            zip(weather_ids, rows[id_column].tolist()))
+
+    def __over_memory_cap(self) -> bool:
+        """Check whether the process uses more memory than max_memory_mb."""
+        if self.max_memory_mb is None:
+            return False
+        return current_rss_bytes() > self.max_memory_mb * MB
 
     def get_or_create_track(self, track_name: str, country: str) -> int:
         """
@@ -390,195 +1854,46 @@ class FastF1ToSQL:
                 "INSERT INTO Tracks (track_name, country) VALUES (?, ?)", (track_name, country))
             return self.cursor.lastrowid or 0
 
-    def __get_lap_id(self, session: Session, driver_name: str, time: datetime) -> int:
+    def __lap_boundaries(self, laps: pd.DataFrame, driver_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Get the lap_id for a given driver and time.
+        Get the time window and lap_id of every lap of a driver.
+
+        A lap runs from its start until the start of the next lap; the last
+        lap runs until the lap's end time.
 
         Args:
-            session (fastf1.core.Session): The FastF1 session.
-            driver (str): The driver's name or abbreviation.
-            time (pd.Timestamp): The timestamp to find the corresponding lap.
+            laps (pd.DataFrame): The laps of a single driver.
+            driver_id (int): The driver.
 
         Returns:
-            int: The lap_id of the found lap.
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Sorted lap start times,
+            lap end times and the matching lap_ids.
         """
+        laps = laps.assign(
+            lap_start=pd.to_datetime(laps['LapStartDate']),
+            lap_end=self._session_start_date + laps['Time'],
+        ).dropna(subset=['lap_start']).sort_values('lap_start')
 
-        laps = session.laps.pick_driver(driver_name).copy()
-        # Convert LapStartDate to pd.Timestamp for proper comparison
-        laps['LapStartTime'] = pd.to_datetime(laps['LapStartDate'])
-        # Find the lap where the given time falls between LapStartTime and LapStartTime of the next lap
-        matching_laps = laps.loc[(laps['LapStartTime'] <= time) & (
-            laps['LapStartTime'].shift(-1) > time)]
-
-        if matching_laps.empty:
-            # Handle the case when no matching lap is found
-            print(
-                f"No matching lap found for driver {driver_name} at time {time}")
-            return 999  # or some default value, or raise a custom exception
-
-        lap = matching_laps.iloc[0]
-
-        if self._session_id is None:
-            raise ValueError("No ID was generated")
+        lap_starts = laps['lap_start'].to_numpy()
+        lap_ends = laps['lap_start'].shift(-1).to_numpy(copy=True)
+        if len(laps):
+            lap_ends[-1] = laps['lap_end'].iloc[-1]
+        lap_ids = np.array([self._lap_ids.get((driver_id, int(lap_number)))
+                            for lap_number in laps['LapNumber']], dtype=object)
+        return lap_starts, lap_ends, lap_ids
 
-        self.cursor.execute("SELECT lap_id FROM Laps WHERE session_id = ? AND driver_name = ? AND lap_number = ?",
-                            (self._session_id, driver_name, lap['LapNumber']))
-        return self.cursor.fetchone()[0]
-
-    def __update_laps(self) -> None:
-        """Update the laps table with the new data."""
-        console.print('> Updating laps table...')
-        self.cursor.execute('''
-            UPDATE Laps
-            SET 
-                pin_in_time_in_datetime = CASE 
-                    WHEN pin_in_time_in_datetime = 'NaT' THEN NULL 
-                    ELSE pin_in_time_in_datetime 
-                END,
-                pin_out_time_in_datetime = CASE 
-                    WHEN pin_out_time_in_datetime = 'NaT' THEN NULL 
-                    ELSE pin_out_time_in_datetime 
-                END
-            WHERE 
-                pin_in_time_in_datetime = 'NaT' 
-                OR pin_out_time_in_datetime = 'NaT';
-
-        ''')
-
-    def __create_data_analysis_views(self) -> None:
-        """Create data analysis views in the database."""
-        console.print('> Creating data analysis views...')
-        self.cursor.executescript('''
-            -- 1. Driver Performance Summary with Weather
-            CREATE VIEW IF NOT EXISTS DriverPerformanceSummaryWithWeather AS
-            SELECT 
-                l.driver_name,
-                e.event_name,
-                s.session_type,
-                t.track_name,
-                COUNT(l.lap_id) AS total_laps,
-                AVG(l.lap_time_in_seconds) AS avg_lap_time,
-                MIN(l.lap_time_in_seconds) AS best_lap_time,
-                AVG(l.sector_1_time_in_seconds) AS avg_sector1_time,
-                AVG(l.sector_2_time_in_seconds) AS avg_sector2_time,
-                AVG(l.sector_3_time_in_seconds) AS avg_sector3_time,
-                AVG(l.finish_line_speed_trap_in_km) AS avg_finish_line_speed,
-                COUNT(CASE WHEN l.is_personal_best THEN 1 END) AS personal_best_laps,
-                AVG(w.air_temperature_in_celsius) AS avg_air_temp,
-                AVG(w.track_temperature_in_celsius) AS avg_track_temp,
-                SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage
-            FROM Laps l
-            JOIN Sessions s ON l.session_id = s.session_id
-            JOIN Tracks t ON s.track_id = t.track_id
-            JOIN Event e ON s.event_id = e.event_id
-            LEFT JOIN Weather w ON s.session_id = w.session_id 
-                AND l.lap_start_time_in_datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-            GROUP BY l.driver_name, e.event_id, s.session_id;
-
-            -- 2. Tyre Performance Analysis with Weather
-            CREATE VIEW IF NOT EXISTS TyrePerformanceAnalysisWithWeather AS
-            SELECT 
-                l.driver_name,
-                e.event_name,
-                s.session_type,
-                t.track_name,
-                l.tyre_compound,
-                AVG(l.tyre_life_in_laps) AS avg_tyre_life,
-                AVG(l.lap_time_in_seconds) AS avg_lap_time,
-                AVG(l.longest_strait_speed_trap_in_km) AS avg_top_speed,
-                COUNT(CASE WHEN l.is_fresh_tyre THEN 1 END) AS fresh_tyre_laps,
-                COUNT(CASE WHEN NOT l.is_fresh_tyre THEN 1 END) AS used_tyre_laps,
-                AVG(w.track_temperature_in_celsius) AS avg_track_temp,
-                AVG(w.air_temperature_in_celsius) AS avg_air_temp
-            FROM Laps l
-            JOIN Sessions s ON l.session_id = s.session_id
-            JOIN Tracks t ON s.track_id = t.track_id
-            JOIN Event e ON s.event_id = e.event_id
-            LEFT JOIN Weather w ON s.session_id = w.session_id 
-                AND l.lap_start_time_in_datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-            GROUP BY l.driver_name, e.event_id, s.session_id, l.tyre_compound;
-
-            -- 3. Weather Impact Analysis
-            CREATE VIEW IF NOT EXISTS WeatherImpactAnalysis AS
-            SELECT 
-                e.event_name,
-                s.session_type,
-                t.track_name,
-                AVG(w.air_temperature_in_celsius) AS avg_air_temp,
-                AVG(w.track_temperature_in_celsius) AS avg_track_temp,
-                AVG(w.relative_air_humidity_in_percentage) AS avg_humidity,
-                AVG(w.wind_speed_in_meters_per_seconds) AS avg_wind_speed,
-                SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage,
-                AVG(l.lap_time_in_seconds) AS avg_lap_time,
-                MIN(l.lap_time_in_seconds) AS best_lap_time
-            FROM Weather w
-            JOIN Sessions s ON w.session_id = s.session_id
-            JOIN Tracks t ON s.track_id = t.track_id
-            JOIN Event e ON s.event_id = e.event_id
-            JOIN Laps l ON s.session_id = l.session_id
-                AND l.lap_start_time_in_datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-            GROUP BY e.event_id, s.session_id;
-
-            -- 4. Event Performance Overview
-            CREATE VIEW IF NOT EXISTS EventPerformanceOverview AS
-            SELECT 
-                e.event_name,
-                e.country,
-                e.location,
-                s.session_type,
-                COUNT(DISTINCT l.driver_name) AS driver_count,
-                AVG(l.lap_time_in_seconds) AS avg_lap_time,
-                MIN(l.lap_time_in_seconds) AS best_lap_time,
-                MAX(l.finish_line_speed_trap_in_km) AS max_finish_line_speed,
-                AVG(w.air_temperature_in_celsius) AS avg_air_temp,
-                AVG(w.track_temperature_in_celsius) AS avg_track_temp,
-                SUM(CASE WHEN w.is_raining THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rain_percentage
-            FROM Event e
-            JOIN Sessions s ON e.event_id = s.event_id
-            JOIN Laps l ON s.session_id = l.session_id
-            LEFT JOIN Weather w ON s.session_id = w.session_id 
-                AND l.lap_start_time_in_datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-            GROUP BY e.event_id, s.session_id;
-
-            -- 5. Telemetry Analysis with Weather (Optimized)
-            CREATE VIEW IF NOT EXISTS TelemetryAnalysisWithWeather AS
-            WITH SampledTelemetry AS (
-                SELECT *,
-                       ROW_NUMBER() OVER (PARTITION BY lap_id ORDER BY RANDOM()) as rn
-                FROM Telemetry
-            )
-            SELECT 
-                l.lap_id,
-                l.driver_name,
-                e.event_name,
-                s.session_type,
-                t.track_name,
-                l.lap_number,
-                l.lap_time_in_seconds,
-                AVG(tel.speed_in_km) AS avg_speed,
-                MAX(tel.speed_in_km) AS max_speed,
-                AVG(tel.RPM) AS avg_RPM,
-                MAX(tel.RPM) AS max_RPM,
-                AVG(tel.throttle_input) AS avg_throttle,
-                SUM(CASE WHEN tel.is_brake_pressed THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS brake_percentage,
-                SUM(CASE WHEN tel.is_DRS_open THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS drs_usage_percentage,
-                SUM(CASE WHEN tel.is_off_track THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS off_track_percentage,
-                AVG(w.air_temperature_in_celsius) AS avg_air_temp,
-                AVG(w.track_temperature_in_celsius) AS avg_track_temp,
-                AVG(w.wind_speed_in_meters_per_seconds) AS avg_wind_speed
-            FROM Laps l
-            JOIN Sessions s ON l.session_id = s.session_id
-            JOIN Tracks t ON s.track_id = t.track_id
-            JOIN Event e ON s.event_id = e.event_id
-            JOIN SampledTelemetry tel ON l.lap_id = tel.lap_id AND tel.rn <= 100
-            LEFT JOIN Weather w ON s.session_id = w.session_id 
-                AND tel.datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-            GROUP BY l.lap_id;
-        ''')
-        self.conn.commit()
+    def __refresh_analysis_tables(self, session_id: int) -> None:
+        """
+        Recompute the rows of a session in every ANALYSIS_TABLES table, so
+        the other sessions' rows never have to be aggregated again.
 
+        Args:
+            session_id (int): The session that was written.
+        """
+        for table in ANALYSIS_TABLES:
+            self.cursor.execute(
+                f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
 
-# Usage example:
-session = fastf1.get_session(2023, 'Bahrain', 'Q')
-converter = FastF1ToSQL('Bahrain_2023_Q.db')
-converter.process_session(session)
+        for table, query in ANALYSIS_REFRESH_QUERIES.items():
+            self.cursor.execute(f"INSERT INTO {table} {query}",
+                                {'session_id': session_id})
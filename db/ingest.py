@@ -0,0 +1,307 @@
+"""
+Batch ingestion of FastF1 sessions into a SQLite database.
+
+Loads every session of a year/event/session matrix and writes it with
+FastF1ToSQL. Progress is recorded per session in the IngestCheckpoints table,
+so a crashed or interrupted run picks up where it stopped. With --refresh,
+completed sessions are processed again; only the tables whose source data
+changed are rewritten, so refreshing unchanged sessions is cheap:
+
+    python -m db.ingest --db db/F1_2023.db --years 2023 --sessions Q R
+    python -m db.ingest --db db/Bahrain_2023_Q.db --years 2023 --events Bahrain --sessions Q
+    python -m db.ingest --db db/F1_2023.db --years 2023 --events Bahrain --refresh
+
+--bulk loads with deferred index builds and relaxed durability, see
+FastF1ToSQL.bulk_load; use it for large first-time loads. The sessions and
+their checkpoints are committed once at the end, so an interrupted bulk load
+starts over.
+
+Sessions come from the FastF1 APIs unless --source says otherwise, see
+db.session_sources. --capture-dir keeps a local copy of every loaded session
+that --source replay can ingest again without network access:
+
+    python -m db.ingest --db db/F1_2023.db --years 2023 --events Bahrain --capture-dir captures
+    python -m db.ingest --db /tmp/replay.db --years 2023 --events Bahrain --source replay --replay-dir captures
+
+--export-dir also writes the Laps, Weather and Telemetry of every written
+session to Parquet or Arrow datasets, see db.export.
+"""
+import argparse
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+import fastf1
+from rich.console import Console
+from db.export import EXPORT_FORMATS
+from db.formula1_databases import TELEMETRY_STORAGES, FastF1ToSQL
+from db.session_sources import FastF1Source, ReplaySource, SessionSource, get_source
+from db.telemetry import RESAMPLE_STRATEGIES
+
+console = Console(style="chartreuse1 on grey7")
+
+
+@dataclass(frozen=True)
+class SessionJob:
+    """A single session to ingest."""
+    year: int
+    event_name: str
+    session_name: str
+
+    def __str__(self) -> str:
+        return f"{self.year} {self.event_name} - {self.session_name}"
+
+
+class CheckpointStore:
+    """
+    Per-session ingestion progress, stored next to the data it describes.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, commit: bool = True) -> None:
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            conn (sqlite3.Connection): Connection to the ingestion database.
+            commit (bool): Commit every status as it is recorded. False
+                leaves them to the transaction of the caller, e.g. a
+                FastF1ToSQL.bulk_load block.
+        """
+        self.conn = conn
+        self.commit = commit
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS IngestCheckpoints (
+                year INTEGER NOT NULL,
+                event_name TEXT NOT NULL,
+                session_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at DATETIME,
+                PRIMARY KEY (year, event_name, session_name)
+            )
+        ''')
+        if self.commit:
+            self.conn.commit()
+
+    def is_done(self, job: SessionJob) -> bool:
+        """
+        Check whether a session has already been ingested.
+
+        Args:
+            job (SessionJob): The session to check.
+
+        Returns:
+            bool: True when the session was written successfully before.
+        """
+        row = self.conn.execute(
+            "SELECT status FROM IngestCheckpoints WHERE year = ? AND event_name = ? AND session_name = ?",
+            (job.year, job.event_name, job.session_name)).fetchone()
+        return row is not None and row[0] == 'done'
+
+    def mark(self, job: SessionJob, status: str, error: str | None = None) -> None:
+        """
+        Record the status of a session and commit it, see commit.
+
+        Args:
+            job (SessionJob): The session.
+            status (str): One of 'running', 'done' or 'failed'.
+            error (str | None): Error message for failed sessions.
+        """
+        self.conn.execute('''
+            INSERT INTO IngestCheckpoints (year, event_name, session_name, status, attempts, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (year, event_name, session_name) DO UPDATE SET
+                status = excluded.status,
+                attempts = attempts + excluded.attempts,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+        ''', (job.year, job.event_name, job.session_name, status,
+              1 if status == 'running' else 0, error,
+              datetime.now(timezone.utc).isoformat(timespec='seconds')))
+        if self.commit:
+            self.conn.commit()
+
+
+def build_jobs(years: list[int], events: list[str] | None,
+               sessions: list[str]) -> list[SessionJob]:
+    """
+    Expand the year/event/session matrix into session jobs.
+
+    Args:
+        years (list[int]): Championship years.
+        events (list[str] | None): Event names; None takes every event of the
+            year's schedule, testing excluded.
+        sessions (list[str]): Session identifiers, e.g. 'FP1', 'Q' or 'R'.
+
+    Returns:
+        list[SessionJob]: One job per existing session, in schedule order.
+    """
+    jobs = []
+    for year in years:
+        if events is None:
+            schedule = fastf1.get_event_schedule(year, include_testing=False)
+            year_events = list(schedule['EventName'])
+        else:
+            year_events = events
+        for event_name in year_events:
+            for session_name in sessions:
+                jobs.append(SessionJob(year, event_name, session_name))
+    return jobs
+
+
+def load_sessions(jobs: list[SessionJob], concurrency: int,
+                  source: SessionSource) -> Iterator[tuple[SessionJob, Future]]:
+    """
+    Load sessions in a thread pool with at most ``concurrency`` in flight.
+
+    Loading is network bound, so it overlaps well with writing the previous
+    session. Bounding the number of in-flight loads also bounds how many
+    loaded sessions are held in memory at once.
+
+    Args:
+        jobs (list[SessionJob]): Sessions to load.
+        concurrency (int): Maximum number of sessions loaded at the same time.
+        source (SessionSource): Where the sessions are loaded from.
+
+    Yields:
+        tuple[SessionJob, Future]: Each job with its finished load future.
+    """
+    pending = list(jobs)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: dict[Future, SessionJob] = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < concurrency:
+                job = pending.pop(0)
+                in_flight[executor.submit(source.load, job.year, job.event_name,
+                                          job.session_name)] = job
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+
+
+def ingest(converter: FastF1ToSQL, jobs: list[SessionJob], concurrency: int = 2,
+           refresh: bool = False, source: SessionSource | None = None,
+           capture: ReplaySource | None = None) -> None:
+    """
+    Ingest sessions, skipping the ones a previous run already completed.
+
+    Sessions are loaded concurrently but written one at a time by the calling
+    thread, which owns the SQLite connection.
+
+    Args:
+        converter (FastF1ToSQL): Converter writing to the target database.
+        jobs (list[SessionJob]): Sessions to ingest.
+        concurrency (int): Maximum number of sessions loaded at the same time.
+        refresh (bool): Process completed sessions again as well.
+        source (SessionSource | None): Where sessions are loaded from, the
+            FastF1 APIs by default.
+        capture (ReplaySource | None): Also write every loaded session to
+            this replay source.
+    """
+    # A bulk load commits the sessions once at its end; committing their
+    # checkpoints as they go would commit the sessions with them
+    checkpoints = CheckpointStore(converter.conn, commit=not converter.bulk_loading)
+    todo = [job for job in jobs if refresh or not checkpoints.is_done(job)]
+    console.print(
+        f"> {len(jobs) - len(todo)} of {len(jobs)} sessions already ingested, {len(todo)} to go")
+
+    failed = 0
+    for job, loaded in load_sessions(todo, concurrency, source or FastF1Source()):
+        checkpoints.mark(job, 'running')
+        try:
+            session = loaded.result()
+            if capture is not None:
+                capture.capture(session, job.event_name, job.session_name)
+            converter.process_session(session, load=False)
+        except Exception as error:
+            failed += 1
+            console.print(f"> Failed to ingest {job}: {error}")
+            checkpoints.mark(job, 'failed', repr(error))
+        else:
+            checkpoints.mark(job, 'done')
+
+    console.print(
+        f"> Ingested {len(todo) - failed} sessions, {failed} failed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ingest FastF1 sessions into a SQLite database")
+    parser.add_argument('--db', required=True,
+                        help="Path to the SQLite database file")
+    parser.add_argument('--years', type=int, nargs='+', required=True,
+                        help="Championship years to ingest")
+    parser.add_argument('--events', nargs='+',
+                        help="Event names (default: every event of the year)")
+    parser.add_argument('--sessions', nargs='+', default=['Q', 'R'],
+                        help="Session identifiers (default: Q R)")
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help="Sessions loaded at the same time (default: 2)")
+    parser.add_argument('--telemetry-workers', type=int, default=1,
+                        help="Processes used to extract telemetry (default: 1)")
+    parser.add_argument('--resample-interval', default='100ms',
+                        help="Telemetry resample interval, 'none' to keep every sample")
+    parser.add_argument('--resample-strategy', default='first',
+                        choices=RESAMPLE_STRATEGIES)
+    parser.add_argument('--telemetry-storage', default='rows',
+                        choices=TELEMETRY_STORAGES,
+                        help="Telemetry as sample rows, packed per-lap records or both (default: rows)")
+    parser.add_argument('--telemetry-samples-per-lap', type=int, default=100,
+                        help="Telemetry rows per lap sampled for TelemetryAnalysisWithWeather (default: 100)")
+    parser.add_argument('--cache-dir',
+                        help="FastF1 cache directory")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Process completed sessions again, rewriting only what changed")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Defer secondary indexes and relax durability while loading")
+    parser.add_argument('--source', default='fastf1',
+                        choices=('fastf1', 'replay', 'synthetic'),
+                        help="Where sessions are loaded from (default: fastf1)")
+    parser.add_argument('--replay-dir',
+                        help="Directory of captured sessions for --source replay")
+    parser.add_argument('--capture-dir',
+                        help="Also capture every loaded session to this directory")
+    parser.add_argument('--export-dir',
+                        help="Also export written sessions to partitioned datasets in this directory")
+    parser.add_argument('--export-format', default='parquet',
+                        choices=EXPORT_FORMATS,
+                        help="Format of the exported datasets (default: parquet)")
+    args = parser.parse_args()
+
+    if args.source != 'fastf1' and not args.events:
+        parser.error("--events is required unless sessions come from FastF1")
+    if args.source == 'replay' and not args.replay_dir:
+        parser.error("--source replay requires --replay-dir")
+
+    if args.cache_dir:
+        fastf1.Cache.enable_cache(args.cache_dir)
+
+    converter = FastF1ToSQL(
+        args.db,
+        resample_interval=None if args.resample_interval.lower() == 'none' else args.resample_interval,
+        resample_strategy=args.resample_strategy,
+        telemetry_workers=args.telemetry_workers,
+        telemetry_storage=args.telemetry_storage,
+        telemetry_samples_per_lap=args.telemetry_samples_per_lap,
+        export_dir=args.export_dir,
+        export_format=args.export_format,
+    )
+    jobs = build_jobs(args.years, args.events, args.sessions)
+    source = get_source(args.source, args.replay_dir)
+    capture = ReplaySource(args.capture_dir) if args.capture_dir else None
+    try:
+        if args.bulk:
+            with converter.bulk_load():
+                ingest(converter, jobs, args.concurrency, args.refresh,
+                       source, capture)
+        else:
+            ingest(converter, jobs, args.concurrency, args.refresh,
+                   source, capture)
+    finally:
+        converter.close()
+
+
+if __name__ == "__main__":
+    main()
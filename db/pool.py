@@ -0,0 +1,199 @@
+"""
+Read-only connection pool the app serves the SQLite database from.
+
+The tools, their thread pool (see tools.executor) and the agent's
+SQLDatabaseToolkit all query the database through one engine built here.
+Its connections are opened read-only (URI mode=ro) and tuned for serving,
+per deployment with environment variables (or a .env file):
+
+    F1_POOL_SIZE          Connections kept open (default 4). Queries beyond
+                          that wait for a connection to be returned.
+    F1_POOL_TIMEOUT       Seconds to wait for a connection (default 30)
+    F1_SQLITE_MMAP_MB     Database bytes read through mmap (default 256)
+    F1_SQLITE_CACHE_MB    Page cache per connection (default 64)
+    F1_SQLITE_TEMP_STORE  Where sorts and temporary tables go: 'memory'
+                          (default), 'file' or 'default'
+    F1_SQLITE_IMMUTABLE   Set to 1 to also open the file immutable, which
+                          skips locking and change detection. Only for
+                          databases nothing writes to while the app runs:
+                          ingests would go unnoticed (see tools.cache).
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
+
+POOL_SIZE = int(os.getenv('F1_POOL_SIZE', '4'))
+POOL_TIMEOUT = float(os.getenv('F1_POOL_TIMEOUT', '30'))
+MMAP_MB = int(os.getenv('F1_SQLITE_MMAP_MB', '256'))
+CACHE_MB = int(os.getenv('F1_SQLITE_CACHE_MB', '64'))
+TEMP_STORE = os.getenv('F1_SQLITE_TEMP_STORE', 'memory')
+IMMUTABLE = os.getenv('F1_SQLITE_IMMUTABLE', '') not in ('', '0')
+
+TEMP_STORES: tuple[str, ...] = ('default', 'file', 'memory')
+
+# Set by probing() on the threads whose statements are bookkeeping
+_probing = threading.local()
+
+
+@dataclass
+class PoolStats:
+    """Use of a read-only pool since it was created."""
+    connections_opened: int = 0
+    checkouts: int = 0
+    # Seconds spent waiting for a connection, summed over the checkouts
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    # SQL statements run on the pool's connections for the tools and the
+    # agent, and the PRAGMAs and probing() statements besides them
+    queries: int = 0
+    probes: int = 0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        """Average wait for a connection."""
+        return self.wait_seconds / self.checkouts if self.checkouts else 0.0
+
+
+class _StatsRecorder:
+    """Thread-safe counters behind PoolStats."""
+
+    def __init__(self) -> None:
+        self._stats = PoolStats()
+        self._lock = threading.Lock()
+
+    def opened(self) -> None:
+        with self._lock:
+            self._stats.connections_opened += 1
+
+    def checked_out(self, wait_seconds: float) -> None:
+        with self._lock:
+            self._stats.checkouts += 1
+            self._stats.wait_seconds += wait_seconds
+            self._stats.max_wait_seconds = max(self._stats.max_wait_seconds, wait_seconds)
+
+    def queried(self, statement: str) -> None:
+        probe = getattr(_probing, 'active', False) or \
+            statement.lstrip()[:6].upper() == 'PRAGMA'
+        with self._lock:
+            if probe:
+                self._stats.probes += 1
+            else:
+                self._stats.queries += 1
+
+    def snapshot(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(**vars(self._stats))
+
+
+class ReadOnlyQueuePool(QueuePool):
+    """QueuePool that records checkouts and the time spent waiting for them."""
+
+    def __init__(self, *args: Any, recorder: _StatsRecorder | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.recorder = recorder or _StatsRecorder()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        entry = super()._do_get()
+        self.recorder.checked_out(time.perf_counter() - start)
+        return entry
+
+    def recreate(self) -> "ReadOnlyQueuePool":
+        # Keep the counters when the engine is disposed
+        pool = super().recreate()
+        pool.recorder = self.recorder
+        return pool
+
+
+def connect_read_only(path: str, recorder: _StatsRecorder | None = None,
+                      mmap_mb: int = MMAP_MB, cache_mb: int = CACHE_MB,
+                      temp_store: str = TEMP_STORE,
+                      immutable: bool = IMMUTABLE) -> sqlite3.Connection:
+    """
+    Open a read-only connection tuned for serving queries.
+
+    Args:
+        path (str): Path of the SQLite database.
+        recorder (_StatsRecorder | None): Counts the connection and its
+            statements.
+        mmap_mb (int): PRAGMA mmap_size, in MB.
+        cache_mb (int): PRAGMA cache_size, in MB.
+        temp_store (str): PRAGMA temp_store, one of TEMP_STORES.
+        immutable (bool): Open the file with immutable=1.
+
+    Returns:
+        sqlite3.Connection: The connection, usable from any thread.
+    """
+    if temp_store not in TEMP_STORES:
+        raise ValueError(
+            f"Unknown temp store '{temp_store}', expected one of {TEMP_STORES}")
+    uri = f"file:{path}?mode=ro{'&immutable=1' if immutable else ''}"
+    # The pool hands connections to whichever thread checks them out
+    connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    connection.execute(f"PRAGMA mmap_size = {mmap_mb * 1024 * 1024}")
+    # Negative sizes are in KiB
+    connection.execute(f"PRAGMA cache_size = {-cache_mb * 1024}")
+    connection.execute(f"PRAGMA temp_store = {temp_store.upper()}")
+    connection.execute("PRAGMA query_only = ON")
+    if recorder is not None:
+        recorder.opened()
+        connection.set_trace_callback(recorder.queried)
+    return connection
+
+
+@contextmanager
+def probing() -> Iterator[None]:
+    """
+    Count the statements the current thread runs in the block as
+    PoolStats.probes, e.g. schema reflection or checks of the data version.
+    """
+    active = getattr(_probing, 'active', False)
+    _probing.active = True
+    try:
+        yield
+    finally:
+        _probing.active = active
+
+
+def create_read_only_engine(path: str, pool_size: int = POOL_SIZE,
+                            pool_timeout: float = POOL_TIMEOUT) -> Engine:
+    """
+    Create a SQLAlchemy engine on a pool of read-only connections.
+
+    Args:
+        path (str): Path of the SQLite database.
+        pool_size (int): Connections kept open; further checkouts wait.
+        pool_timeout (float): Seconds a checkout waits for a connection.
+
+    Returns:
+        Engine: The engine, see pool_stats for its counters.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"SQLite database '{path}' does not exist")
+    recorder = _StatsRecorder()
+    pool = ReadOnlyQueuePool(lambda: connect_read_only(path, recorder),
+                             pool_size=pool_size, max_overflow=0,
+                             timeout=pool_timeout, recorder=recorder)
+    return create_engine("sqlite://", pool=pool)
+
+
+def pool_stats(engine: Engine) -> PoolStats:
+    """
+    Report the use of a read-only engine's pool.
+
+    Args:
+        engine (Engine): An engine from create_read_only_engine.
+
+    Returns:
+        PoolStats: Copy of the counters.
+    """
+    if not isinstance(engine.pool, ReadOnlyQueuePool):
+        raise ValueError("The engine was not created by create_read_only_engine")
+    return engine.pool.recorder.snapshot()
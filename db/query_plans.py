@@ -0,0 +1,132 @@
+"""
+Query plan checks for the tools/sql queries and the analysis table refreshes.
+
+Run from the repository root:
+
+    python -m db.query_plans
+    python -m db.query_plans --db db/F1_2023.db
+
+Every query is run through EXPLAIN QUERY PLAN against an empty database with
+the current schema and indexes, or against --db. The check fails when a query
+scans a whole table, builds an automatic index or sorts into a temporary
+B-tree, so a query or schema change that loses an index is caught before it
+runs against a full season. The analysis tables are the exception: the tools
+read them whole.
+"""
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import tempfile
+from rich.console import Console
+from db.formula1_databases import ANALYSIS_REFRESH_QUERIES, ANALYSIS_TABLES, FastF1ToSQL
+
+console = Console(style="chartreuse1 on grey7")
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools', 'sql')
+
+# Tables a query may scan: each holds one summary row per session (and driver,
+# tyre or lap), which the tools return in full
+FULL_SCAN_TABLES: frozenset[str] = frozenset(ANALYSIS_TABLES)
+
+# Values bound to the query parameters; the plan does not depend on them
+PLAN_PARAMETERS: dict[str, object] = {
+    'driver_name': 'VER', 'lap_number': 1, 'session_id': 1}
+
+
+def plan_queries(sql_dir: str = SQL_DIR) -> dict[str, str]:
+    """
+    Collect the queries whose plans are checked.
+
+    Args:
+        sql_dir (str): Directory of the tool queries.
+
+    Returns:
+        dict[str, str]: SQL by name, the tool queries under their file name
+        and the analysis refreshes as 'refresh <table>'.
+    """
+    queries = {}
+    for path in sorted(glob.glob(os.path.join(sql_dir, '*.query.sql'))):
+        with open(path, "r") as sql_file:
+            queries[os.path.basename(path).removesuffix('.query.sql')] = sql_file.read()
+    for table, query in ANALYSIS_REFRESH_QUERIES.items():
+        queries[f'refresh {table}'] = query
+    return queries
+
+
+def plan_problems(plan: list[str]) -> list[str]:
+    """
+    Find the steps of a query plan that read more than they need to.
+
+    Args:
+        plan (list[str]): The detail column of EXPLAIN QUERY PLAN.
+
+    Returns:
+        list[str]: The offending steps, empty when the plan is fine.
+    """
+    problems = []
+    for step in plan:
+        # Subquery results are scanned as "(subquery-N)" and constant
+        # selects as "CONSTANT ROW"
+        scan = re.match(r'SCAN (\S+)', step)
+        table = scan.group(1) if scan else None
+        if table and not table.startswith('(') and table != 'CONSTANT' \
+                and table not in FULL_SCAN_TABLES:
+            problems.append(step)
+        elif 'TEMP B-TREE' in step or 'AUTOMATIC' in step:
+            problems.append(step)
+    return problems
+
+
+def check_query_plans(conn: sqlite3.Connection,
+                      queries: dict[str, str]) -> dict[str, list[str]]:
+    """
+    Explain every query and report the ones with a problem in their plan.
+
+    Args:
+        conn (sqlite3.Connection): Database with the schema to check.
+        queries (dict[str, str]): SQL by name, see plan_queries.
+
+    Returns:
+        dict[str, list[str]]: The problems of each query, see plan_problems.
+    """
+    problems = {}
+    for name, query in queries.items():
+        plan = [row[3] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN {query}", PLAN_PARAMETERS)]
+        problems[name] = plan_problems(plan)
+        console.print(f"> {name}: {'ok' if not problems[name] else 'FAILED'}")
+        for step in plan:
+            console.print(f"    {'!' if step in problems[name] else ' '} {step}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check the query plans of the tool queries and analysis refreshes")
+    parser.add_argument('--db',
+                        help="Check this database instead of an empty one with the current schema")
+    parser.add_argument('--sql-dir', default=SQL_DIR,
+                        help="Directory of the tool queries (default: tools/sql)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.db is None:
+            fixture_path = os.path.join(directory, 'query_plans.db')
+            FastF1ToSQL(fixture_path).close()
+            conn = sqlite3.connect(fixture_path)
+        else:
+            conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        problems = check_query_plans(conn, plan_queries(args.sql_dir))
+        conn.close()
+
+    failed = [name for name, steps in problems.items() if steps]
+    if failed:
+        console.print(f"> {len(failed)} queries lost their indexes: {', '.join(failed)}")
+        raise SystemExit(1)
+    console.print(f"> All {len(problems)} query plans use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+MB = 1024 * 1024
+
+
+def current_rss_bytes() -> int:
+    """
+    Get the resident set size of the current process.
+
+    Returns:
+        int: Current RSS in bytes, or the peak RSS where the current value
+        cannot be read (non-Linux platforms).
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes(children: bool = False) -> int:
+    """
+    Get the peak resident set size of this process or of its children.
+
+    Args:
+        children (bool): Report the largest terminated child process instead,
+            e.g. telemetry extraction workers.
+
+    Returns:
+        int: Peak RSS in bytes, 0 when the platform does not expose it.
+    """
+    if resource is None:
+        return 0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+@dataclass
+class IngestReport:
+    """Rows written, time spent and memory used while ingesting a session."""
+    session_name: str
+    rows_written: Counter = field(default_factory=Counter)
+    # Tables skipped because their source data did not change
+    unchanged_tables: list[str] = field(default_factory=list)
+    # Wall-clock seconds per stage; table stages are named after the table
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    peak_rss_bytes: int = 0
+    peak_worker_rss_bytes: int = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a stage of the ingest; repeated stages add up.
+
+        Args:
+            name (str): Stage name, e.g. 'load' or a table name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + \
+                time.perf_counter() - start
+
+    def rows_per_second(self) -> dict[str, float]:
+        """
+        Get the write throughput of every table that has its own stage.
+
+        Returns:
+            dict[str, float]: Table name to rows written per second.
+        """
+        return {table: count / self.stage_seconds[table]
+                for table, count in self.rows_written.items()
+                if self.stage_seconds.get(table)}
+
+    def finish(self, with_workers: bool = False) -> "IngestReport":
+        """
+        Record the peak memory usage at the end of the ingest.
+
+        Args:
+            with_workers (bool): Also record the peak of the worker processes.
+
+        Returns:
+            IngestReport: The report itself.
+        """
+        self.peak_rss_bytes = peak_rss_bytes()
+        if with_workers:
+            self.peak_worker_rss_bytes = peak_rss_bytes(children=True)
+        return self
+
+    def summary(self) -> str:
+        """Human readable one-line summary of the report."""
+        rows = ', '.join(f"{table}: {count}"
+                         for table, count in self.rows_written.items())
+        text = f"{self.session_name} | rows written ({rows})"
+        if self.unchanged_tables:
+            text += f" | unchanged ({', '.join(self.unchanged_tables)})"
+        if self.stage_seconds:
+            stages = ', '.join(f"{stage}: {seconds:.2f}s"
+                               for stage, seconds in self.stage_seconds.items())
+            text += f" | stages ({stages})"
+        text += f" | peak RSS {self.peak_rss_bytes / MB:.0f} MB"
+        if self.peak_worker_rss_bytes:
+            text += f", workers {self.peak_worker_rss_bytes / MB:.0f} MB"
+        return text
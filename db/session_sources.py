@@ -0,0 +1,409 @@
+"""
+Where FastF1 sessions come from.
+
+FastF1ToSQL only needs a loaded ``fastf1.core.Session``. These sources
+provide one without necessarily going through the FastF1 APIs:
+
+- FastF1Source loads sessions from the FastF1 APIs (network required).
+- ReplaySource restores sessions captured to local files, e.g. with
+  ``python -m db.ingest ... --capture-dir captures``.
+- SyntheticSource generates sessions of configurable size.
+
+The last two work offline, which makes them suitable for benchmarks and
+regression runs.
+"""
+import json
+import os
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Literal, cast
+import numpy as np
+import pandas as pd
+import fastf1
+from fastf1.core import Laps, Session, SessionResults, Telemetry
+from fastf1.events import Event
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for Parquet)
+except ImportError:
+    pyarrow = None  # type: ignore[assignment]
+
+CaptureFormat = Literal['parquet', 'pickle']
+
+# Round numbers and race weeks synthetic events are spread over. Rounds are
+# drawn from far more values than a real season has, so two event names
+# practically never share one
+SYNTHETIC_ROUNDS = 1_000_000
+SYNTHETIC_SEASON_WEEKS = 36
+
+
+class LoadedSession(Session):
+    """
+    A FastF1 session whose data is already in memory.
+
+    The session data is set directly on FastF1's private attributes, so
+    ``load`` has nothing left to do.
+    """
+
+    def load(self, *args: Any, **kwargs: Any) -> None:
+        """Do nothing: the session data is already loaded."""
+
+
+class SessionSource(ABC):
+    """
+    A provider of loaded FastF1 sessions.
+    """
+
+    @abstractmethod
+    def load(self, year: int, event_name: str, session_name: str) -> Session:
+        """
+        Get a loaded session.
+
+        Args:
+            year (int): Championship year.
+            event_name (str): Name of the event, e.g. 'Bahrain'.
+            session_name (str): Session identifier, e.g. 'Q' or 'Race'.
+
+        Returns:
+            Session: The session, with laps, telemetry, weather and results.
+        """
+
+
+class FastF1Source(SessionSource):
+    """
+    Sessions loaded from the FastF1 APIs.
+    """
+
+    def load(self, year: int, event_name: str, session_name: str) -> Session:
+        session = fastf1.get_session(year, event_name, session_name)
+        session.load()
+        return session
+
+
+class ReplaySource(SessionSource):
+    """
+    Sessions captured to local files and restored without network access.
+
+    Each session lives in its own directory,
+    ``<directory>/<year>/<event name>/<session name>/``, holding a
+    ``session.json`` with the session metadata and one file per frame:
+    event, results, laps, car_data, pos_data and weather_data.
+    """
+
+    def __init__(self, directory: str, capture_format: CaptureFormat = 'parquet') -> None:
+        """
+        Initialize the replay source.
+
+        Args:
+            directory (str): Root directory of the captured sessions.
+            capture_format (CaptureFormat): File format used by ``capture``,
+                'parquet' (requires pyarrow) or 'pickle'. Restoring detects
+                the format of each session.
+        """
+        if capture_format not in ('parquet', 'pickle'):
+            raise ValueError(
+                f"Unknown capture format '{capture_format}', expected 'parquet' or 'pickle'")
+        self.directory = directory
+        self.capture_format = capture_format
+
+    def session_dir(self, year: int, event_name: str, session_name: str) -> str:
+        """
+        Get the directory of a captured session.
+
+        Args:
+            year (int): Championship year.
+            event_name (str): Name of the event.
+            session_name (str): Session identifier.
+
+        Returns:
+            str: Path of the session directory.
+        """
+        return os.path.join(self.directory, str(year), event_name, session_name)
+
+    def capture(self, session: Session, event_name: str, session_name: str) -> str:
+        """
+        Write a loaded session to local files.
+
+        Args:
+            session (Session): The loaded FastF1 session.
+            event_name (str): Event name the capture is stored under, as it
+                will be passed to ``load``.
+            session_name (str): Session identifier the capture is stored
+                under.
+
+        Returns:
+            str: Path of the session directory.
+        """
+        if self.capture_format == 'parquet' and pyarrow is None:
+            raise ImportError(
+                "Capturing sessions to Parquet requires pyarrow, install it or use the 'pickle' format")
+        year = int(session.event.year)
+        path = self.session_dir(year, event_name, session_name)
+        os.makedirs(path, exist_ok=True)
+
+        frames = {
+            'event': pd.DataFrame([dict(session.event)]),
+            'results': pd.DataFrame(session.results),
+            'laps': pd.DataFrame(session.laps),
+            'car_data': _stack_drivers(session.car_data),
+            'pos_data': _stack_drivers(session.pos_data),
+            'weather_data': pd.DataFrame(cast(pd.DataFrame, session.weather_data)),
+        }
+        for name, frame in frames.items():
+            if self.capture_format == 'parquet':
+                frame.to_parquet(os.path.join(path, f"{name}.parquet"))
+            else:
+                frame.to_pickle(os.path.join(path, f"{name}.pkl"))
+
+        with open(os.path.join(path, 'session.json'), 'w') as metadata:
+            json.dump({
+                'year': year,
+                'session_name': session.name,
+                'f1_api_support': bool(session.f1_api_support),
+                't0_date': session.t0_date.isoformat(),
+                'format': self.capture_format,
+            }, metadata, indent=2)
+        return path
+
+    def load(self, year: int, event_name: str, session_name: str) -> Session:
+        path = self.session_dir(year, event_name, session_name)
+        metadata_path = os.path.join(path, 'session.json')
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(
+                f"No captured session for {year} {event_name} - {session_name} in {self.directory}")
+        with open(metadata_path) as metadata_file:
+            metadata = json.load(metadata_file)
+
+        def read(name: str) -> pd.DataFrame:
+            if metadata['format'] == 'parquet':
+                return pd.read_parquet(os.path.join(path, f"{name}.parquet"))
+            return pd.read_pickle(os.path.join(path, f"{name}.pkl"))
+
+        event = Event(read('event').iloc[0], year=metadata['year'])
+        session = LoadedSession(event, metadata['session_name'],
+                                f1_api_support=metadata['f1_api_support'])
+        session._t0_date = pd.Timestamp(metadata['t0_date'])
+        session._results = SessionResults(read('results'), _force_default_cols=True)
+        session._laps = Laps(read('laps'), session=session, _force_default_cols=True)
+        session._car_data = _unstack_drivers(read('car_data'), session)
+        session._pos_data = _unstack_drivers(read('pos_data'), session)
+        session._weather_data = read('weather_data')
+        return session
+
+
+class SyntheticSource(SessionSource):
+    """
+    Generated sessions with realistic shapes and sample rates.
+
+    Every event gets its own round number and date, derived from its name so
+    they are the same on every run. Every driver runs ``laps`` laps of about
+    ``lap_seconds`` with a pit stop at half distance. Car data is sampled
+    every ~240 ms, position data every 220 ms and weather every minute, like
+    the FastF1 live timing feeds. The values are random but reproducible for
+    a given seed and session.
+    """
+
+    def __init__(self, drivers: int = 20, laps: int = 57, lap_seconds: float = 92.0,
+                 seed: int = 0) -> None:
+        """
+        Initialize the synthetic source.
+
+        Args:
+            drivers (int): Number of drivers per session, at least 2.
+            laps (int): Number of laps per driver.
+            lap_seconds (float): Average lap time in seconds.
+            seed (int): Seed for the random generator.
+        """
+        if drivers < 2:
+            raise ValueError("Synthetic sessions need at least 2 drivers")
+        self.drivers = drivers
+        self.laps = laps
+        self.lap_seconds = lap_seconds
+        self.seed = seed
+
+    def load(self, year: int, event_name: str, session_name: str) -> Session:
+        rng = np.random.default_rng(
+            [self.seed, year, *event_name.encode(), *session_name.encode()])
+        round_number = _synthetic_round(event_name)
+        # A race weekend per week from March on; events in the same week are
+        # still told apart by their round number
+        event_date = pd.Timestamp(f"{year}-03-05 15:00:00") + pd.Timedelta(
+            weeks=round_number % SYNTHETIC_SEASON_WEEKS)
+        event = Event({
+            'RoundNumber': round_number, 'Country': event_name, 'Location': event_name,
+            'OfficialEventName': f"{event_name} Grand Prix {year}",
+            'EventDate': event_date.normalize(),
+            'EventName': f"{event_name} Grand Prix", 'EventFormat': 'conventional',
+            'Session1': 'Practice 1', 'Session1Date': event_date - pd.Timedelta(days=2),
+            'Session1DateUtc': event_date - pd.Timedelta(days=2),
+            'Session2': 'Practice 2', 'Session2Date': event_date - pd.Timedelta(days=2),
+            'Session2DateUtc': event_date - pd.Timedelta(days=2),
+            'Session3': 'Practice 3', 'Session3Date': event_date - pd.Timedelta(days=1),
+            'Session3DateUtc': event_date - pd.Timedelta(days=1),
+            'Session4': 'Qualifying', 'Session4Date': event_date - pd.Timedelta(days=1),
+            'Session4DateUtc': event_date - pd.Timedelta(days=1),
+            'Session5': 'Race', 'Session5Date': event_date,
+            'Session5DateUtc': event_date,
+            'F1ApiSupport': True,
+        }, year=year)
+        session = LoadedSession(event, event.get_session_name(session_name),
+                                f1_api_support=True)
+        t0_date = session.date - pd.Timedelta(minutes=55)
+        session._t0_date = t0_date
+
+        numbers = [str(i + 1) for i in range(self.drivers)]
+        abbreviations = [f"D{i:02d}" for i in range(self.drivers)]
+        teams = [f"Team {i // 2}" for i in range(self.drivers)]
+        session._results = SessionResults(pd.DataFrame({
+            'DriverNumber': numbers,
+            'Abbreviation': abbreviations,
+            'FullName': [f"Driver {abbreviation}" for abbreviation in abbreviations],
+            'TeamName': teams,
+            'Position': np.arange(1, self.drivers + 1, dtype=float),
+        }), _force_default_cols=True)
+
+        start = pd.Timedelta(minutes=60)
+        horizon = start + pd.Timedelta(seconds=(self.lap_seconds + 5) * self.laps)
+        # Car data shares one time grid across drivers, like the live timing
+        grid = np.arange(start.value - 5e9, horizon.value + 5e9, 240e6).astype('int64')
+        car_times = pd.to_timedelta(
+            np.sort(grid + rng.integers(-20e6, 20e6, len(grid))))
+        pos_times = pd.to_timedelta(
+            np.arange(start.value - 5e9, horizon.value + 5e9, 220e6).astype('int64'))
+        pit_lap = self.laps // 2
+
+        laps: list[dict[str, Any]] = []
+        car_data: dict[str, Telemetry] = {}
+        pos_data: dict[str, Telemetry] = {}
+        session_end = start
+        for index, (number, abbreviation) in enumerate(zip(numbers, abbreviations)):
+            lap_start = start
+            for lap_number in range(1, self.laps + 1):
+                lap_time = pd.Timedelta(
+                    seconds=self.lap_seconds + rng.normal(0, 0.5)).round('ms')
+                sector_1 = (lap_time * 0.3).round('ms')
+                sector_2 = (lap_time * 0.4).round('ms')
+                first_stint = lap_number <= pit_lap
+                laps.append({
+                    'Time': lap_start + lap_time,
+                    'Driver': abbreviation,
+                    'DriverNumber': number,
+                    'LapTime': lap_time if lap_number > 1 else pd.NaT,
+                    'LapNumber': float(lap_number),
+                    'Stint': 1.0 if first_stint else 2.0,
+                    'PitOutTime': lap_start if lap_number in (1, pit_lap + 1) else pd.NaT,
+                    'PitInTime': lap_start + lap_time if lap_number == pit_lap else pd.NaT,
+                    'Sector1Time': sector_1,
+                    'Sector2Time': sector_2,
+                    'Sector3Time': lap_time - sector_1 - sector_2,
+                    'Sector1SessionTime': lap_start + sector_1,
+                    'Sector2SessionTime': lap_start + sector_1 + sector_2,
+                    'Sector3SessionTime': lap_start + lap_time,
+                    'SpeedI1': float(rng.integers(240, 260)),
+                    'SpeedI2': float(rng.integers(250, 270)),
+                    'SpeedFL': float(rng.integers(270, 290)),
+                    'SpeedST': float(rng.integers(300, 330)) if lap_number % 7 else np.nan,
+                    'IsPersonalBest': bool(lap_number % 5 == 0),
+                    'Compound': 'SOFT' if first_stint else 'HARD',
+                    'TyreLife': float(lap_number if first_stint else lap_number - pit_lap),
+                    'FreshTyre': not first_stint,
+                    'Team': teams[index],
+                    'LapStartTime': lap_start,
+                    'LapStartDate': t0_date + lap_start,
+                    'TrackStatus': '1',
+                    'Position': float(index + 1),
+                    'Deleted': False,
+                    'DeletedReason': '',
+                    'FastF1Generated': False,
+                    'IsAccurate': True,
+                })
+                lap_start = lap_start + lap_time
+            session_end = max(session_end, lap_start)
+
+            car_data[number] = Telemetry(pd.DataFrame({
+                'Date': t0_date + car_times,
+                'SessionTime': car_times,
+                'Time': car_times,
+                'RPM': rng.integers(9000, 12500, len(car_times)).astype(float),
+                'Speed': rng.uniform(80, 330, len(car_times)),
+                'nGear': rng.integers(1, 9, len(car_times)),
+                'Throttle': rng.uniform(0, 100, len(car_times)),
+                'Brake': rng.random(len(car_times)) < 0.2,
+                'DRS': rng.choice([0, 8, 12], len(car_times)),
+                'Source': 'car',
+            }), session=session, driver=number, drop_unknown_channels=True)
+            pos_data[number] = Telemetry(pd.DataFrame({
+                'Date': t0_date + pos_times,
+                'SessionTime': pos_times,
+                'Time': pos_times,
+                'X': rng.normal(0, 3000, len(pos_times)),
+                'Y': rng.normal(0, 3000, len(pos_times)),
+                'Z': rng.normal(0, 100, len(pos_times)),
+                'Status': np.where(rng.random(len(pos_times)) < 0.01, 'OffTrack', 'OnTrack'),
+                'Source': 'pos',
+            }), session=session, driver=number, drop_unknown_channels=True)
+
+        session._laps = Laps(pd.DataFrame(laps), session=session, _force_default_cols=True)
+        session._car_data = car_data
+        session._pos_data = pos_data
+
+        weather_times = pd.to_timedelta(np.arange(
+            0, (session_end + pd.Timedelta(minutes=5)).value, 60e9).astype('int64'))
+        samples = len(weather_times)
+        session._weather_data = pd.DataFrame({
+            'Time': weather_times,
+            'AirTemp': rng.normal(25, 1, samples),
+            'Humidity': rng.normal(40, 3, samples),
+            'Pressure': rng.normal(1010, 2, samples),
+            'Rainfall': rng.random(samples) < 0.1,
+            'TrackTemp': rng.normal(35, 2, samples),
+            'WindDirection': rng.integers(0, 360, samples),
+            'WindSpeed': rng.uniform(0, 5, samples),
+        })
+        return session
+
+
+def _synthetic_round(event_name: str) -> int:
+    """Derive a round number from an event name, the same on every run."""
+    return zlib.crc32(event_name.encode()) % SYNTHETIC_ROUNDS + 1
+
+
+def _stack_drivers(telemetry: dict[str, Telemetry]) -> pd.DataFrame:
+    """Combine per-driver telemetry into one frame with a DriverNumber column."""
+    return pd.concat([pd.DataFrame(frame).assign(DriverNumber=driver)
+                      for driver, frame in telemetry.items()], ignore_index=True)
+
+
+def _unstack_drivers(stacked: pd.DataFrame, session: Session) -> dict[str, Telemetry]:
+    """Split a frame written by _stack_drivers back into per-driver telemetry."""
+    return {
+        str(driver): Telemetry(frame.drop(columns='DriverNumber').reset_index(drop=True),
+                               session=session, driver=str(driver),
+                               drop_unknown_channels=True)
+        for driver, frame in stacked.groupby('DriverNumber', sort=False)
+    }
+
+
+def get_source(name: str, replay_dir: str | None = None, **options: Any) -> SessionSource:
+    """
+    Create a session source by name.
+
+    Args:
+        name (str): 'fastf1', 'replay' or 'synthetic'.
+        replay_dir (str | None): Root directory of the captured sessions,
+            required for 'replay'.
+        **options: Keyword arguments of SyntheticSource for 'synthetic'.
+
+    Returns:
+        SessionSource: The session source.
+    """
+    if name == 'fastf1':
+        return FastF1Source()
+    if name == 'replay':
+        if replay_dir is None:
+            raise ValueError("The replay source needs a replay directory")
+        return ReplaySource(replay_dir)
+    if name == 'synthetic':
+        return SyntheticSource(**options)
+    raise ValueError(
+        f"Unknown session source '{name}', expected 'fastf1', 'replay' or 'synthetic'")
@@ -0,0 +1,302 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Literal
+import json
+import numpy as np
+import pandas as pd
+from fastf1.core import Lap, Session
+
+ResampleStrategy = Literal['first', 'mean', 'minmax']
+RESAMPLE_STRATEGIES: tuple[str, ...] = ('first', 'mean', 'minmax')
+
+# Column name -> array for a block of telemetry samples. Plain arrays are far
+# cheaper to pickle between processes than FastF1 Telemetry frames.
+TelemetryArrays = dict[str, np.ndarray]
+
+# Channels copied as-is from FastF1 telemetry; 'datetime' and 'is_off_track'
+# are derived from 'SessionTime' and 'Status'.
+TELEMETRY_CHANNELS: tuple[str, ...] = (
+    'Speed', 'RPM', 'nGear', 'Throttle', 'Brake', 'DRS', 'X', 'Y', 'Z')
+
+# Continuous channels that are averaged by the 'mean' strategy; every other
+# channel (gear, brake, DRS, track status, ...) keeps its first value.
+MEAN_CHANNELS: tuple[str, ...] = ('Speed', 'RPM', 'Throttle', 'X', 'Y', 'Z')
+
+# Throttle position (%) from which a sample counts as flat out in the
+# per-lap throttle-on distance
+THROTTLE_ON_PERCENT = 99
+
+
+def downsample_telemetry(
+    telemetry: pd.DataFrame,
+    interval: str | pd.Timedelta | None = '100ms',
+    strategy: ResampleStrategy = 'first',
+    time_column: str = 'datetime',
+    extrema_channel: str = 'Speed',
+) -> pd.DataFrame:
+    """
+    Reduce telemetry samples to at most one bucket per time interval.
+
+    Samples are assigned to buckets by integer division of their timestamp,
+    which is equivalent to flooring them to the interval.
+
+    Args:
+        telemetry (pd.DataFrame): Telemetry samples sorted by ``time_column``.
+        interval (str | pd.Timedelta | None): Bucket width, for example
+            '100ms'. None skips resampling and returns the samples unchanged.
+        strategy (ResampleStrategy): How each bucket is reduced:
+            'first' keeps the first sample, 'mean' averages the continuous
+            channels and keeps the first value of the others, 'minmax' keeps
+            the samples holding the minimum and maximum of
+            ``extrema_channel``.
+        time_column (str): Name of the datetime column.
+        extrema_channel (str): Channel whose extremes 'minmax' preserves.
+
+    Returns:
+        pd.DataFrame: The downsampled telemetry, sorted by time.
+    """
+    if strategy not in RESAMPLE_STRATEGIES:
+        raise ValueError(
+            f"Unknown resample strategy '{strategy}', expected one of {RESAMPLE_STRATEGIES}")
+
+    if interval is None or telemetry.empty:
+        return telemetry
+
+    interval_ns = pd.Timedelta(interval).value
+    if interval_ns <= 0:
+        raise ValueError(f"Resample interval must be positive, got '{interval}'")
+
+    times = telemetry[time_column].to_numpy(dtype='datetime64[ns]')
+    buckets = times.view('int64') // interval_ns
+
+    if strategy == 'first':
+        is_first = np.empty(len(buckets), dtype=bool)
+        is_first[0] = True
+        np.not_equal(buckets[1:], buckets[:-1], out=is_first[1:])
+        return telemetry[is_first]
+
+    if strategy == 'mean':
+        aggregations = {column: 'mean' if column in MEAN_CHANNELS else 'first'
+                        for column in telemetry.columns}
+        return telemetry.groupby(buckets, sort=False).agg(aggregations) \
+            .reset_index(drop=True)
+
+    values = pd.Series(telemetry[extrema_channel].to_numpy(),
+                       index=pd.RangeIndex(len(telemetry)))
+    grouped = values.groupby(buckets, sort=False)
+    positions = np.union1d(grouped.idxmin().dropna().to_numpy(dtype='int64'),
+                           grouped.idxmax().dropna().to_numpy(dtype='int64'))
+    return telemetry.iloc[positions]
+
+
+def extract_lap_telemetry(
+    lap: Lap,
+    session_start_date: pd.Timestamp,
+    interval: str | pd.Timedelta | None = '100ms',
+    strategy: ResampleStrategy = 'first',
+) -> TelemetryArrays:
+    """
+    Merge, timestamp and downsample the telemetry of a single lap.
+
+    Args:
+        lap (Lap): The FastF1 lap.
+        session_start_date (pd.Timestamp): Date at which the session time is zero.
+        interval (str | pd.Timedelta | None): Resample interval, see
+            :func:`downsample_telemetry`.
+        strategy (ResampleStrategy): Resample strategy, see
+            :func:`downsample_telemetry`.
+
+    Returns:
+        TelemetryArrays: The lap's samples, sorted by datetime.
+    """
+    telemetry = lap.get_telemetry()
+    telemetry['datetime'] = session_start_date + telemetry['SessionTime']
+    telemetry = downsample_telemetry(
+        telemetry.sort_values('datetime'), interval, strategy)
+
+    arrays: TelemetryArrays = {
+        'datetime': telemetry['datetime'].to_numpy(dtype='datetime64[ns]')}
+    for channel in TELEMETRY_CHANNELS:
+        arrays[channel] = telemetry[channel].to_numpy()
+    arrays['is_off_track'] = (telemetry['Status'] == 'OffTrack').to_numpy()
+    return arrays
+
+
+def concat_telemetry(chunks: list[TelemetryArrays]) -> TelemetryArrays:
+    """
+    Concatenate blocks of telemetry samples column by column.
+
+    Args:
+        chunks (list[TelemetryArrays]): Non-empty list of telemetry blocks.
+
+    Returns:
+        TelemetryArrays: A single block holding every sample.
+    """
+    return {column: np.concatenate([chunk[column] for chunk in chunks])
+            for column in chunks[0]}
+
+
+def extract_driver_telemetry(
+    session: Session,
+    driver: str,
+    interval: str | pd.Timedelta | None = '100ms',
+    strategy: ResampleStrategy = 'first',
+) -> TelemetryArrays | None:
+    """
+    Extract the downsampled telemetry of every lap of a driver.
+
+    Args:
+        session (Session): The loaded FastF1 session.
+        driver (str): The driver number.
+        interval (str | pd.Timedelta | None): Resample interval.
+        strategy (ResampleStrategy): Resample strategy.
+
+    Returns:
+        TelemetryArrays | None: The driver's samples, or None when the driver
+        has no laps.
+    """
+    laps = session.laps[session.laps['DriverNumber'] == driver]
+    chunks = [extract_lap_telemetry(lap, session.t0_date, interval, strategy)
+              for _, lap in laps.iterrows()]
+    return concat_telemetry(chunks) if chunks else None
+
+
+_worker_session: Session | None = None
+
+
+def _init_extraction_worker(session: Session) -> None:
+    """Keep the session in the worker process so tasks only carry a driver."""
+    global _worker_session
+    _worker_session = session
+
+
+def _extract_in_worker(driver: str, interval: str | pd.Timedelta | None,
+                       strategy: ResampleStrategy) -> tuple[str, TelemetryArrays | None]:
+    """Process pool task: extract the telemetry of one driver."""
+    if _worker_session is None:
+        raise RuntimeError("Extraction worker was started without a session")
+    return driver, extract_driver_telemetry(_worker_session, driver, interval, strategy)
+
+
+def extract_session_telemetry(
+    session: Session,
+    drivers: Iterable[str],
+    interval: str | pd.Timedelta | None = '100ms',
+    strategy: ResampleStrategy = 'first',
+    workers: int = 1,
+) -> Iterator[tuple[str, TelemetryArrays]]:
+    """
+    Extract the telemetry of several drivers, optionally in parallel.
+
+    With ``workers`` > 1, drivers are spread over a process pool and blocks
+    are yielded per driver as soon as a worker finishes. At most two tasks
+    per worker are in flight, so finished but unconsumed results cannot pile
+    up in memory. Otherwise the work runs in-process and blocks are yielded
+    per lap.
+
+    Args:
+        session (Session): The loaded FastF1 session.
+        drivers (Iterable[str]): Driver numbers to extract.
+        interval (str | pd.Timedelta | None): Resample interval.
+        strategy (ResampleStrategy): Resample strategy.
+        workers (int): Number of worker processes.
+
+    Yields:
+        tuple[str, TelemetryArrays]: Driver number and a block of samples.
+    """
+    if workers <= 1:
+        for driver in drivers:
+            # In lap order, so FastF1ToSQL.insert_telemetry can tell when a
+            # lap is complete
+            laps = session.laps[session.laps['DriverNumber'] == driver] \
+                .sort_values('LapNumber', kind='stable')
+            for _, lap in laps.iterrows():
+                yield driver, extract_lap_telemetry(
+                    lap, session.t0_date, interval, strategy)
+        return
+
+    pending_drivers = list(drivers)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_extraction_worker,
+                             initargs=(session,)) as executor:
+        in_flight: set[Future] = set()
+        while pending_drivers or in_flight:
+            while pending_drivers and len(in_flight) < 2 * workers:
+                in_flight.add(executor.submit(
+                    _extract_in_worker, pending_drivers.pop(0), interval, strategy))
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                driver, arrays = future.result()
+                if arrays is not None:
+                    yield driver, arrays
+
+
+def summarize_laps(rows: pd.DataFrame, weather: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarize telemetry samples per lap.
+
+    Samples repeated at the same timestamp of a lap (FastF1 pads each lap
+    with a sample of its neighbours) count once. Distance is integrated from
+    the speed over the time to the lap's next sample.
+
+    Args:
+        rows (pd.DataFrame): Samples with the Telemetry table's columns,
+            ``datetime`` in epoch milliseconds.
+        weather (pd.DataFrame): ``air_temperature_in_celsius``,
+            ``track_temperature_in_celsius`` and
+            ``wind_speed_in_meters_per_seconds`` indexed by weather_id.
+
+    Returns:
+        pd.DataFrame: One row per lap with the LapTelemetrySummary columns.
+    """
+    rows = rows.dropna(subset=['lap_id']) \
+        .sort_values(['lap_id', 'datetime'], kind='stable') \
+        .drop_duplicates(['lap_id', 'datetime'])
+    lap_ids = rows['lap_id'].astype('int64')
+
+    def flag(column: str) -> pd.Series:
+        return (rows[column].astype(float).fillna(0) > 0) * 100.0
+
+    seconds = (rows.groupby(lap_ids)['datetime'].shift(-1) - rows['datetime']).fillna(0) / 1000
+    speed = rows['speed_in_km'].astype(float)
+    throttle = rows['throttle_input'].astype(float)
+    sample_weather = weather.reindex(rows['weather_id'])
+    samples = pd.DataFrame({
+        'lap_id': lap_ids,
+        'speed': speed,
+        'rpm': rows['RPM'].astype(float),
+        'throttle': throttle,
+        'brake': flag('is_brake_pressed'),
+        'drs': flag('is_DRS_open'),
+        'off_track': flag('is_off_track'),
+        'throttle_on_distance': (speed / 3.6 * seconds).where(throttle >= THROTTLE_ON_PERCENT, 0.0),
+        'air_temp': sample_weather['air_temperature_in_celsius'].to_numpy(dtype=float),
+        'track_temp': sample_weather['track_temperature_in_celsius'].to_numpy(dtype=float),
+        'wind_speed': sample_weather['wind_speed_in_meters_per_seconds'].to_numpy(dtype=float),
+    })
+
+    laps = samples.groupby('lap_id', sort=True)
+    summary = laps.agg(
+        sample_count=('speed', 'size'),
+        avg_speed=('speed', 'mean'),
+        max_speed=('speed', 'max'),
+        avg_RPM=('rpm', 'mean'),
+        max_RPM=('rpm', 'max'),
+        avg_throttle=('throttle', 'mean'),
+        brake_percentage=('brake', 'mean'),
+        drs_usage_percentage=('drs', 'mean'),
+        off_track_percentage=('off_track', 'mean'),
+        throttle_on_distance_in_meters=('throttle_on_distance', 'sum'),
+        avg_air_temp=('air_temp', 'mean'),
+        avg_track_temp=('track_temp', 'mean'),
+        avg_wind_speed=('wind_speed', 'mean'),
+    )
+
+    # Samples per gear, as a JSON object keyed by gear number
+    gears = pd.DataFrame({'lap_id': lap_ids, 'gear': rows['gear_number'].astype(float)}) \
+        .dropna().astype('int64').value_counts().sort_index()
+    summary['gear_histogram'] = gears.groupby(level='lap_id').apply(
+        lambda counts: json.dumps({str(gear): int(count)
+                                   for (_, gear), count in counts.items()}))
+
+    owners = rows.groupby(lap_ids)[['session_id', 'driver_id']].first()
+    return owners.join(summary).rename_axis('lap_id').reset_index()
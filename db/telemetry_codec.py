@@ -0,0 +1,181 @@
+"""
+Compact per-lap telemetry storage.
+
+Instead of one SQLite row per sample, a lap's samples are packed into a
+single BLOB holding a NumPy structured array, one field per channel. The
+BLOB can be quantized (continuous channels stored as scaled integers) and
+compressed with zlib. Decoding is a ``np.frombuffer`` over the stored (or
+decompressed) bytes, so it returns a read-only view without copying.
+"""
+import zlib
+from dataclasses import dataclass
+from typing import Any, Literal
+import numpy as np
+import pandas as pd
+
+Compression = Literal['zlib'] | None
+
+# Channel -> (raw dtype, quantized dtype, quantization scale). Quantized
+# values are round(value * scale); missing values use the integer maximum.
+LAP_CHANNELS: dict[str, tuple[str, str, int]] = {
+    'time_ms': ('<i4', '<i4', 1),      # offset from the lap's first sample
+    'speed': ('<f4', '<u2', 10),       # km/h, 0.1 km/h steps
+    'rpm': ('<f4', '<u2', 1),
+    'gear': ('u1', 'u1', 1),
+    'throttle': ('<f4', '<u2', 10),    # %, 0.1 % steps
+    'brake': ('?', '?', 1),
+    'drs': ('u1', 'u1', 1),
+    'x': ('<f4', '<i4', 100),          # 1/10 m, two decimals like Telemetry
+    'y': ('<f4', '<i4', 100),
+    'z': ('<f4', '<i4', 100),
+    'off_track': ('?', '?', 1),
+}
+
+RAW_DTYPE = np.dtype([(name, raw) for name, (raw, _, _) in LAP_CHANNELS.items()])
+QUANTIZED_DTYPE = np.dtype([(name, quantized)
+                            for name, (_, quantized, _) in LAP_CHANNELS.items()])
+
+# Telemetry channel as produced by db.telemetry -> lap channel
+_SOURCE_CHANNELS: dict[str, str] = {
+    'speed': 'Speed', 'rpm': 'RPM', 'gear': 'nGear', 'throttle': 'Throttle',
+    'brake': 'Brake', 'drs': 'DRS', 'x': 'X', 'y': 'Y', 'z': 'Z',
+    'off_track': 'is_off_track',
+}
+
+
+@dataclass(frozen=True)
+class LapTelemetryCodec:
+    """How lap telemetry BLOBs are encoded."""
+    quantize: bool = True
+    compression: Compression = 'zlib'
+    compression_level: int = 6
+
+    def __post_init__(self) -> None:
+        if self.compression not in ('zlib', None):
+            raise ValueError(
+                f"Unknown compression '{self.compression}', expected 'zlib' or None")
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Structured dtype of the packed samples."""
+        return QUANTIZED_DTYPE if self.quantize else RAW_DTYPE
+
+    def encode(self, samples: dict[str, np.ndarray], times: np.ndarray) -> bytes:
+        """
+        Pack the samples of one lap into bytes.
+
+        Args:
+            samples (dict[str, np.ndarray]): Telemetry channels keyed by their
+                db.telemetry names ('Speed', 'RPM', ..., 'is_off_track').
+            times (np.ndarray): datetime64 of every sample, sorted.
+
+        Returns:
+            bytes: The encoded BLOB.
+        """
+        packed = np.empty(len(times), dtype=self.dtype)
+        offsets = (times - times[0]) // np.timedelta64(1, 'ms') if len(times) else times
+        packed['time_ms'] = offsets
+        for name, source in _SOURCE_CHANNELS.items():
+            values = np.asarray(samples[source])
+            if self.quantize:
+                values = _quantize(values, name)
+            elif packed.dtype[name].kind in 'iu':
+                values = _quantize(values, name, scale=1)
+            packed[name] = values
+
+        payload = packed.tobytes()
+        if self.compression == 'zlib':
+            payload = zlib.compress(payload, self.compression_level)
+        return payload
+
+
+def _quantize(values: np.ndarray, name: str, scale: int | None = None) -> np.ndarray:
+    """Scale a channel to its quantized integer type, missing values to the maximum."""
+    _, quantized, default_scale = LAP_CHANNELS[name]
+    dtype = np.dtype(quantized)
+    if dtype.kind == 'b':
+        return values.astype(bool)
+    values = values.astype('float64') * (default_scale if scale is None else scale)
+    info = np.iinfo(dtype)
+    missing = np.isnan(values)
+    values = np.clip(np.round(np.where(missing, 0, values)), info.min, info.max - 1)
+    return np.where(missing, info.max, values).astype(dtype)
+
+
+def decode_lap_telemetry(blob: bytes, quantized: bool,
+                         compression: Compression) -> np.ndarray:
+    """
+    Unpack a lap telemetry BLOB.
+
+    Args:
+        blob (bytes): The stored BLOB.
+        quantized (bool): Whether the BLOB was encoded with quantization.
+        compression (Compression): Compression of the BLOB.
+
+    Returns:
+        np.ndarray: Read-only structured array over the (decompressed)
+        bytes, with the stored field types. Use :func:`lap_channels` for
+        channels in physical units.
+    """
+    payload = zlib.decompress(blob) if compression == 'zlib' else blob
+    return np.frombuffer(payload, dtype=QUANTIZED_DTYPE if quantized else RAW_DTYPE)
+
+
+def lap_channels(packed: np.ndarray, quantized: bool) -> dict[str, np.ndarray]:
+    """
+    Get the channels of a decoded lap in physical units.
+
+    Raw channels are returned as views of ``packed``; quantized ones are
+    scaled back to floats, with NaN for missing values.
+
+    Args:
+        packed (np.ndarray): Array returned by :func:`decode_lap_telemetry`.
+        quantized (bool): Whether the lap was quantized.
+
+    Returns:
+        dict[str, np.ndarray]: Channel name to values.
+    """
+    channels: dict[str, np.ndarray] = {}
+    for name, (_, _, scale) in LAP_CHANNELS.items():
+        values = packed[name]
+        if name != 'time_ms' and values.dtype.kind in 'iu':
+            missing = values == np.iinfo(values.dtype).max
+            factor = scale if quantized else 1
+            if factor != 1 or missing.any():
+                values = np.where(missing, np.nan, values / factor)
+        channels[name] = values
+    return channels
+
+
+def encode_laps(lap_ids: np.ndarray, samples: dict[str, np.ndarray],
+                codec: LapTelemetryCodec) -> list[tuple[Any, ...]]:
+    """
+    Group a block of samples by lap and encode every lap.
+
+    Samples without a lap are dropped, and samples repeated at the same
+    timestamp (FastF1 pads each lap with a sample of its neighbours) are
+    kept once.
+
+    Args:
+        lap_ids (np.ndarray): lap_id of each sample, None outside laps.
+        samples (dict[str, np.ndarray]): Telemetry arrays as produced by
+            db.telemetry, including 'datetime'.
+        codec (LapTelemetryCodec): How to encode the laps.
+
+    Returns:
+        list[tuple[Any, ...]]: One (lap_id, start epoch ms, sample count,
+        BLOB) tuple per lap.
+    """
+    has_lap = pd.notna(lap_ids)
+    frame = pd.DataFrame({name: values[has_lap] for name, values in samples.items()})
+    frame['lap_id'] = lap_ids[has_lap].astype('int64')
+    frame = frame.sort_values(['lap_id', 'datetime'], kind='stable') \
+        .drop_duplicates(['lap_id', 'datetime'])
+
+    records = []
+    for lap_id, lap in frame.groupby('lap_id', sort=False):
+        times = lap['datetime'].to_numpy(dtype='datetime64[ns]')
+        blob = codec.encode({name: lap[name].to_numpy() for name in lap.columns}, times)
+        records.append((int(lap_id), pd.Timestamp(times[0]).value // 1_000_000,
+                        len(lap), blob))
+    return records
@@ -0,0 +1,25 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+
+# Sessions of the database the tools query in the tests
+TOOLS_DB_SESSIONS = (('Bahrain', 'Q'), ('Bahrain', 'R'))
+
+
+def pytest_configure(config):
+    """
+    Point the tools at a small synthetic database before a test imports them,
+    db.connection opens F1_SQLITE_PATH at import.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix='f1-tools-'), 'tools.db')
+    # Ingest reports would print before pytest captures the output
+    with redirect_stdout(io.StringIO()):
+        converter = FastF1ToSQL(path)
+        source = SyntheticSource(drivers=2, laps=3)
+        for event_name, session_name in TOOLS_DB_SESSIONS:
+            converter.process_session(source.load(2023, event_name, session_name), load=False)
+        converter.close()
+    os.environ['F1_SQLITE_PATH'] = path
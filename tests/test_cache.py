@@ -0,0 +1,68 @@
+import os
+import sqlite3
+from contextlib import closing
+import pytest
+from tools.cache import ToolResultCache, ingest_generation
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def counting_call(results: list[int]):
+    def run() -> int:
+        results.append(len(results))
+        return results[-1]
+    return run
+
+
+def test_results_are_served_until_the_generation_changes(clock):
+    generation = [1]
+    cache = ToolResultCache(generation=lambda: generation[0], clock=clock)
+    calls = []
+
+    assert cache.get_or_run('key', counting_call(calls)) == 0
+    assert cache.get_or_run('key', counting_call(calls)) == 0
+    generation[0] = 2
+    assert cache.get_or_run('key', counting_call(calls)) == 1
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.invalidations) == (1, 2, 1)
+
+
+def test_results_expire_and_least_recently_used_are_evicted(clock):
+    cache = ToolResultCache(max_entries=2, ttl_seconds=10, generation=lambda: 1, clock=clock)
+    calls = []
+    cache.get_or_run('a', counting_call(calls))
+    cache.get_or_run('b', counting_call(calls))
+    cache.get_or_run('a', counting_call(calls))
+    cache.get_or_run('c', counting_call(calls))
+
+    # 'b' was used least recently
+    assert cache.get_or_run('b', counting_call(calls)) == 3
+    clock.now = 11
+    assert cache.get_or_run('b', counting_call(calls)) == 4
+    assert (cache.stats().evictions, cache.stats().expirations) == (2, 1)
+
+
+def test_ingest_drops_the_cached_results():
+    cache = ToolResultCache(generation=ingest_generation)
+    calls = []
+    cache.get_or_run('key', counting_call(calls))
+
+    # What FastF1ToSQL does after writing a session
+    with closing(sqlite3.connect(os.environ['F1_SQLITE_PATH'])) as conn:
+        conn.execute("UPDATE IngestGeneration SET generation = generation + 1 WHERE id = 1")
+        conn.commit()
+
+    assert cache.get_or_run('key', counting_call(calls)) == 1
+    assert cache.stats().invalidations == 1
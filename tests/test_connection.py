@@ -0,0 +1,31 @@
+import os
+import sqlite3
+import db.connection
+from db.connection import connect, migrate_sqlite
+from db.formula1_databases import SCHEMA_VERSION, FastF1ToSQL
+from tests.test_migrations import BASELINE_SCHEMA, ingest_baseline_session
+
+
+def test_connect_migrates_older_database(tmp_path, monkeypatch):
+    path = str(tmp_path / 'baseline.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    ingest_baseline_session(conn)
+    conn.close()
+    monkeypatch.setattr(db.connection, 'SQLITE_PATH', path)
+
+    database = connect('sqlite')
+
+    assert database.run("PRAGMA user_version") == f"[({SCHEMA_VERSION},)]"
+    assert 'LapTelemetrySummary' in database.get_usable_table_names()
+    database._engine.dispose()
+
+
+def test_migrate_sqlite_only_reads_current_database(tmp_path):
+    path = str(tmp_path / 'current.db')
+    FastF1ToSQL(path).close()
+    modified = os.stat(path).st_mtime_ns
+
+    migrate_sqlite(path)
+
+    assert os.stat(path).st_mtime_ns == modified
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from db.telemetry import downsample_telemetry
+
+START = pd.Timestamp('2023-03-05 15:00:00')
+
+
+def telemetry(offsets_ms: list[int], speeds: list[float]) -> pd.DataFrame:
+    return pd.DataFrame({
+        'datetime': START + pd.to_timedelta(offsets_ms, unit='ms'),
+        'Speed': speeds,
+        'nGear': range(1, len(speeds) + 1),
+    })
+
+
+# Three 100 ms buckets: [0, 100), [100, 200) and [200, 300)
+SAMPLES = telemetry([0, 30, 60, 90, 110, 150, 250], [100, 120, 90, 110, 200, 180, 300])
+
+
+def test_first_keeps_the_first_sample_of_each_interval():
+    downsampled = downsample_telemetry(SAMPLES, '100ms', 'first')
+
+    assert downsampled['Speed'].tolist() == [100, 200, 300]
+
+
+def test_mean_averages_continuous_channels_only():
+    downsampled = downsample_telemetry(SAMPLES, '100ms', 'mean')
+
+    assert downsampled['Speed'].tolist() == [105, 190, 300]
+    # Discrete channels keep the first value of the bucket
+    assert downsampled['nGear'].tolist() == [1, 5, 7]
+    assert downsampled['datetime'].tolist() == SAMPLES['datetime'].iloc[[0, 4, 6]].tolist()
+
+
+def test_minmax_keeps_the_extremes_of_each_interval_in_time_order():
+    downsampled = downsample_telemetry(SAMPLES, '100ms', 'minmax')
+
+    assert downsampled['Speed'].tolist() == [120, 90, 200, 180, 300]
+    assert downsampled['datetime'].is_monotonic_increasing
+
+
+def test_no_interval_keeps_every_sample():
+    assert downsample_telemetry(SAMPLES, None, 'mean') is SAMPLES
+
+
+def test_empty_telemetry_is_returned_as_is():
+    empty = SAMPLES.iloc[:0]
+
+    assert downsample_telemetry(empty, '100ms', 'minmax') is empty
+
+
+@pytest.mark.parametrize('interval, strategy', [('100ms', 'median'), ('0ms', 'first')])
+def test_invalid_settings_are_rejected(interval, strategy):
+    with pytest.raises(ValueError):
+        downsample_telemetry(SAMPLES, interval, strategy)
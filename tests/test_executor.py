@@ -0,0 +1,62 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from tools.executor import run_in_pool, thread_connection
+from tools.query import run_sql
+
+# Counts forever, until the statement is interrupted
+ENDLESS_QUERY = '''
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+    SELECT MAX(i) FROM n
+'''
+
+
+def endless_query(failures: list[BaseException]) -> None:
+    try:
+        run_sql(ENDLESS_QUERY)
+    except BaseException as error:
+        failures.append(error)
+        raise
+
+
+def wait_for(failures: list[BaseException]) -> None:
+    deadline = time.monotonic() + 5
+    while not failures and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_timeout_interrupts_the_running_statement():
+    failures = []
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(run_in_pool(endless_query, failures, timeout=0.2))
+    wait_for(failures)
+
+    assert isinstance(failures[0], sqlite3.OperationalError)
+    assert 'interrupted' in str(failures[0])
+    assert asyncio.run(run_in_pool(run_sql, "SELECT 1 AS one", timeout=1)) == [{'one': 1}]
+
+
+def test_cancelling_the_chat_interrupts_the_running_statement():
+    failures = []
+
+    async def cancel_call() -> None:
+        task = asyncio.ensure_future(run_in_pool(endless_query, failures, timeout=None))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_call())
+    wait_for(failures)
+
+    assert isinstance(failures[0], sqlite3.OperationalError)
+
+
+def test_calls_run_on_the_worker_connection():
+    async def connection_in_pool():
+        return await run_in_pool(lambda: thread_connection() is not None)
+
+    assert thread_connection() is None
+    assert asyncio.run(connection_in_pool())
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import pytest
+from db.export import export_session, open_dataset, read_table
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture(scope='module')
+def ingested_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('export') / 'export.db')
+    converter = FastF1ToSQL(path, telemetry_storage='laps')
+    converter.process_session(
+        SyntheticSource(drivers=2, laps=3).load(2023, 'Bahrain', 'R'), load=False)
+    converter.close()
+    return path
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_exported_tables_read_back_whole(ingested_db, tmp_path, format):
+    conn = sqlite3.connect(ingested_db)
+
+    exported = export_session(conn, 1, str(tmp_path), format)
+
+    assert exported['Laps'] == conn.execute("SELECT COUNT(*) FROM Laps").fetchone()[0]
+    assert exported['Weather'] == conn.execute("SELECT COUNT(*) FROM Weather").fetchone()[0]
+    # Packed laps are exported as one row per sample
+    assert exported['Telemetry'] == conn.execute(
+        "SELECT SUM(sample_count) FROM LapTelemetry").fetchone()[0]
+    for table, rows in exported.items():
+        assert read_table(str(tmp_path), table, format).num_rows == rows
+
+
+def test_export_is_partitioned_by_season_event_session_and_driver(ingested_db, tmp_path):
+    export_session(sqlite3.connect(ingested_db), 1, str(tmp_path), 'arrow')
+
+    session_dir = os.path.join(tmp_path, 'Telemetry', 'season=2023',
+                               'event=Bahrain%20Grand%20Prix', 'session=Race')
+    assert sorted(os.listdir(session_dir)) == ['driver=D00', 'driver=D01']
+    assert {'season', 'event', 'session', 'driver'} <= set(
+        open_dataset(str(tmp_path), 'Telemetry', 'arrow').schema.names)
+
+
+def test_read_table_filters_columns_drivers_and_laps(ingested_db, tmp_path):
+    conn = sqlite3.connect(ingested_db)
+    export_session(conn, 1, str(tmp_path), 'arrow')
+
+    laps = read_table(str(tmp_path), 'Telemetry', 'arrow',
+                      columns=['lap_number', 'driver', 'speed_in_km'],
+                      drivers=['D01'], laps=[2])
+
+    assert laps.column_names == ['lap_number', 'driver', 'speed_in_km']
+    assert set(laps.column('driver').to_pylist()) == {'D01'}
+    assert set(laps.column('lap_number').to_pylist()) == {2}
+    assert laps.num_rows == conn.execute('''
+        SELECT lt.sample_count
+        FROM LapTelemetry lt
+        JOIN Laps l ON lt.lap_id = l.lap_id
+        JOIN Drivers d ON lt.driver_id = d.driver_id
+        WHERE d.abbreviation = 'D01' AND l.lap_number = 2
+    ''').fetchone()[0]
+
+
+def test_unknown_table_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_dataset(str(tmp_path), 'LapTelemetry')
@@ -0,0 +1,61 @@
+import sqlite3
+import pytest
+from db.export import read_table
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+
+pytest.importorskip('pyarrow')
+
+SOURCE = SyntheticSource(drivers=2, laps=3)
+
+
+@pytest.fixture
+def converter(tmp_path):
+    converter = FastF1ToSQL(str(tmp_path / 'ingest.db'), export_dir=str(tmp_path / 'exports'))
+    yield converter
+    converter.close()
+
+
+def test_unchanged_session_is_not_written_again(converter):
+    converter.process_session(SOURCE.load(2023, 'Bahrain', 'R'), load=False)
+
+    report = converter.process_session(SOURCE.load(2023, 'Bahrain', 'R'), load=False)
+
+    assert report.unchanged_tables == ['Drivers', 'Weather', 'Laps', 'Telemetry']
+    assert 'analysis tables' not in report.summary()
+
+
+def test_renamed_event_keeps_its_sessions(converter, tmp_path):
+    for session_name in ('Q', 'R'):
+        converter.process_session(SOURCE.load(2023, 'Bahrain', session_name), load=False)
+
+    session = SOURCE.load(2023, 'Bahrain', 'R')
+    session.event['EventName'] = 'Gulf Air Bahrain Grand Prix'
+    converter.process_session(session, load=False)
+
+    conn = sqlite3.connect(converter.db_path)
+    assert conn.execute("SELECT event_name FROM Event").fetchall() == [
+        ('Gulf Air Bahrain Grand Prix',)]
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 2
+    # Qualifying was not ingested again, but its analysis rows and export
+    # follow the new name
+    assert conn.execute(
+        "SELECT DISTINCT event_name FROM EventPerformanceOverview").fetchall() == [
+        ('Gulf Air Bahrain Grand Prix',)]
+    laps = read_table(str(tmp_path / 'exports'), 'Laps', columns=['event', 'session'])
+    assert set(laps.column('event').to_pylist()) == {'Gulf Air Bahrain Grand Prix'}
+    assert laps.num_rows == conn.execute("SELECT COUNT(*) FROM Laps").fetchone()[0]
+
+
+def test_events_of_other_rounds_are_not_merged(converter):
+    bahrain = SOURCE.load(2023, 'Bahrain', 'R')
+    jeddah = SOURCE.load(2023, 'Jeddah', 'R')
+    # Same date, different round
+    jeddah.event['EventDate'] = bahrain.event['EventDate']
+
+    converter.process_session(bahrain, load=False)
+    converter.process_session(jeddah, load=False)
+
+    conn = sqlite3.connect(converter.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM Event").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 2
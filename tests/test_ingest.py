@@ -0,0 +1,27 @@
+import sqlite3
+from contextlib import closing
+from db.formula1_databases import FastF1ToSQL
+from db.ingest import SessionJob, ingest
+from db.session_sources import SyntheticSource
+
+JOBS = [SessionJob(2023, 'Bahrain', 'Q'), SessionJob(2023, 'Bahrain', 'R')]
+
+
+def test_bulk_ingest_commits_once_at_the_end(tmp_path):
+    path = str(tmp_path / 'bulk.db')
+    converter = FastF1ToSQL(path)
+    statements = []
+    with converter.bulk_load():
+        converter.conn.set_trace_callback(statements.append)
+        ingest(converter, JOBS, concurrency=1, source=SyntheticSource(drivers=2, laps=3))
+        converter.conn.set_trace_callback(None)
+        # Nothing of the load is visible to other connections yet
+        with closing(sqlite3.connect(path)) as reader:
+            assert reader.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 0
+    converter.close()
+
+    assert [statement for statement in statements if statement.upper() == 'COMMIT'] == []
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 2
+    assert conn.execute(
+        "SELECT status, COUNT(*) FROM IngestCheckpoints GROUP BY status").fetchall() == [('done', 2)]
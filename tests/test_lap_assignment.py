@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from db.formula1_databases import _assign_lap_ids, _assign_weather_ids
+
+START = pd.Timestamp('2023-03-05 15:00:00')
+
+
+def at(*seconds: float) -> np.ndarray:
+    return (START + pd.to_timedelta(list(seconds), unit='s')).to_numpy(dtype='datetime64[ns]')
+
+
+# Lap 10 runs from 0 s to 90 s, lap 11 from 90 s to 175 s and, after a gap in
+# the pits, lap 12 from 180 s without a recorded end
+LAP_STARTS = at(0, 90, 180)
+LAP_ENDS = np.append(at(90, 175), np.datetime64('NaT'))
+LAP_IDS = np.array([10, 11, 12])
+
+
+def lap_ids(*seconds: float) -> list:
+    return _assign_lap_ids(pd.Series(at(*seconds)), LAP_STARTS, LAP_ENDS, LAP_IDS).tolist()
+
+
+def test_samples_get_the_lap_they_fall_in():
+    assert lap_ids(0, 45, 89.9, 90, 174.9) == [10, 10, 10, 11, 11]
+
+
+def test_samples_outside_every_lap_are_unmatched():
+    # Before the first lap, in the gap between laps 11 and 12, and inside a
+    # lap that has no end
+    assert lap_ids(-0.1, 175, 179.9, 200) == [None, None, None, None]
+
+
+def test_samples_of_a_driver_without_laps_are_unmatched():
+    empty = np.array([], dtype='datetime64[ns]')
+    assigned = _assign_lap_ids(pd.Series(at(0, 1)), empty, empty, np.array([], dtype='int64'))
+
+    assert assigned.tolist() == [None, None]
+
+
+def test_weather_in_effect_is_the_latest_sample_at_or_before():
+    weather_ms = np.array([1_000, 61_000, 121_000])
+    times = pd.Series([999, 1_000, 60_999, 200_000, None], dtype='Int64')
+
+    assigned = _assign_weather_ids(times, weather_ms, np.array([7, 8, 9]))
+
+    assert assigned.tolist() == [None, 7, 7, 9, None]
+
+
+def test_weather_of_a_session_without_weather_is_unmatched():
+    assigned = _assign_weather_ids(pd.Series([1_000], dtype='Int64'),
+                                   np.array([], dtype='int64'), np.array([], dtype='int64'))
+
+    assert assigned.tolist() == [None]
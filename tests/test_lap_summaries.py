@@ -0,0 +1,33 @@
+import sqlite3
+import pandas as pd
+import pytest
+from db.export import session_telemetry
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+from db.telemetry import summarize_laps
+
+
+@pytest.mark.parametrize('telemetry_storage', ['rows', 'both'])
+def test_streamed_summaries_match_the_stored_telemetry(tmp_path, telemetry_storage):
+    path = str(tmp_path / 'summaries.db')
+    converter = FastF1ToSQL(path, telemetry_storage=telemetry_storage,
+                            telemetry_batch_size=200)
+    converter.process_session(
+        SyntheticSource(drivers=3, laps=6).load(2023, 'Bahrain', 'R'), load=False)
+    converter.close()
+
+    conn = sqlite3.connect(path)
+    stored = pd.read_sql_query(
+        "SELECT * FROM LapTelemetrySummary ORDER BY lap_id", conn)
+    weather = pd.read_sql_query('''
+        SELECT weather_id, air_temperature_in_celsius,
+               track_temperature_in_celsius, wind_speed_in_meters_per_seconds
+        FROM Weather
+    ''', conn, index_col='weather_id')
+    expected = summarize_laps(session_telemetry(conn, 1), weather)
+
+    assert len(stored) == conn.execute("SELECT COUNT(*) FROM Laps").fetchone()[0]
+    pd.testing.assert_frame_equal(
+        stored, expected[stored.columns], check_dtype=False)
+    if telemetry_storage == 'both':
+        assert conn.execute("SELECT COUNT(*) FROM LapTelemetry").fetchone()[0] == len(stored)
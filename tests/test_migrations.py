@@ -0,0 +1,240 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+
+# Tables as the first released version created them, before PRAGMA
+# user_version was set
+BASELINE_SCHEMA = '''
+    CREATE TABLE Drivers (
+        driver_id INTEGER PRIMARY KEY,
+        driver_name TEXT NOT NULL,
+        team TEXT NOT NULL
+    );
+    CREATE TABLE Tracks (
+        track_id INTEGER PRIMARY KEY,
+        track_name TEXT NOT NULL,
+        country TEXT NOT NULL
+    );
+    CREATE TABLE Event (
+        event_id INTEGER PRIMARY KEY,
+        round_number INTEGER,
+        country TEXT,
+        location TEXT,
+        event_date DATE,
+        event_name TEXT,
+        session_1_date_utc DATETIME,
+        session_1_name TEXT,
+        session_2_date_utc DATETIME,
+        session_2_name TEXT,
+        session_3_date_utc DATETIME,
+        session_3_name TEXT,
+        session_4_date_utc DATETIME,
+        session_4_name TEXT,
+        session_5_date_utc DATETIME,
+        session_5_name TEXT
+    );
+    CREATE TABLE Sessions (
+        session_id INTEGER PRIMARY KEY,
+        event_id INTEGER,
+        track_id INTEGER,
+        session_type TEXT NOT NULL,
+        date DATETIME NOT NULL,
+        FOREIGN KEY (event_id) REFERENCES Event(event_id),
+        FOREIGN KEY (track_id) REFERENCES Tracks(track_id)
+    );
+    CREATE TABLE Weather (
+        weather_id INTEGER PRIMARY KEY,
+        session_id INTEGER,
+        datetime DATETIME,
+        air_temperature_in_celsius REAL,
+        relative_air_humidity_in_percentage REAL,
+        air_pressure_in_mbar REAL,
+        is_raining BOOLEAN,
+        track_temperature_in_celsius REAL,
+        wind_direction_in_grads REAL,
+        wind_speed_in_meters_per_seconds REAL,
+        FOREIGN KEY (session_id) REFERENCES Sessions(session_id)
+    );
+    CREATE TABLE Laps (
+        lap_id INTEGER PRIMARY KEY,
+        session_id INTEGER,
+        driver_name TEXT NOT NULL,
+        lap_number INTEGER NOT NULL,
+        stint INTEGER,
+        sector_1_speed_trap_in_km REAL,
+        sector_2_speed_trap_in_km REAL,
+        finish_line_speed_trap_in_km REAL,
+        longest_strait_speed_trap_in_km REAL,
+        is_personal_best BOOLEAN,
+        tyre_compound TEXT,
+        tyre_life_in_laps INTEGER,
+        is_fresh_tyre BOOLEAN,
+        position INTEGER,
+        lap_time_in_seconds REAL,
+        sector_1_time_in_seconds REAL,
+        sector_2_time_in_seconds REAL,
+        sector_3_time_in_seconds REAL,
+        lap_start_time_in_datetime DATETIME,
+        pin_in_time_in_datetime DATETIME,
+        pin_out_time_in_datetime DATETIME,
+        FOREIGN KEY (session_id) REFERENCES Sessions(session_id),
+        UNIQUE (session_id, driver_name, lap_number)
+    );
+    CREATE TABLE Telemetry (
+        telemetry_id INTEGER PRIMARY KEY,
+        lap_id INTEGER,
+        driver_name TEXT NOT NULL,
+        speed_in_km REAL,
+        RPM INTEGER,
+        gear_number INTEGER,
+        throttle_input REAL,
+        is_brake_pressed BOOLEAN,
+        is_DRS_open BOOLEAN,
+        x_position REAL,
+        y_position REAL,
+        z_position REAL,
+        is_off_track BOOLEAN,
+        datetime DATETIME,
+        FOREIGN KEY (lap_id) REFERENCES Laps(lap_id),
+        FOREIGN KEY (driver_name) REFERENCES Drivers(driver_name)
+    );
+'''
+
+SESSION_START = datetime(2023, 3, 5, 15, 0)
+LAP_SECONDS = 90
+LAPS = 3
+DRIVERS = ('VER', 'HAM')
+
+
+def ingest_baseline_session(conn: sqlite3.Connection) -> int:
+    """
+    Write a race the way the first version did: every telemetry sample
+    after the start of a driver's last lap got the placeholder lap_id 999.
+
+    Returns:
+        int: The session_id.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO Event (round_number, country, location, event_date, event_name) "
+        "VALUES (1, 'Bahrain', 'Sakhir', '2023-03-05', 'Bahrain Grand Prix')")
+    event_id = cursor.lastrowid
+    cursor.execute("INSERT INTO Tracks (track_name, country) VALUES ('Sakhir', 'Bahrain')")
+    cursor.execute(
+        "INSERT INTO Sessions (event_id, track_id, session_type, date) VALUES (?, ?, 'Race', ?)",
+        (event_id, cursor.lastrowid, str(SESSION_START)))
+    session_id = cursor.lastrowid
+    for driver_name in DRIVERS:
+        cursor.execute("INSERT INTO Drivers (driver_name, team) VALUES (?, 'Team')",
+                       (f"Driver {driver_name}",))
+    for minute in range(LAPS * LAP_SECONDS // 60 + 1):
+        cursor.execute(
+            "INSERT INTO Weather (session_id, datetime, air_temperature_in_celsius) VALUES (?, ?, 25)",
+            (session_id, str(SESSION_START + timedelta(minutes=minute))))
+
+    for driver_name in DRIVERS:
+        lap_ids = []
+        for lap_number in range(1, LAPS + 1):
+            lap_start = SESSION_START + timedelta(seconds=(lap_number - 1) * LAP_SECONDS)
+            cursor.execute(
+                "INSERT INTO Laps (session_id, driver_name, lap_number, tyre_compound, "
+                "lap_time_in_seconds, lap_start_time_in_datetime) VALUES (?, ?, ?, 'SOFT', ?, ?)",
+                (session_id, driver_name, lap_number, LAP_SECONDS, str(lap_start)))
+            lap_ids.append(cursor.lastrowid)
+        # One sample every 10s, and one past the end of the last lap
+        for second in range(0, LAPS * LAP_SECONDS + 10, 10):
+            lap_index = second // LAP_SECONDS
+            lap_id = lap_ids[lap_index] if lap_index < LAPS - 1 else 999
+            cursor.execute(
+                "INSERT INTO Telemetry (lap_id, driver_name, speed_in_km, datetime) VALUES (?, ?, 300, ?)",
+                (lap_id, driver_name, str(SESSION_START + timedelta(seconds=second))))
+    conn.commit()
+    return session_id
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    path = str(tmp_path / 'baseline.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    ingest_baseline_session(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def reingested_baseline_db(tmp_path):
+    path = str(tmp_path / 'reingested.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    ingest_baseline_session(conn)
+    ingest_baseline_session(conn)
+    conn.close()
+    return path
+
+
+def migrate(path: str) -> sqlite3.Connection:
+    FastF1ToSQL(path).close()
+    return sqlite3.connect(path)
+
+
+def test_migration_satisfies_foreign_keys(baseline_db):
+    conn = migrate(baseline_db)
+
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    assert conn.execute(
+        "SELECT COUNT(*) FROM Telemetry WHERE session_id IS NULL").fetchone()[0] == 0
+    assert conn.execute(
+        "SELECT COUNT(*) FROM Drivers WHERE season IS NULL").fetchone()[0] == 0
+
+
+def test_migration_assigns_placeholder_samples_to_last_lap(baseline_db):
+    conn = migrate(baseline_db)
+
+    samples = dict(conn.execute('''
+        SELECT l.lap_number, COUNT(*)
+        FROM Telemetry t
+        JOIN Laps l ON t.lap_id = l.lap_id
+        GROUP BY l.lap_number
+    ''').fetchall())
+    per_lap = LAP_SECONDS // 10 * len(DRIVERS)
+    # The samples past the end of the last lap belong to no lap
+    assert samples == {1: per_lap, 2: per_lap, 3: per_lap}
+    assert conn.execute("SELECT COUNT(*) FROM Telemetry").fetchone()[0] == LAPS * per_lap
+
+
+def test_migration_keeps_one_copy_of_reingested_placeholder_samples(reingested_baseline_db):
+    conn = migrate(reingested_baseline_db)
+
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 1
+    assert conn.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM Telemetry GROUP BY driver_id, datetime HAVING COUNT(*) > 1)
+    ''').fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM Telemetry").fetchone()[0] == \
+        LAPS * LAP_SECONDS // 10 * len(DRIVERS)
+
+
+def test_migration_drops_lap_telemetry_start_datetime(tmp_path):
+    path = str(tmp_path / 'laps.db')
+    converter = FastF1ToSQL(path, telemetry_storage='laps')
+    converter.process_session(
+        SyntheticSource(drivers=2, laps=3).load(2023, 'Bahrain', 'R'), load=False)
+    converter.close()
+    conn = sqlite3.connect(path)
+    # Version 9 stored the lap start as text as well
+    conn.execute("ALTER TABLE LapTelemetry ADD COLUMN start_datetime DATETIME")
+    conn.execute("PRAGMA user_version = 9")
+    conn.commit()
+    laps = conn.execute("SELECT lap_id, start_epoch_ms FROM LapTelemetry ORDER BY lap_id").fetchall()
+    conn.close()
+
+    conn = migrate(path)
+
+    assert 'start_datetime' not in [
+        row[1] for row in conn.execute("PRAGMA table_info(LapTelemetry)")]
+    assert conn.execute(
+        "SELECT lap_id, start_epoch_ms FROM LapTelemetry ORDER BY lap_id").fetchall() == laps
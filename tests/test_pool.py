@@ -0,0 +1,66 @@
+import sqlite3
+from contextlib import closing
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from db.formula1_databases import FastF1ToSQL
+from db.pool import create_read_only_engine, pool_stats, probing
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    FastF1ToSQL(path).close()
+    engine = create_read_only_engine(path, pool_size=2)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_stats_count_probes_apart_from_queries(engine):
+    with closing(engine.raw_connection()) as connection:
+        before = pool_stats(engine)
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM Laps")
+        cursor.execute("PRAGMA data_version")
+        with probing():
+            cursor.execute("SELECT generation FROM IngestGeneration WHERE id = 1")
+        cursor.execute("SELECT COUNT(*) FROM Sessions")
+
+    after = pool_stats(engine)
+
+    assert after.queries - before.queries == 2
+    assert after.probes - before.probes == 2
+
+
+def test_pool_connections_are_read_only(engine):
+    with closing(engine.raw_connection()) as connection:
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            connection.cursor().execute("DELETE FROM Laps")
+
+
+def test_missing_database_is_not_created(tmp_path):
+    path = tmp_path / 'missing.db'
+
+    with pytest.raises(FileNotFoundError):
+        create_read_only_engine(str(path))
+    assert not path.exists()
+
+
+def test_checkout_waits_for_a_free_connection(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    FastF1ToSQL(path).close()
+    engine = create_read_only_engine(path, pool_size=1, pool_timeout=0.1)
+
+    with closing(engine.raw_connection()):
+        with pytest.raises(PoolTimeoutError):
+            engine.raw_connection()
+    with closing(engine.raw_connection()):
+        pass
+    engine.dispose()
+
+    assert pool_stats(engine).connections_opened == 1
+
+
+def test_pool_stats_need_a_read_only_engine():
+    with pytest.raises(ValueError):
+        pool_stats(create_engine("sqlite://"))
@@ -0,0 +1,47 @@
+import sqlite3
+import pytest
+from db.formula1_databases import ANALYSIS_REFRESH_QUERIES, FastF1ToSQL
+from db.query_plans import check_query_plans, plan_queries
+from db.session_sources import SyntheticSource
+
+
+@pytest.fixture
+def empty_db(tmp_path):
+    path = str(tmp_path / 'query_plans.db')
+    FastF1ToSQL(path).close()
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def analyzed_db(tmp_path):
+    path = str(tmp_path / 'query_plans_analyzed.db')
+    converter = FastF1ToSQL(path)
+    source = SyntheticSource(drivers=2, laps=3)
+    # A few events, so the planner does not prefer scanning a table of one
+    # or two rows
+    for event_name in ('Bahrain', 'Jeddah', 'Melbourne', 'Baku'):
+        for session_name in ('Q', 'R'):
+            converter.process_session(source.load(2023, event_name, session_name), load=False)
+    converter.close()
+    conn = sqlite3.connect(path)
+    # The planner weighs the indexes by the statistics of the rows, which an
+    # empty database has none of
+    conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+
+def test_plan_queries_include_tool_queries_and_refreshes():
+    queries = plan_queries()
+
+    assert {'tyre_performance', 'telemetry_analysis', 'lap_telemetry_summary'} <= set(queries)
+    assert {f'refresh {table}' for table in ANALYSIS_REFRESH_QUERIES} <= set(queries)
+
+
+@pytest.mark.parametrize('db', ['empty_db', 'analyzed_db'])
+def test_query_plans_use_indexes(db, request):
+    problems = check_query_plans(request.getfixturevalue(db), plan_queries())
+
+    assert {name: steps for name, steps in problems.items() if steps} == {}
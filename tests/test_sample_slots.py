@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from db.formula1_databases import _assign_sample_slots
+
+
+def slots(lap_ids: list, times_ms: list, per_lap: int) -> list:
+    return _assign_sample_slots(pd.Series(lap_ids, dtype='Int64'),
+                                pd.Series(times_ms, dtype='Int64'), per_lap).tolist()
+
+
+def test_samples_nearest_the_middle_of_each_stratum_are_picked():
+    # One sample every 10 ms over 0-90 ms: the strata of 4 slots are centred
+    # on 11.25, 33.75, 56.25 and 78.75 ms
+    assigned = slots([1] * 10, list(range(0, 100, 10)), per_lap=4)
+
+    assert assigned == [None, 0, None, 1, None, None, 2, None, 3, None]
+
+
+def test_slots_are_numbered_per_lap():
+    # Strata centred on 25 and 75 ms after the start of each lap
+    assigned = slots([1, 1, 1, 2, 2, 2], [0, 40, 100, 1000, 1040, 1100], per_lap=2)
+
+    assert assigned == [None, 0, 1, None, 0, 1]
+
+
+def test_laps_with_fewer_samples_than_slots_have_all_picked():
+    assert slots([1, 1, 1], [0, 10, 20], per_lap=5) == [0, 1, 2]
+
+
+def test_repeated_timestamps_and_samples_outside_laps_are_skipped():
+    assigned = slots([1, 1, 1, None], [0, 0, 10, 5], per_lap=5)
+
+    assert assigned == [0, None, 1, None]
+
+
+def test_slots_do_not_depend_on_the_order_of_the_samples():
+    lap_ids = [1] * 10 + [2] * 10
+    times_ms = list(range(0, 100, 10)) + list(range(500, 600, 10))
+    order = np.random.default_rng(0).permutation(len(lap_ids))
+
+    shuffled = slots([lap_ids[i] for i in order], [times_ms[i] for i in order], per_lap=3)
+
+    assert [shuffled[list(order).index(i)] for i in range(len(order))] == \
+        slots(lap_ids, times_ms, per_lap=3)
+
+
+def test_no_slots_are_picked_without_samples_per_lap():
+    assert slots([1, 1], [0, 10], per_lap=0) == [None, None]
@@ -0,0 +1,29 @@
+import sqlite3
+from db.formula1_databases import FastF1ToSQL
+from db.session_sources import SyntheticSource
+
+
+def test_synthetic_events_get_their_own_round_and_date():
+    source = SyntheticSource(drivers=2, laps=3)
+
+    bahrain = source.load(2023, 'Bahrain', 'R').event
+    jeddah = source.load(2023, 'Jeddah', 'R').event
+
+    assert bahrain.RoundNumber != jeddah.RoundNumber
+    assert source.load(2023, 'Bahrain', 'Q').event.RoundNumber == bahrain.RoundNumber
+
+
+def test_synthetic_events_are_ingested_separately(tmp_path):
+    path = str(tmp_path / 'synthetic.db')
+    source = SyntheticSource(drivers=2, laps=3)
+    converter = FastF1ToSQL(path)
+    for event_name in ('Bahrain', 'Jeddah'):
+        for session_name in ('Q', 'R'):
+            converter.process_session(source.load(2023, event_name, session_name), load=False)
+    converter.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM Event").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone()[0] == 4
+    assert conn.execute(
+        "SELECT COUNT(DISTINCT session_id) FROM Laps").fetchone()[0] == 4
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from db.telemetry_codec import (LapTelemetryCodec, decode_lap_telemetry, encode_laps,
+                                lap_channels)
+
+START = np.datetime64('2023-03-05T15:00:00', 'ns')
+
+
+def lap_samples(count: int = 5) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    times = START + np.arange(count) * np.timedelta64(240, 'ms')
+    samples = {
+        'datetime': times,
+        'Speed': np.linspace(280.0, 300.4, count),
+        'RPM': np.linspace(10500.0, 11000.0, count),
+        'nGear': np.full(count, 7),
+        'Throttle': np.linspace(99.5, 100.0, count),
+        'Brake': np.zeros(count, dtype=bool),
+        'DRS': np.full(count, 12),
+        'X': np.linspace(-1234.56, 1234.56, count),
+        'Y': np.linspace(10.01, 20.02, count),
+        'Z': np.full(count, np.nan),
+        'is_off_track': np.array([False] * (count - 1) + [True]),
+    }
+    return samples, times
+
+
+@pytest.mark.parametrize('codec', [
+    LapTelemetryCodec(),
+    LapTelemetryCodec(quantize=False),
+    LapTelemetryCodec(compression=None),
+    LapTelemetryCodec(quantize=False, compression=None),
+])
+def test_lap_round_trips_through_the_codec(codec):
+    samples, times = lap_samples()
+
+    channels = lap_channels(decode_lap_telemetry(
+        codec.encode(samples, times), codec.quantize, codec.compression), codec.quantize)
+
+    assert channels['time_ms'].tolist() == [0, 240, 480, 720, 960]
+    tolerance = 0.05 if codec.quantize else 1e-3
+    np.testing.assert_allclose(channels['speed'], samples['Speed'], atol=tolerance)
+    np.testing.assert_allclose(channels['throttle'], samples['Throttle'], atol=tolerance)
+    np.testing.assert_allclose(channels['x'], samples['X'], atol=0.01)
+    # Missing values survive quantization
+    assert np.isnan(channels['z']).all()
+    assert channels['gear'].tolist() == samples['nGear'].tolist()
+    assert channels['off_track'].tolist() == samples['is_off_track'].tolist()
+
+
+def test_decoding_does_not_copy_uncompressed_laps():
+    codec = LapTelemetryCodec(compression=None)
+    samples, times = lap_samples()
+
+    packed = decode_lap_telemetry(codec.encode(samples, times), codec.quantize, None)
+
+    assert not packed.flags.writeable
+
+
+def test_encode_laps_groups_samples_by_lap():
+    samples, times = lap_samples(6)
+    # The third sample repeats the second, the last is outside every lap
+    samples = {name: values[[0, 1, 1, 2, 3, 4]] for name, values in samples.items()}
+    lap_ids = np.array([1, 1, 1, 2, 2, None], dtype=object)
+
+    records = encode_laps(lap_ids, samples, LapTelemetryCodec())
+
+    assert [(lap_id, start_ms, count) for lap_id, start_ms, count, _ in records] == [
+        (1, pd.Timestamp(samples['datetime'][0]).value // 1_000_000, 2),
+        (2, pd.Timestamp(samples['datetime'][3]).value // 1_000_000, 2),
+    ]
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        LapTelemetryCodec(compression='lz4')
@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import pytest
+from tools.telemetry_analysis import GetTelemetry
+
+
+@pytest.fixture
+def tools_db():
+    conn = sqlite3.connect(os.environ['F1_SQLITE_PATH'])
+    yield conn
+    conn.close()
+
+
+def session_laps(conn: sqlite3.Connection, lap_number: int) -> list[tuple[str, int, int]]:
+    """The (driver, session_id, lap_id) of a lap number, oldest session first."""
+    return conn.execute('''
+        SELECT d.abbreviation, l.session_id, l.lap_id
+        FROM Laps l
+        JOIN Drivers d ON l.driver_id = d.driver_id
+        JOIN Sessions s ON l.session_id = s.session_id
+        WHERE l.lap_number = ?
+        ORDER BY d.abbreviation, s.date
+    ''', (lap_number,)).fetchall()
+
+
+def test_get_telemetry_defaults_to_latest_session(tools_db):
+    (driver_name, _, _), (_, _, latest_lap_id) = session_laps(tools_db, 2)[:2]
+
+    lap = GetTelemetry()._run(driver_name, 2)
+
+    assert lap.lap_id == latest_lap_id
+
+
+def test_get_telemetry_reads_requested_session(tools_db):
+    (driver_name, session_id, lap_id), _ = session_laps(tools_db, 2)[:2]
+
+    lap = GetTelemetry()._run(driver_name, 2, session_id=session_id)
+
+    assert lap.lap_id == lap_id
+    assert GetTelemetry()._run(driver_name, 2, session_id=-1) is None
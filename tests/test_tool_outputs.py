@@ -0,0 +1,53 @@
+import pytest
+import tools.query
+from tools.event_performance import GetEventPerformanceOutput
+from tools.query import fetch_model, fetch_models
+from tools.telemetry_analysis import GetTelemetryAndWeatherOutput
+from tools.tyre_performance import GetTyrePerformanceOutput
+
+# Rows as the queries return them for laps FastF1 has no timing, tyre or
+# telemetry data for
+NULL_ROWS = {
+    'tyre_performance': {
+        'driver_name': 'VER', 'lap_number': 1, 'tyre_compound': None,
+        'avg_tyre_life': None, 'avg_lap_time': None, 'avg_top_speed': None,
+        'fresh_tyre_laps': 0, 'used_tyre_laps': 0, 'avg_track_temp': None,
+        'avg_air_temp': None,
+    },
+    'event_performance': {
+        'event_name': 'Bahrain Grand Prix', 'country': 'Bahrain',
+        'location': 'Sakhir', 'session_type': 'Race', 'driver_count': 20,
+        'avg_lap_time': None, 'best_lap_time': None,
+        'max_finish_line_speed': None, 'avg_air_temp': None,
+        'avg_track_temp': None, 'rain_percentage': 0.0,
+    },
+    'telemetry_analysis': {
+        'lap_id': 1, 'lap_number': 1, 'lap_time_in_seconds': None,
+        'avg_speed': None, 'max_speed': None, 'avg_RPM': None, 'max_RPM': None,
+        'avg_throttle': None, 'brake_percentage': 0.0,
+        'drs_usage_percentage': 0.0, 'off_track_percentage': 0.0,
+        'avg_air_temp': None, 'avg_track_temp': None, 'avg_wind_speed': None,
+    },
+}
+
+
+@pytest.fixture
+def null_rows(monkeypatch):
+    monkeypatch.setattr(tools.query, 'fetch_rows',
+                        lambda name, parameters=None, size=None: [NULL_ROWS[name]])
+
+
+@pytest.mark.parametrize('model, name', [
+    (GetTyrePerformanceOutput, 'tyre_performance'),
+    (GetEventPerformanceOutput, 'event_performance'),
+])
+def test_fetch_models_maps_null_columns(null_rows, model, name):
+    rows = fetch_models(model, name)
+
+    assert [row.model_dump(exclude_unset=True) for row in rows] == [NULL_ROWS[name]]
+
+
+def test_fetch_model_maps_null_telemetry_columns(null_rows):
+    row = fetch_model(GetTelemetryAndWeatherOutput, 'telemetry_analysis')
+
+    assert row.model_dump(exclude_unset=True) == NULL_ROWS['telemetry_analysis']
@@ -0,0 +1,180 @@
+"""
+Result cache in front of the tools.
+
+Chat users ask the same questions again and again, and every tool call runs
+the same aggregation. Results are kept per tool and arguments, least recently
+used first out, for at most F1_TOOL_CACHE_TTL seconds (default 300). The
+cache holds up to F1_TOOL_CACHE_SIZE results (default 256, 0 disables it).
+
+Every entry records the database's ingest generation, which FastF1ToSQL bumps
+whenever it writes data (see the IngestGeneration table), so results cached
+before an ingest are never served after it.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, TypeVar
+from db.pool import probing
+from tools.query import run_sql
+
+TOOL_CACHE_SIZE = int(os.getenv('F1_TOOL_CACHE_SIZE', '256'))
+TOOL_CACHE_TTL = float(os.getenv('F1_TOOL_CACHE_TTL', '300'))
+
+Result = TypeVar('Result')
+
+# Set once the database is seen to have the IngestGeneration table
+_has_generation = False
+
+
+@dataclass
+class CacheStats:
+    """Lookups and removals of a ToolResultCache since it was created."""
+    hits: int = 0
+    misses: int = 0
+    # Least recently used entries dropped to stay within max_entries
+    evictions: int = 0
+    # Entries dropped because they outlived the TTL
+    expirations: int = 0
+    # Entries dropped because the database was written since they were cached
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def ingest_generation() -> int:
+    """
+    Read the ingest generation of the tools' database.
+
+    Returns:
+        int: The generation, 0 for a database that predates IngestGeneration
+        or was never written.
+    """
+    global _has_generation
+    with probing():
+        if not _has_generation:
+            # Databases from before the table get it on their next ingest
+            _has_generation = bool(run_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'IngestGeneration'"))
+            if not _has_generation:
+                return 0
+        rows = run_sql("SELECT generation FROM IngestGeneration WHERE id = 1")
+    return rows[0]['generation'] if rows else 0
+
+
+class ToolResultCache:
+    """LRU cache of tool results with a TTL, keyed on the ingest generation."""
+
+    def __init__(self, max_entries: int = TOOL_CACHE_SIZE,
+                 ttl_seconds: float = TOOL_CACHE_TTL,
+                 generation: Callable[[], int] = ingest_generation,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Results kept at most. 0 disables the cache.
+            ttl_seconds (float): Seconds a result is served for.
+            generation (Callable[[], int]): Reads the database's current
+                version; results cached under another version are dropped.
+            clock (Callable[[], float]): Monotonic time in seconds.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._generation = generation
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._entries_generation: int | None = None
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get_or_run(self, key: Hashable, run: Callable[[], Result]) -> Result:
+        """
+        Return the cached result of a call, or make the call and cache it.
+
+        Args:
+            key (Hashable): Identifies the call, e.g. tool name and arguments.
+            run (Callable[[], Result]): Makes the call on a miss.
+
+        Returns:
+            Result: The call's result.
+        """
+        if self.max_entries <= 0:
+            return run()
+        generation = self._generation()
+        now = self._clock()
+        with self._lock:
+            if generation != self._entries_generation:
+                self._stats.invalidations += len(self._entries)
+                self._entries.clear()
+                self._entries_generation = generation
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._stats.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[1]
+            self._stats.misses += 1
+
+        # Run outside the lock, so slow queries don't block other tools
+        result = run()
+        with self._lock:
+            if generation == self._entries_generation:
+                self._entries[key] = (now, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Copy of the counters."""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+tool_cache = ToolResultCache()
+
+
+def cached_tool_call(run: Callable[..., Result]) -> Callable[..., Result]:
+    """
+    Serve a tool's ``_run`` from tool_cache.
+
+    Calls are keyed on the tool's name and its arguments bound to the
+    signature of ``_run``, so positional and keyword calls share an entry.
+
+    Args:
+        run (Callable[..., Result]): The tool's ``_run`` method.
+
+    Returns:
+        Callable[..., Result]: ``_run`` with caching, with the same signature.
+    """
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def cached_run(self, *args: Any, **kwargs: Any) -> Result:
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key = (self.name, tuple(sorted(
+            (name, value) for name, value in arguments.arguments.items() if name != 'self')))
+        return tool_cache.get_or_run(key, lambda: run(self, *args, **kwargs))
+
+    return cached_run
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
-from db.connection import db
+from tools.cache import cached_tool_call
+from tools.executor import run_in_pool
+from tools.query import check_query, fetch_models
 
 
 class GetDriverPerformanceOutput(BaseModel):
@@ -35,53 +37,14 @@ class GetDriverPerformance(BaseTool):
     name: str = "get_driver_performance"
     description: str = "useful for when you need to analyze driver performance statistics across different sessions and events"
 
+    @cached_tool_call
     def _run(self) -> list[GetDriverPerformanceOutput]:
         """Use the tool."""
-        sql_file = open("tools/sql/driver_performance.query.sql", "r")
-        sql_query = sql_file.read()
-        sql_file.close()
+        return fetch_models(GetDriverPerformanceOutput, 'driver_performance')
 
-        response = db.run(sql_query)
+    async def _arun(self) -> list[GetDriverPerformanceOutput]:
+        """Use the tool without blocking the event loop."""
+        return await run_in_pool(self._run)
 
-        if not isinstance(response, str):
-            response = str(response)
 
-        # Remove the outer brackets and split by rows
-        rows = response.strip('[]').split('), (')
-
-        results = []
-        for row in rows:
-            # Clean up the row string and split by columns
-            clean_row = row.strip('()').split(',')
-
-            # Convert to appropriate types and create output object
-            driver_data = GetDriverPerformanceOutput(
-                driver_name=clean_row[0].strip("'"),
-                event_name=clean_row[1].strip("'"),
-                session_type=clean_row[2].strip("'"),
-                track_name=clean_row[3].strip("'"),
-                total_laps=int(float(clean_row[4])),
-                avg_lap_time=float(
-                    clean_row[5]) if clean_row[5].strip() != 'None' else None,
-                best_lap_time=float(
-                    clean_row[6]) if clean_row[6].strip() != 'None' else None,
-                avg_sector1_time=float(
-                    clean_row[7]) if clean_row[7].strip() != 'None' else None,
-                avg_sector2_time=float(
-                    clean_row[8]) if clean_row[8].strip() != 'None' else None,
-                avg_sector3_time=float(
-                    clean_row[9]) if clean_row[9].strip() != 'None' else None,
-                avg_finish_line_speed=float(
-                    clean_row[10]) if clean_row[10].strip() != 'None' else None,
-                personal_best_laps=int(
-                    float(clean_row[11])) if clean_row[11].strip() != 'None' else 0,
-                avg_air_temp=float(
-                    clean_row[12]) if clean_row[12].strip() != 'None' else None,
-                avg_track_temp=float(
-                    clean_row[13]) if clean_row[13].strip() != 'None' else None,
-                rain_percentage=float(
-                    clean_row[14]) if clean_row[14].strip() != 'None' else 0.0
-            )
-            results.append(driver_data)
-
-        return results
+check_query('driver_performance')
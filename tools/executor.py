@@ -0,0 +1,104 @@
+"""
+Thread pool the tools' ``_arun`` hands their database work to.
+
+The agent runs tools from the event loop that serves every chat. A tool
+running its queries there blocks all other chats until the queries finish,
+so ``_arun`` runs the tool in a bounded pool of F1_TOOL_WORKERS threads
+(default 4) instead. Each call checks out one connection of the read-only
+pool (see db.pool) and runs all its queries on it.
+
+A call that runs longer than F1_QUERY_TIMEOUT seconds (default 30), or whose
+chat goes away while it runs, is interrupted: the running statement is
+aborted and the worker is free for the next call.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from sqlalchemy.pool import PoolProxiedConnection
+from db.connection import db
+
+TOOL_WORKERS = int(os.getenv('F1_TOOL_WORKERS', '4'))
+QUERY_TIMEOUT = float(os.getenv('F1_QUERY_TIMEOUT', '30'))
+
+Result = TypeVar('Result')
+
+_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='f1-tools')
+_worker = threading.local()
+
+
+def thread_connection() -> PoolProxiedConnection | None:
+    """
+    Get the connection the current pool worker checked out for its call.
+
+    Returns:
+        PoolProxiedConnection | None: The call's connection, None outside the
+        pool, where queries check out a connection of their own.
+    """
+    return getattr(_worker, 'connection', None)
+
+
+class _PoolCall:
+    """A call handed to the pool, which can be interrupted while it runs."""
+
+    def __init__(self, call: Callable[[], Any]) -> None:
+        self._call = call
+        self._lock = threading.Lock()
+        self._connection: PoolProxiedConnection | None = None
+        self._cancelled = False
+
+    def run(self) -> Any:
+        connection = db._engine.raw_connection()
+        with self._lock:
+            self._connection = _worker.connection = connection
+        try:
+            if self._cancelled:
+                raise asyncio.CancelledError()
+            return self._call()
+        finally:
+            with self._lock:
+                self._connection = _worker.connection = None
+            connection.close()
+
+    def cancel(self) -> None:
+        """Skip the call if it has not started, abort its statement if it has."""
+        with self._lock:
+            self._cancelled = True
+            if self._connection is not None:
+                # sqlite3 and duckdb connections both abort their running
+                # statement on interrupt()
+                interrupt = getattr(self._connection.dbapi_connection, 'interrupt', None)
+                if interrupt is not None:
+                    interrupt()
+
+
+async def run_in_pool(call: Callable[..., Result], *args: Any,
+                      timeout: float | None = QUERY_TIMEOUT, **kwargs: Any) -> Result:
+    """
+    Run a tool call in the pool without blocking the event loop.
+
+    Args:
+        call (Callable[..., Result]): Usually the tool's ``_run``.
+        *args (Any): Positional arguments of the call.
+        timeout (float | None): Seconds before the call is interrupted, None
+            to wait indefinitely.
+        **kwargs (Any): Keyword arguments of the call.
+
+    Returns:
+        Result: The call's result.
+
+    Raises:
+        TimeoutError: When the call did not finish within the timeout.
+    """
+    pool_call = _PoolCall(lambda: call(*args, **kwargs))
+    future = asyncio.get_running_loop().run_in_executor(_pool, pool_call.run)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        pool_call.cancel()
+        raise TimeoutError(
+            f"{getattr(call, '__name__', 'Tool call')} took longer than {timeout}s") from None
+    except asyncio.CancelledError:
+        pool_call.cancel()
+        raise
@@ -0,0 +1,212 @@
+"""
+Queries of the tools, loaded once from tools/sql and run on DB-API cursors.
+
+Every tools/sql/<name>.query.sql file is read when this module is imported
+and each tool checks at import that the parameters it binds are the ones its
+query uses (see check_query), so the request path does no file I/O. Queries
+are handed to the driver as the same string on every call, which sqlite3
+parses once per connection and keeps in its statement cache.
+
+Set F1_SQL_RELOAD=1 while editing the queries to read a file again whenever
+it changes on disk.
+"""
+import glob
+import os
+import re
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Any, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+from db.connection import db
+from tools.executor import thread_connection
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql')
+SQL_RELOAD = os.getenv('F1_SQL_RELOAD', '') not in ('', '0')
+
+Model = TypeVar('Model', bound=BaseModel)
+
+# One validator per output model, built on first use: building a TypeAdapter
+# compiles the model's schema, which costs more than validating a result
+_list_adapters: dict[type[BaseModel], TypeAdapter] = {}
+
+
+@dataclass(frozen=True)
+class Query:
+    """A tools/sql query, ready to run on the tools' database."""
+    name: str
+    sql: str
+    parameters: frozenset[str]
+    modified: float
+
+
+def load_query(path: str) -> Query:
+    """
+    Read a query file.
+
+    Args:
+        path (str): Path of a <name>.query.sql file.
+
+    Returns:
+        Query: The query, with ``:name`` parameters rewritten for the
+        database's backend.
+    """
+    with open(path, "r") as sql_file:
+        sql = sql_file.read()
+    parameters = frozenset(re.findall(r"(?<![:\w]):(\w+)", sql))
+    if db._engine.dialect.name == 'duckdb':
+        from db.duckdb_backend import duckdb_parameters
+        sql = duckdb_parameters(sql)
+    return Query(name=os.path.basename(path).removesuffix('.query.sql'), sql=sql,
+                 parameters=parameters, modified=os.path.getmtime(path))
+
+
+def load_queries(sql_dir: str = SQL_DIR) -> dict[str, Query]:
+    """
+    Read every query file of a directory.
+
+    Args:
+        sql_dir (str): Directory of the <name>.query.sql files.
+
+    Returns:
+        dict[str, Query]: The queries by name.
+    """
+    queries = {}
+    for path in sorted(glob.glob(os.path.join(sql_dir, '*.query.sql'))):
+        query = load_query(path)
+        queries[query.name] = query
+    return queries
+
+
+_queries: dict[str, Query] = load_queries()
+
+
+def get_query(name: str) -> Query:
+    """
+    Look up a query by name.
+
+    Args:
+        name (str): File name of the query without .query.sql.
+
+    Returns:
+        Query: The query; read again first if F1_SQL_RELOAD is set and the
+        file changed.
+    """
+    if name not in _queries:
+        raise KeyError(f"Unknown query '{name}', expected one of {sorted(_queries)}")
+    query = _queries[name]
+    if SQL_RELOAD:
+        path = os.path.join(SQL_DIR, f"{name}.query.sql")
+        if os.path.getmtime(path) != query.modified:
+            query = _queries[name] = load_query(path)
+    return query
+
+
+def check_query(name: str, args_schema: Type[BaseModel] | None = None) -> None:
+    """
+    Check that a tool binds exactly the parameters its query uses.
+
+    Args:
+        name (str): Name of the tool's query.
+        args_schema (Type[BaseModel] | None): The tool's input model, whose
+            fields are bound under their own names. None for tools without
+            input.
+
+    Raises:
+        ValueError: When a query parameter is not bound or a bound one is not
+            used by the query.
+    """
+    bound = set(args_schema.model_fields) if args_schema is not None else set()
+
+    parameters = get_query(name).parameters
+    if parameters != bound:
+        raise ValueError(
+            f"Query '{name}' uses parameters {sorted(parameters)} but the tool "
+            f"binds {sorted(bound)}")
+
+
+def fetch_rows(name: str, parameters: dict[str, Any] | None = None,
+               size: int | None = None) -> list[dict[str, Any]]:
+    """
+    Run a tools/sql query on a DB-API cursor of the tools' database.
+
+    Args:
+        name (str): Name of the query, see get_query.
+        parameters (dict[str, Any] | None): Values of the parameters.
+        size (int | None): Fetch at most this many rows, all when None.
+
+    Returns:
+        list[dict[str, Any]]: One dict per row, keyed by column name, with
+        the values as the driver returns them.
+    """
+    return run_sql(get_query(name).sql, parameters, size)
+
+
+def run_sql(sql: str, parameters: dict[str, Any] | None = None,
+            size: int | None = None) -> list[dict[str, Any]]:
+    """
+    Run SQL on a DB-API cursor of the tools' database, see fetch_rows.
+
+    Inside a tools.executor call, the query runs on the connection the call
+    checked out, so a call never holds more than one connection of the pool.
+
+    Args:
+        sql (str): Query in the backend's parameter style.
+        parameters (dict[str, Any] | None): Values of the parameters.
+        size (int | None): Fetch at most this many rows, all when None.
+
+    Returns:
+        list[dict[str, Any]]: One dict per row, keyed by column name.
+    """
+    connection = thread_connection()
+    if connection is not None:
+        return _fetch(connection, sql, parameters, size)
+    with closing(db._engine.raw_connection()) as connection:
+        return _fetch(connection, sql, parameters, size)
+
+
+def _fetch(connection: Any, sql: str, parameters: dict[str, Any] | None,
+           size: int | None) -> list[dict[str, Any]]:
+    """Run a query on a DB-API connection, see run_sql."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, parameters or {})
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    finally:
+        cursor.close()
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def fetch_models(model: Type[Model], name: str,
+                 parameters: dict[str, Any] | None = None) -> list[Model]:
+    """
+    Run a query and map its rows to a Pydantic model by column name.
+
+    The rows are validated in one batch, so a column the model does not
+    accept fails the whole call instead of producing a partial result.
+
+    Args:
+        model (Type[Model]): Output model whose fields match the query's
+            column names.
+        name (str): Name of the query, see get_query.
+        parameters (dict[str, Any] | None): Values of the parameters.
+
+    Returns:
+        list[Model]: One model per row, in query order.
+    """
+    adapter = _list_adapters.get(model)
+    if adapter is None:
+        adapter = _list_adapters[model] = TypeAdapter(list[model])
+    return adapter.validate_python(fetch_rows(name, parameters))
+
+
+def fetch_model(model: Type[Model], name: str,
+                parameters: dict[str, Any] | None = None) -> Model | None:
+    """
+    Run a query and map its first row to a Pydantic model, see fetch_models.
+
+    Returns:
+        Model | None: The first row, or None when the query returns no rows.
+    """
+    rows = fetch_rows(name, parameters, size=1)
+    return model.model_validate(rows[0]) if rows else None
@@ -0,0 +1,34 @@
+SELECT 
+    l.lap_id,
+    l.lap_number,
+    l.lap_time_in_seconds,
+    lts.avg_speed,
+    lts.max_speed,
+    lts.avg_RPM,
+    lts.max_RPM,
+    lts.avg_throttle,
+    lts.brake_percentage,
+    lts.drs_usage_percentage,
+    lts.off_track_percentage,
+    lts.avg_air_temp,
+    lts.avg_track_temp,
+    lts.avg_wind_speed,
+    lts.gear_histogram,
+    lts.throttle_on_distance_in_meters
+FROM Laps l
+JOIN LapTelemetrySummary lts ON l.lap_id = lts.lap_id
+WHERE l.lap_id = (
+    -- The lap of :session_id, or of the driver's latest session with that lap
+    SELECT MAX(ls.lap_id) FROM Laps ls
+    JOIN Sessions s ON ls.session_id = s.session_id
+    WHERE ls.driver_id IN (SELECT driver_id FROM Drivers WHERE abbreviation = :driver_name)
+        AND ls.lap_number = :lap_number
+        AND (:session_id IS NULL OR ls.session_id = :session_id)
+        AND s.date = (
+            SELECT MAX(sd.date) FROM Laps ld
+            JOIN Sessions sd ON ld.session_id = sd.session_id
+            WHERE ld.driver_id IN (SELECT driver_id FROM Drivers WHERE abbreviation = :driver_name)
+                AND ld.lap_number = :lap_number
+                AND (:session_id IS NULL OR ld.session_id = :session_id)
+        )
+);
\ No newline at end of file
@@ -18,8 +18,20 @@ JOIN Sessions s ON l.session_id = s.session_id
 JOIN Tracks t ON s.track_id = t.track_id
 JOIN Event e ON s.event_id = e.event_id
 JOIN Telemetry tel ON l.lap_id = tel.lap_id
-LEFT JOIN Weather w ON s.session_id = w.session_id 
-    AND tel.datetime BETWEEN w.datetime AND datetime(w.datetime, '+1 minutes')
-WHERE l.driver_name = :driver_name
-    AND l.lap_number = :lap_number
-GROUP BY l.lap_id;
\ No newline at end of file
+LEFT JOIN Weather w ON w.weather_id = tel.weather_id
+WHERE l.lap_id = (
+    -- The lap of :session_id, or of the driver's latest session with that lap
+    SELECT MAX(ls.lap_id) FROM Laps ls
+    JOIN Sessions s ON ls.session_id = s.session_id
+    WHERE ls.driver_id IN (SELECT driver_id FROM Drivers WHERE abbreviation = :driver_name)
+        AND ls.lap_number = :lap_number
+        AND (:session_id IS NULL OR ls.session_id = :session_id)
+        AND s.date = (
+            SELECT MAX(sd.date) FROM Laps ld
+            JOIN Sessions sd ON ld.session_id = sd.session_id
+            WHERE ld.driver_id IN (SELECT driver_id FROM Drivers WHERE abbreviation = :driver_name)
+                AND ld.lap_number = :lap_number
+                AND (:session_id IS NULL OR ld.session_id = :session_id)
+        )
+)
+GROUP BY l.lap_id, l.lap_number, l.lap_time_in_seconds;
\ No newline at end of file
@@ -1,5 +1,5 @@
 SELECT 
-    l.driver_name,
+    d.abbreviation AS driver_name,
     l.lap_number,
     l.tyre_compound,
     AVG(l.tyre_life_in_laps) AS avg_tyre_life,
@@ -10,7 +10,7 @@ SELECT
     AVG(w.track_temperature_in_celsius) AS avg_track_temp,
     AVG(w.air_temperature_in_celsius) AS avg_air_temp
 FROM Laps l
-INNER JOIN Weather w ON l.session_id = w.session_id 
-    AND l.lap_start_time_in_datetime BETWEEN w.datetime AND datetime(w.datetime, '+5 minutes')
-WHERE l.driver_name = :driver_name
-GROUP BY l.driver_name, l.lap_number, l.tyre_compound;
\ No newline at end of file
+JOIN Drivers d ON l.driver_id = d.driver_id
+INNER JOIN Weather w ON w.weather_id = l.weather_id
+WHERE d.abbreviation = :driver_name
+GROUP BY d.driver_id, d.abbreviation, l.lap_number, l.tyre_compound;
\ No newline at end of file
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Type
+import json
 from langchain_core.tools import BaseTool
-from db.connection import db
+from db.pool import probing
+from tools.cache import cached_tool_call
+from tools.executor import run_in_pool
+from tools.query import check_query, fetch_model, run_sql
 
 
 class GetTelemetryAndWeatherInput(BaseModel):
@@ -9,6 +13,9 @@ class GetTelemetryAndWeatherInput(BaseModel):
     driver_name: str = Field(
         description="Name of the driver to analyze (e.g., 'VER', 'HAM', 'LEC', etc.)")
     lap_number: int = Field(description="Lap number to analyze")
+    session_id: int | None = Field(
+        default=None,
+        description="Session of the lap; the driver's latest session with that lap when omitted")
 
 
 class GetTelemetryAndWeatherOutput(BaseModel):
@@ -17,11 +24,11 @@ class GetTelemetryAndWeatherOutput(BaseModel):
     lap_number: int = Field(description="Lap number")
     lap_time_in_seconds: float | None = Field(
         description="Lap time in seconds")
-    avg_speed: float = Field(description="Average speed in km/h")
-    max_speed: float = Field(description="Maximum speed in km/h")
-    avg_RPM: float = Field(description="Average RPM")
-    max_RPM: float = Field(description="Maximum RPM")
-    avg_throttle: float = Field(description="Average throttle")
+    avg_speed: float | None = Field(description="Average speed in km/h")
+    max_speed: float | None = Field(description="Maximum speed in km/h")
+    avg_RPM: float | None = Field(description="Average RPM")
+    max_RPM: float | None = Field(description="Maximum RPM")
+    avg_throttle: float | None = Field(description="Average throttle")
     brake_percentage: float = Field(description="Brake percentage")
     drs_usage_percentage: float = Field(description="Drs usage percentage")
     off_track_percentage: float = Field(description="Off track percentage")
@@ -31,6 +38,16 @@ class GetTelemetryAndWeatherOutput(BaseModel):
         description="Average track temperature in celsius")
     avg_wind_speed: float | None = Field(
         description="Average wind speed in meters per second")
+    gear_histogram: dict[int, int] | None = Field(
+        default=None, description="Number of telemetry samples in each gear")
+    throttle_on_distance_in_meters: float | None = Field(
+        default=None, description="Distance covered at full throttle in meters")
+
+    @field_validator('gear_histogram', mode='before')
+    @classmethod
+    def _parse_gear_histogram(cls, value: object) -> object:
+        """LapTelemetrySummary stores the histogram as a JSON object."""
+        return json.loads(value) if isinstance(value, str) else value
 
 
 class GetTelemetry(BaseTool):
@@ -38,38 +55,34 @@ class GetTelemetry(BaseTool):
     description: str = "useful for when you need to answer questions about telemetry for a given driver and lap"
     args_schema: Type[BaseModel] = GetTelemetryAndWeatherInput
 
+    @cached_tool_call
     def _run(
-        self, driver_name: str, lap_number: int
-    ) -> GetTelemetryAndWeatherOutput:
-        sql_file = open("tools/sql/telemetry_analysis.query.sql", "r")
-        sql_query = sql_file.read()
-        sql_file.close()
-        response = db.run(sql_query, parameters={
-            "driver_name": driver_name,
-            "lap_number": lap_number})
+        self, driver_name: str, lap_number: int, session_id: int | None = None
+    ) -> GetTelemetryAndWeatherOutput | None:
+        parameters = {"driver_name": driver_name, "lap_number": lap_number,
+                      "session_id": session_id}
+        # Laps are summarized at ingest; databases without the summaries
+        # aggregate the Telemetry rows instead
+        if _has_lap_summaries():
+            lap_output = fetch_model(
+                GetTelemetryAndWeatherOutput, 'lap_telemetry_summary', parameters)
+            if lap_output is not None:
+                return lap_output
+        return fetch_model(GetTelemetryAndWeatherOutput, 'telemetry_analysis', parameters)
+
+    async def _arun(
+        self, driver_name: str, lap_number: int, session_id: int | None = None
+    ) -> GetTelemetryAndWeatherOutput | None:
+        """Use the tool without blocking the event loop."""
+        return await run_in_pool(self._run, driver_name, lap_number, session_id)
+
+
+for query in ('lap_telemetry_summary', 'telemetry_analysis'):
+    check_query(query, GetTelemetryAndWeatherInput)
 
-        if not isinstance(response, str):
-            response = str(response)
 
-        clean_response = response.strip('[]()').split(',')
-        # Convert to appropriate types and create dictionary
-        return GetTelemetryAndWeatherOutput(
-            lap_id=int(float(clean_response[0])),
-            lap_number=int(float(clean_response[1])),
-            lap_time_in_seconds=float(
-                clean_response[2]) if clean_response[2].strip() != 'None' else None,
-            avg_speed=float(clean_response[3]),
-            max_speed=float(clean_response[4]),
-            avg_RPM=float(clean_response[5]),
-            max_RPM=float(clean_response[6]),
-            avg_throttle=float(clean_response[7]),
-            brake_percentage=float(clean_response[8]),
-            drs_usage_percentage=float(clean_response[9]),
-            off_track_percentage=float(clean_response[10]),
-            avg_air_temp=float(
-                clean_response[11]) if clean_response[11].strip() != 'None' else None,
-            avg_track_temp=float(
-                clean_response[12]) if clean_response[12].strip() != 'None' else None,
-            avg_wind_speed=float(
-                clean_response[13]) if clean_response[13].strip() != 'None' else None
-        )
+def _has_lap_summaries() -> bool:
+    """Check whether the database has the LapTelemetrySummary table."""
+    with probing():
+        return bool(run_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'LapTelemetrySummary'"))
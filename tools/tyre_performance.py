@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import Type
 from langchain_core.tools import BaseTool
-from db.connection import db
+from tools.cache import cached_tool_call
+from tools.executor import run_in_pool
+from tools.query import check_query, fetch_models
 
 
 class GetTyrePerformanceInput(BaseModel):
@@ -13,7 +15,8 @@ class GetTyrePerformanceOutput(BaseModel):
     """Output for the get_tyre_performance tool"""
     driver_name: str = Field(description="Name of the driver")
     lap_number: int = Field(description="Lap number")
-    tyre_compound: str = Field(description="Type of tyre compound used")
+    tyre_compound: str | None = Field(
+        description="Type of tyre compound used")
     avg_tyre_life: float | None = Field(
         description="Average tyre life in laps")
     avg_lap_time: float | None = Field(
@@ -35,47 +38,15 @@ class GetTyrePerformance(BaseTool):
     description: str = "useful for when you need to analyze tyre performance and degradation for a specific driver across all their laps"
     args_schema: Type[BaseModel] = GetTyrePerformanceInput
 
+    @cached_tool_call
     def _run(self, driver_name: str) -> list[GetTyrePerformanceOutput]:
         """Use the tool."""
-        sql_file = open("tools/sql/tyre_performance.query.sql", "r")
-        sql_query = sql_file.read()
-        sql_file.close()
+        return fetch_models(GetTyrePerformanceOutput, 'tyre_performance', {
+            "driver_name": driver_name})
 
-        response = db.run(sql_query, parameters={
-            "driver_name": driver_name
-        })
+    async def _arun(self, driver_name: str) -> list[GetTyrePerformanceOutput]:
+        """Use the tool without blocking the event loop."""
+        return await run_in_pool(self._run, driver_name)
 
-        if not isinstance(response, str):
-            response = str(response)
 
-        # Remove the outer brackets and split by rows
-        rows = response.strip('[]').split('), (')
-
-        results = []
-        for row in rows:
-            # Clean up the row string and split by columns
-            clean_row = row.strip('()').split(',')
-
-            # Convert to appropriate types and create output object
-            tyre_data = GetTyrePerformanceOutput(
-                driver_name=clean_row[0].strip("'"),
-                lap_number=int(float(clean_row[1])),
-                tyre_compound=clean_row[2].strip("'"),
-                avg_tyre_life=float(
-                    clean_row[3]) if clean_row[3].strip() != 'None' else None,
-                avg_lap_time=float(
-                    clean_row[4]) if clean_row[4].strip() != 'None' else None,
-                avg_top_speed=float(
-                    clean_row[5]) if clean_row[5].strip() != 'None' else None,
-                fresh_tyre_laps=int(
-                    float(clean_row[6])) if clean_row[6].strip() != 'None' else 0,
-                used_tyre_laps=int(
-                    float(clean_row[7])) if clean_row[7].strip() != 'None' else 0,
-                avg_track_temp=float(
-                    clean_row[8]) if clean_row[8].strip() != 'None' else None,
-                avg_air_temp=float(
-                    clean_row[9]) if clean_row[9].strip() != 'None' else None
-            )
-            results.append(tyre_data)
-
-        return results
+check_query('tyre_performance', GetTyrePerformanceInput)
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import Type
 from langchain_core.tools import BaseTool
-from db.connection import db
+from tools.cache import cached_tool_call
+from tools.executor import run_in_pool
+from tools.query import check_query, fetch_model
 
 
 class GetWeatherImpactInput(BaseModel):
@@ -36,37 +38,14 @@ class GetWeatherImpact(BaseTool):
     description: str = "useful for when you need to analyze how weather conditions impact Formula 1 session performance"
     args_schema: Type[BaseModel] = GetWeatherImpactInput
 
-    def _run(self) -> GetWeatherImpactOutput:
+    @cached_tool_call
+    def _run(self) -> GetWeatherImpactOutput | None:
         """Use the tool."""
-        sql_file = open("tools/sql/weather_impact.query.sql", "r")
-        sql_query = sql_file.read()
-        sql_file.close()
+        return fetch_model(GetWeatherImpactOutput, 'weather_impact')
 
-        response = db.run(sql_query)
+    async def _arun(self) -> GetWeatherImpactOutput | None:
+        """Use the tool without blocking the event loop."""
+        return await run_in_pool(self._run)
 
-        if not isinstance(response, str):
-            response = str(response)
 
-        # Clean up the single row response
-        clean_row = response.strip('[]()').split(',')
-
-        # Convert to appropriate types and create output object
-        return GetWeatherImpactOutput(
-            event_name=clean_row[0].strip("'"),
-            session_type=clean_row[1].strip("'"),
-            track_name=clean_row[2].strip("'"),
-            avg_air_temp=float(
-                clean_row[3]) if clean_row[3].strip() != 'None' else None,
-            avg_track_temp=float(
-                clean_row[4]) if clean_row[4].strip() != 'None' else None,
-            avg_humidity=float(
-                clean_row[5]) if clean_row[5].strip() != 'None' else None,
-            avg_wind_speed=float(
-                clean_row[6]) if clean_row[6].strip() != 'None' else None,
-            rain_percentage=float(
-                clean_row[7]) if clean_row[7].strip() != 'None' else 0.0,
-            avg_lap_time=float(
-                clean_row[8]) if clean_row[8].strip() != 'None' else None,
-            best_lap_time=float(
-                clean_row[9]) if clean_row[9].strip() != 'None' else None
-        )
+check_query('weather_impact', GetWeatherImpactInput)